@@ -2,14 +2,28 @@
 """
 Generate synthetic data for Part 2 of the Advanced RAG assignment.
 Creates:
-- CSV file with 1000 rows of daily product sales data
-- Unstructured text files with product descriptions and reviews
+- CSV file with daily product sales data (1000 rows by default, streamed in
+  NumPy-generated chunks so it scales to very large row counts)
+- Unstructured text files with product descriptions and reviews: the ten
+  hand-authored pages, plus optionally any number of templated pages
+  written in parallel (and sharded into subdirectories) for scale tests
 """
 
+import argparse
 import csv
-import random
-from datetime import datetime, timedelta
+import io
+import os
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
 from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from advanced_rag.sales_columnar import SalesColumnarWriter, day_to_date
+from advanced_rag.sales_cube import SalesCubeBuilder
+from advanced_rag.sales_index import index_path_for, update_sales_index
 
 
 # Categories and products
@@ -72,14 +86,35 @@ CATEGORIES = {
 
 REGIONS = ["North", "South", "East", "West", "Central"]
 
+SALES_FIELDNAMES = [
+    "date",
+    "product_id",
+    "product_name",
+    "category",
+    "units_sold",
+    "unit_price",
+    "total_revenue",
+    "region",
+]
 
-def _generate_sales_csv(
-    output_path: Path,
-    num_rows: int = 1000
-) -> None:
-    """Generate CSV file with daily product sales data."""
+# Sales cover the last 90 days of 2024; days are stored as days since EPOCH
+EPOCH = date(1970, 1, 1)
+END_DATE = date(2024, 12, 31)
+NUM_DAYS = 90
+START_DATE = END_DATE - timedelta(days=NUM_DAYS - 1)
 
-    # Flatten products list
+# Categories whose unit counts are boosted by 1.5x
+POPULAR_CATEGORIES = ["Electronics", "Clothing"]
+
+DISCOUNT_PROBABILITY = 0.2
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# ".00" through ".99", indexed by cents
+_CENTS_LABELS = np.array([f".{cents:02d}" for cents in range(100)])
+
+
+def _flatten_products() -> list[dict]:
+    """Flatten CATEGORIES into a list of product dicts in a stable order."""
     all_products = []
     for category, products in CATEGORIES.items():
         for product_id, product_name, base_price in products:
@@ -89,61 +124,256 @@ def _generate_sales_csv(
                 "category": category,
                 "base_price": base_price,
             })
-
-    # Generate date range (last 90 days)
-    end_date = datetime(2024, 12, 31)
-    start_date = end_date - timedelta(days=89)
-
-    rows = []
-    for _ in range(num_rows):
-        product = random.choice(all_products)
-
-        # Random date in range
-        days_offset = random.randint(0, 89)
-        sale_date = start_date + timedelta(days=days_offset)
+    return all_products
+
+
+def _iter_sales_chunks(
+    num_rows: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    seed: int | None = None,
+    start_date: date = START_DATE,
+    num_days: int = NUM_DAYS,
+) -> Iterator[dict[str, np.ndarray]]:
+    """Yield date-sorted chunks of sales rows as column arrays.
+
+    Rows are assigned to days up front with a single multinomial draw, so
+    each chunk is a contiguous, already sorted slice of the final file and
+    nothing has to be sorted or held in memory beyond one chunk.
+
+    Each chunk maps column names to arrays: ``day`` (days since epoch),
+    ``product`` (index into ``_flatten_products()``), ``region`` (index
+    into ``REGIONS``), ``units_sold``, ``price_cents`` and ``revenue_cents``.
+    """
+    rng = np.random.default_rng(seed)
+    all_products = _flatten_products()
+
+    base_cents = np.array(
+        [round(p["base_price"] * 100) for p in all_products], dtype=np.int64
+    )
+    popular = np.array(
+        [p["category"] in POPULAR_CATEGORIES for p in all_products], dtype=bool
+    )
+
+    # Per-day row counts; row i falls on the first day whose cumulative
+    # count exceeds i
+    day_counts = rng.multinomial(num_rows, np.full(num_days, 1.0 / num_days))
+    day_ends = np.cumsum(day_counts)
+    first_day = (start_date - EPOCH).days
+
+    for lo in range(0, num_rows, chunk_size):
+        hi = min(lo + chunk_size, num_rows)
+        size = hi - lo
+
+        day_offsets = np.searchsorted(
+            day_ends, np.arange(lo, hi), side="right"
+        )
+        product = rng.integers(0, len(all_products), size)
 
         # Units sold (weighted by product popularity)
-        base_units = random.randint(1, 50)
-        if product["category"] in ["Electronics", "Clothing"]:
-            base_units = int(base_units * 1.5)
+        units = rng.integers(1, 51, size)
+        units = np.where(popular[product], (units * 1.5).astype(np.int64), units)
 
         # Price variation (occasional discounts)
-        price = product["base_price"]
-        if random.random() < 0.2:  # 20% chance of discount
-            price = round(price * random.uniform(0.8, 0.95), 2)
-
-        rows.append({
-            "date": sale_date.strftime("%Y-%m-%d"),
-            "product_id": product["product_id"],
-            "product_name": product["product_name"],
-            "category": product["category"],
-            "units_sold": base_units,
-            "unit_price": price,
-            "total_revenue": round(base_units * price, 2),
-            "region": random.choice(REGIONS),
-        })
-
-    # Sort by date
-    rows.sort(key=lambda x: x["date"])
-
-    # Write CSV
-    fieldnames = [
-        "date",
-        "product_id",
-        "product_name",
-        "category",
-        "units_sold",
-        "unit_price",
-        "total_revenue",
-        "region",
-    ]
+        price_cents = base_cents[product]
+        discounted = rng.random(size) < DISCOUNT_PROBABILITY
+        price_cents[discounted] = np.rint(
+            price_cents[discounted]
+            * rng.uniform(0.8, 0.95, int(discounted.sum()))
+        ).astype(np.int64)
+
+        yield {
+            "day": (first_day + day_offsets).astype(np.int32),
+            "product": product.astype(np.int16),
+            "region": rng.integers(0, len(REGIONS), size).astype(np.int8),
+            "units_sold": units.astype(np.int32),
+            "price_cents": price_cents,
+            "revenue_cents": units * price_cents,
+        }
+
+
+def _format_cents(
+    cents: np.ndarray
+) -> np.ndarray:
+    """Format integer cents as fixed two-decimal strings (e.g. 1049.58)."""
+    return np.char.add((cents // 100).astype(str), _CENTS_LABELS[cents % 100])
+
+
+def _format_csv_lines(
+    chunk: dict[str, np.ndarray],
+    row_prefixes: np.ndarray,
+    region_suffixes: np.ndarray,
+    first_day: int,
+) -> str:
+    """Render a chunk of sales rows as CSV text.
+
+    ``row_prefixes`` holds the preformatted ``date,product_id,product_name,
+    category,`` text for every (day offset from ``first_day``, product)
+    pair and ``region_suffixes`` the ``,region`` text, so only the numeric
+    columns are formatted per row.
+    """
+    lines = row_prefixes[chunk["day"] - first_day, chunk["product"]]
+    for column in (
+        chunk["units_sold"].astype(str),
+        ",",
+        _format_cents(chunk["price_cents"]),
+        ",",
+        _format_cents(chunk["revenue_cents"]),
+        region_suffixes[chunk["region"]],
+    ):
+        lines = np.char.add(lines, column)
+    return "\n".join(lines.tolist()) + "\n"
+
+
+def _csv_field(
+    value: str
+) -> str:
+    """Quote a static CSV field the same way csv.writer would."""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="").writerow([value])
+    return buffer.getvalue()
 
-    with open(output_path, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
 
-    print(f"Generated {num_rows} sales records in {output_path}")
+def _generate_sales_csv(
+    output_path: Path,
+    num_rows: int = 1000,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    seed: int | None = None,
+    columnar_dir: Path | None = None,
+    cube_path: Path | None = None,
+    start_date: date = START_DATE,
+    num_days: int = NUM_DAYS,
+    append: bool = False,
+) -> None:
+    """Generate CSV file with daily product sales data.
+
+    Rows are generated with NumPy in fixed-size chunks and streamed to disk,
+    so memory stays bounded by ``chunk_size`` regardless of ``num_rows``.
+    When ``columnar_dir`` is given the same rows are also written as a
+    columnar .npy store (see advanced_rag.sales_columnar), and when
+    ``cube_path`` is given they are rolled up into a day x product x region
+    cube (see advanced_rag.sales_cube) as they are generated.
+
+    With ``append`` set, rows for ``num_days`` days from ``start_date`` are
+    added to the end of an existing CSV instead of overwriting it.
+    """
+    if append and (columnar_dir is not None or cube_path is not None):
+        raise ValueError("Columnar and cube outputs cannot be appended to")
+
+    first_day = (start_date - EPOCH).days
+    all_products = _flatten_products()
+    category_names = list(CATEGORIES)
+    product_category = np.array(
+        [category_names.index(p["category"]) for p in all_products],
+        dtype=np.int8,
+    )
+    columnar = None
+    if columnar_dir is not None:
+        columnar = SalesColumnarWriter(columnar_dir, num_rows)
+    cube = None
+    if cube_path is not None:
+        cube = SalesCubeBuilder(
+            first_day=first_day,
+            num_days=num_days,
+            product_ids=[p["product_id"] for p in all_products],
+            product_categories=[p["category"] for p in all_products],
+            regions=REGIONS,
+        )
+
+    # Static text for every day, product and region is formatted once
+    day_labels = np.array([
+        (start_date + timedelta(days=offset)).isoformat() + ","
+        for offset in range(num_days)
+    ])
+    product_labels = np.array([
+        "".join(
+            _csv_field(p[key]) + ","
+            for key in ("product_id", "product_name", "category")
+        )
+        for p in all_products
+    ])
+    row_prefixes = np.char.add(day_labels[:, None], product_labels[None, :])
+    region_suffixes = np.array(["," + _csv_field(region) for region in REGIONS])
+
+    with open(output_path, "a" if append else "w", newline="") as f:
+        if not append:
+            f.write(",".join(SALES_FIELDNAMES) + "\n")
+        for chunk in _iter_sales_chunks(
+            num_rows, chunk_size, seed, start_date, num_days
+        ):
+            f.write(
+                _format_csv_lines(chunk, row_prefixes, region_suffixes, first_day)
+            )
+            if columnar is not None:
+                columnar.write({
+                    "day": chunk["day"],
+                    "product": chunk["product"],
+                    "category": product_category[chunk["product"]],
+                    "region": chunk["region"],
+                    "units_sold": chunk["units_sold"],
+                    "unit_price": chunk["price_cents"] / 100,
+                    "total_revenue": chunk["revenue_cents"] / 100,
+                })
+            if cube is not None:
+                cube.add(
+                    chunk["day"],
+                    chunk["product"],
+                    chunk["region"],
+                    chunk["units_sold"],
+                    chunk["revenue_cents"] / 100,
+                )
+
+    action = "Appended" if append else "Generated"
+    print(f"{action} {num_rows} sales records in {output_path}")
+
+    if columnar is not None:
+        columnar.close(
+            dictionaries={
+                "product_id": [p["product_id"] for p in all_products],
+                "category": category_names,
+                "region": REGIONS,
+            },
+            product_names=[p["product_name"] for p in all_products],
+        )
+        print(f"Generated columnar sales store in {columnar_dir}")
+
+    if cube is not None:
+        cube.build().save(cube_path)
+        print(f"Generated sales rollup cube in {cube_path}")
+
+
+def _append_sales_days(
+    csv_path: Path,
+    num_days: int,
+    num_rows: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    seed: int | None = None,
+) -> None:
+    """Append ``num_days`` new days of sales after the last date in the CSV.
+
+    The sidecar index (byte offsets and prefix sums, see
+    advanced_rag.sales_index) is brought up to date before and after, so
+    only the appended rows are scanned.
+    """
+    index = update_sales_index(csv_path)
+    start_date = (
+        day_to_date(index.days[-1]) + timedelta(days=1)
+        if len(index.days)
+        else START_DATE
+    )
+    _generate_sales_csv(
+        csv_path,
+        num_rows=num_rows,
+        chunk_size=chunk_size,
+        seed=seed,
+        start_date=start_date,
+        num_days=num_days,
+        append=True,
+    )
+    index = update_sales_index(csv_path)
+    print(
+        f"Appended {num_days} days starting {start_date.isoformat()}; "
+        f"index covers {len(index.days)} days in {index_path_for(csv_path)}"
+    )
 
 
 def _generate_product_pages(
@@ -871,17 +1101,1028 @@ Average Rating: 4.6/5 (4,123 reviews)
         print(f"Generated product page: {output_path}")
 
 
+# Vocabulary for templated product pages. Features, specifications, uses
+# and review aspects are listed per product noun so every page describes
+# one coherent product; only brands and the price range are per category.
+PAGE_TEMPLATES = {
+    "Electronics": {
+        "brands": ["SoundMax", "VoltEdge", "Nexa", "PulseTech", "Orbit"],
+        "price": (19.0, 299.0),
+        "products": {
+            "Wireless Earbuds": {
+                "features": ["Bluetooth 5.3 with multipoint pairing", "{hours}-hour battery life with case",
+                             "Active noise cancellation", "IPX{ip} water resistance",
+                             "Built-in microphones for calls", "Fast charging over USB-C"],
+                "specs": {"Battery": ["50mAh per earbud", "60mAh per earbud"],
+                          "Connectivity": ["Bluetooth 5.3"],
+                          "Weight": ["45g with case", "52g with case"]},
+                "uses": ["Commuting", "Workouts", "Calls on the go"],
+                "aspects": ["sound quality", "battery life", "fit", "call quality"],
+            },
+            "Bluetooth Speaker": {
+                "features": ["360-degree sound", "{hours}-hour battery life",
+                             "IPX{ip} water resistance", "Pair two speakers for stereo",
+                             "Built-in microphone for calls", "Fast charging over USB-C"],
+                "specs": {"Battery": ["3000mAh", "5000mAh"],
+                          "Output": ["10W", "20W", "30W"],
+                          "Weight": ["410g", "540g", "680g"]},
+                "uses": ["Outdoor parties", "Travel", "Beach days"],
+                "aspects": ["sound quality", "bass", "battery life", "durability"],
+            },
+            "Smart Watch": {
+                "features": ["Heart rate and sleep tracking", "Built-in GPS",
+                             "{hours}-hour battery life", "IPX{ip} water resistance",
+                             "Companion app with firmware updates", "Aluminium housing"],
+                "specs": {"Display": ['1.4" AMOLED', '1.7" AMOLED'],
+                          "Connectivity": ["Bluetooth 5.0, Wi-Fi", "Bluetooth 5.3"],
+                          "Weight": ["32g", "45g"]},
+                "uses": ["Workouts", "Sleep tracking", "Notifications on the go"],
+                "aspects": ["battery life", "tracking accuracy", "display", "app"],
+            },
+            "Power Bank": {
+                "features": ["Charges two devices at once", "Fast charging over USB-C",
+                             "LED charge indicator", "Slim aluminium housing",
+                             "Airline carry-on approved"],
+                "specs": {"Capacity": ["10000mAh", "20000mAh"],
+                          "Output": ["20W", "45W", "65W"],
+                          "Weight": ["210g", "254g", "380g"]},
+                "uses": ["Travel", "Commuting", "Camping"],
+                "aspects": ["charging speed", "capacity", "size", "build quality"],
+            },
+            "USB-C Hub": {
+                "features": ["4K HDMI output", "100W power delivery pass-through",
+                             "SD and microSD card readers", "Three USB-A 3.0 ports",
+                             "Aluminium housing"],
+                "specs": {"Ports": ["6-in-1", "7-in-1", "9-in-1"],
+                          "Connectivity": ["USB-C 3.2"],
+                          "Weight": ["65g", "90g"]},
+                "uses": ["Working from home", "Laptop setups", "Travel"],
+                "aspects": ["port selection", "stability", "heat", "build quality"],
+            },
+            "Noise Cancelling Headphones": {
+                "features": ["Active noise cancellation", "{hours}-hour battery life",
+                             "Bluetooth 5.3 with multipoint pairing", "Memory foam ear cushions",
+                             "Foldable design with carrying case", "Built-in microphone for calls"],
+                "specs": {"Battery": ["800mAh", "1200mAh"],
+                          "Connectivity": ["Bluetooth 5.3", "Bluetooth 5.3, 3.5mm jack"],
+                          "Weight": ["254g", "290g"]},
+                "uses": ["Commuting", "Working from home", "Flights"],
+                "aspects": ["noise cancellation", "sound quality", "comfort", "battery life"],
+            },
+            "Fitness Tracker": {
+                "features": ["Step, heart rate and sleep tracking", "{hours}-hour battery life",
+                             "IPX{ip} water resistance", "Companion app with firmware updates",
+                             "Interchangeable bands"],
+                "specs": {"Display": ['1.1" AMOLED', '1.5" AMOLED'],
+                          "Connectivity": ["Bluetooth 5.0"],
+                          "Weight": ["24g", "30g"]},
+                "uses": ["Workouts", "Sleep tracking", "Daily step goals"],
+                "aspects": ["tracking accuracy", "battery life", "comfort", "app"],
+            },
+        },
+    },
+    "Home & Kitchen": {
+        "brands": ["ChefPro", "HomeEase", "Cuisina", "KitchenCraft"],
+        "price": (15.0, 249.0),
+        "products": {
+            "Air Fryer": {
+                "features": ["{liters}L basket capacity", "Digital touch controls",
+                             "Eight cooking presets", "Dishwasher-safe basket",
+                             "Non-stick ceramic coating", "Auto shut-off for safety"],
+                "specs": {"Capacity": ["3.5L", "5.5L", "6L"],
+                          "Power": ["1500W", "1700W"],
+                          "Dimensions": ['12" x 10" x 13"', '14" x 11" x 14"']},
+                "uses": ["Quick weeknight meals", "Healthier frying", "Families"],
+                "aspects": ["cooking results", "ease of cleaning", "noise level", "capacity"],
+            },
+            "Coffee Maker": {
+                "features": ["Programmable 24-hour timer", "{liters}L water reservoir",
+                             "Keep-warm plate", "Reusable filter included",
+                             "Auto shut-off for safety"],
+                "specs": {"Capacity": ["10 cups", "12 cups"],
+                          "Power": ["900W", "1000W"],
+                          "Material": ["Stainless steel", "BPA-free plastic"]},
+                "uses": ["Morning routines", "Families", "Home offices"],
+                "aspects": ["coffee taste", "brew speed", "ease of cleaning", "build quality"],
+            },
+            "Blender": {
+                "features": ["Six-blade stainless steel assembly", "{liters}L BPA-free jar",
+                             "Pulse and smoothie presets", "Crushes ice in seconds",
+                             "Dishwasher-safe jar"],
+                "specs": {"Capacity": ["1.5L", "2L"],
+                          "Power": ["800W", "1200W"],
+                          "Speeds": ["3", "5", "10"]},
+                "uses": ["Smoothies", "Meal prep", "Soups and sauces"],
+                "aspects": ["blending power", "noise level", "ease of cleaning", "build quality"],
+            },
+            "Frying Pan Set": {
+                "features": ["Non-stick ceramic coating", "Works on induction hobs",
+                             "Stay-cool handles", "Oven safe to 220C", "Dishwasher safe"],
+                "specs": {"Pieces": ["3", "5"],
+                          "Sizes": ['8", 10" and 12"', '9.5" and 11"'],
+                          "Material": ["Aluminium", "Stainless steel"]},
+                "uses": ["Everyday cooking", "Families", "Small kitchens"],
+                "aspects": ["non-stick coating", "heat distribution", "weight", "durability"],
+            },
+            "Electric Kettle": {
+                "features": ["{liters}L capacity", "Boils in under four minutes",
+                             "Auto shut-off and boil-dry protection",
+                             "Variable temperature settings", "Cordless 360-degree base"],
+                "specs": {"Capacity": ["1.5L", "1.7L"],
+                          "Power": ["1500W", "2200W"],
+                          "Material": ["Stainless steel", "Glass"]},
+                "uses": ["Tea and coffee", "Small kitchens", "Offices"],
+                "aspects": ["boil speed", "noise level", "build quality", "ease of pouring"],
+            },
+            "Slow Cooker": {
+                "features": ["{liters}L ceramic pot", "Low, high and keep-warm settings",
+                             "Programmable timer", "Glass lid", "Dishwasher-safe pot"],
+                "specs": {"Capacity": ["3.5L", "5.5L", "6L"],
+                          "Power": ["200W", "320W"],
+                          "Material": ["Ceramic", "Stainless steel"]},
+                "uses": ["Meal prep", "Families", "Batch cooking"],
+                "aspects": ["cooking results", "capacity", "ease of cleaning", "build quality"],
+            },
+            "Knife Block": {
+                "features": ["High-carbon stainless steel blades", "Full-tang ergonomic handles",
+                             "Built-in sharpener", "Hardwood block", "Hand wash recommended"],
+                "specs": {"Pieces": ["6", "8", "14"],
+                          "Material": ["German stainless steel", "Japanese steel"],
+                          "Block": ["Acacia wood", "Bamboo"]},
+                "uses": ["Everyday cooking", "Home chefs", "Gifts"],
+                "aspects": ["sharpness", "balance", "edge retention", "build quality"],
+            },
+        },
+    },
+    "Sports & Outdoors": {
+        "brands": ["ZenFlex", "TrailMark", "PeakFit", "Outbound"],
+        "price": (12.0, 199.0),
+        "products": {
+            "Yoga Mat": {
+                "features": ["Non-slip textured surface", "Lightweight at {weight} lbs",
+                             "Eco-friendly TPE material", "Includes carrying strap",
+                             "Alignment lines"],
+                "specs": {"Material": ["TPE", "Natural rubber"],
+                          "Thickness": ["4mm", "6mm", "8mm"],
+                          "Dimensions": ['72" x 24"', '68" x 24"']},
+                "uses": ["Yoga", "Pilates", "Home workouts"],
+                "aspects": ["grip", "cushioning", "durability", "portability"],
+            },
+            "Resistance Bands Set": {
+                "features": ["Five resistance levels", "Padded handles",
+                             "Door anchor included", "Latex-free material",
+                             "Includes carrying bag"],
+                "specs": {"Resistance": ["10-50 lbs", "10-150 lbs"],
+                          "Material": ["TPE", "Natural latex"],
+                          "Pieces": ["5", "11"]},
+                "uses": ["Home workouts", "Physical therapy", "Travel"],
+                "aspects": ["durability", "resistance range", "grip", "portability"],
+            },
+            "Hiking Backpack": {
+                "features": ["Weather-resistant fabric", "Padded hip belt",
+                             "Hydration bladder sleeve", "Reinforced stitching",
+                             "Lightweight at {weight} lbs"],
+                "specs": {"Capacity": ["30L", "45L", "60L"],
+                          "Material": ["Ripstop nylon", "Polyester"],
+                          "Weight": ["2.5 lbs", "3.1 lbs"]},
+                "uses": ["Hiking", "Day trips", "Camping"],
+                "aspects": ["comfort", "storage", "durability", "weather protection"],
+            },
+            "Camping Tent": {
+                "features": ["Weather-resistant rainfly", "Sets up in under ten minutes",
+                             "Mesh windows for ventilation", "Reinforced stitching",
+                             "Includes stakes and carrying bag"],
+                "specs": {"Capacity": ["2 person", "4 person", "6 person"],
+                          "Material": ["Ripstop nylon", "Polyester"],
+                          "Dimensions": ["7ft x 5ft", "8ft x 8ft", "10ft x 9ft"]},
+                "uses": ["Camping", "Festivals", "Backpacking"],
+                "aspects": ["weather protection", "setup", "space", "portability"],
+            },
+            "Foam Roller": {
+                "features": ["High-density EVA foam", "Textured massage surface",
+                             "Lightweight at {weight} lbs", "Holds up to 300 lbs"],
+                "specs": {"Material": ["EVA foam", "EPP foam"],
+                          "Dimensions": ['13" x 5.5"', '18" x 6"', '36" x 6"'],
+                          "Firmness": ["Medium", "Firm"]},
+                "uses": ["Muscle recovery", "Stretching", "Fitness training"],
+                "aspects": ["firmness", "durability", "size", "effectiveness"],
+            },
+            "Adjustable Dumbbells": {
+                "features": ["Dial adjustment in seconds", "Replaces fifteen sets of weights",
+                             "Ergonomic padded grip", "Storage tray included"],
+                "specs": {"Weight range": ["5-25 lbs", "5-52.5 lbs"],
+                          "Material": ["Steel", "Steel with rubber coating"],
+                          "Increments": ["2.5 lbs", "5 lbs"]},
+                "uses": ["Home workouts", "Strength training", "Small spaces"],
+                "aspects": ["adjustment mechanism", "grip", "build quality", "value"],
+            },
+            "Water Bottle": {
+                "features": ["Double-wall vacuum insulation", "Keeps drinks cold for 24 hours",
+                             "Leak-proof lid", "BPA-free", "Fits most cup holders"],
+                "specs": {"Capacity": ["500ml", "750ml", "1L"],
+                          "Material": ["Stainless steel", "Tritan plastic"],
+                          "Weight": ["280g", "390g"]},
+                "uses": ["Hiking", "Gym sessions", "Commuting"],
+                "aspects": ["insulation", "leak-proofing", "durability", "ease of cleaning"],
+            },
+        },
+    },
+    "Beauty & Personal Care": {
+        "brands": ["GlowLab", "PureSkin", "Lumina", "DermaCare"],
+        "price": (9.0, 129.0),
+        "products": {
+            "Vitamin C Serum": {
+                "features": ["15% vitamin C with hyaluronic acid", "Dermatologist tested",
+                             "Fragrance-free formula", "Cruelty-free and vegan",
+                             "Dropper bottle"],
+                "specs": {"Volume": ["30ml", "50ml"],
+                          "Skin type": ["All skin types", "Dry skin", "Oily skin"],
+                          "Key ingredients": ["Vitamin C, hyaluronic acid", "Vitamin C, vitamin E"]},
+                "uses": ["Daily routine", "Dull skin", "Dark spots"],
+                "aspects": ["results", "texture", "absorption", "scent"],
+            },
+            "Hair Dryer": {
+                "features": ["Ionic technology reduces frizz", "{modes} heat and speed settings",
+                             "Cool shot button", "Concentrator and diffuser included",
+                             "Foldable handle"],
+                "specs": {"Power": ["1800W", "2000W"],
+                          "Cord length": ["1.8m", "2.5m"],
+                          "Weight": ["450g", "600g"]},
+                "uses": ["Daily styling", "Thick hair", "Travel"],
+                "aspects": ["drying speed", "noise level", "weight", "results"],
+            },
+            "Electric Toothbrush": {
+                "features": ["{modes} cleaning modes", "Two-minute timer with pacing",
+                             "Pressure sensor", "Rechargeable battery lasts three weeks",
+                             "Two brush heads included"],
+                "specs": {"Battery": ["Rechargeable lithium-ion"],
+                          "Charging": ["Inductive stand", "USB-C"],
+                          "Brush heads": ["2", "4"]},
+                "uses": ["Daily routine", "Sensitive gums", "Travel"],
+                "aspects": ["cleaning results", "battery life", "noise level", "brush heads"],
+            },
+            "Face Moisturizer": {
+                "features": ["24-hour hydration", "Dermatologist tested",
+                             "Fragrance-free formula", "Non-comedogenic",
+                             "Cruelty-free and vegan"],
+                "specs": {"Volume": ["50ml", "100ml"],
+                          "Skin type": ["All skin types", "Dry skin", "Sensitive skin"],
+                          "SPF": ["None", "SPF 15"]},
+                "uses": ["Daily routine", "Sensitive skin", "Dry skin"],
+                "aspects": ["hydration", "texture", "absorption", "scent"],
+            },
+            "Hair Straightener": {
+                "features": ["Ceramic tourmaline plates", "Adjustable temperature up to 230C",
+                             "Heats up in 30 seconds", "Auto shut-off after 60 minutes",
+                             "Swivel cord"],
+                "specs": {"Plate width": ["1 inch", "1.5 inch"],
+                          "Temperature range": ["150-230C", "120-220C"],
+                          "Power": ["45W", "60W"]},
+                "uses": ["Daily styling", "Thick hair", "Travel"],
+                "aspects": ["heat-up time", "results", "heat damage", "grip"],
+            },
+            "Sunscreen SPF 50": {
+                "features": ["Broad spectrum SPF 50", "Water resistant for 80 minutes",
+                             "Reef-safe formula", "Non-greasy finish",
+                             "Dermatologist tested"],
+                "specs": {"Volume": ["50ml", "100ml", "200ml"],
+                          "Skin type": ["All skin types", "Sensitive skin"],
+                          "Finish": ["Matte", "Dewy"]},
+                "uses": ["Beach days", "Outdoor sports", "Daily routine"],
+                "aspects": ["protection", "texture", "white cast", "scent"],
+            },
+        },
+    },
+    "Clothing": {
+        "brands": ["UrbanThread", "StrideWear", "NorthLine", "Basics Co"],
+        "price": (14.0, 179.0),
+        "products": {
+            "Running Shoes": {
+                "features": ["Breathable mesh upper", "Responsive foam midsole",
+                             "Rubber outsole with grip pattern", "Reflective details",
+                             "Available in {colors} colors"],
+                "specs": {"Material": ["Mesh and synthetic", "Knit"],
+                          "Drop": ["6mm", "8mm", "10mm"],
+                          "Sizes": ["6-13"]},
+                "uses": ["Running", "Gym sessions", "Everyday wear"],
+                "aspects": ["cushioning", "fit", "grip", "durability"],
+            },
+            "Winter Jacket": {
+                "features": ["Insulated synthetic down fill", "Water-repellent shell",
+                             "Detachable hood", "Fleece-lined pockets",
+                             "Available in {colors} colors"],
+                "specs": {"Material": ["Nylon", "Polyester blend"],
+                          "Fit": ["Regular", "Relaxed"],
+                          "Sizes": ["XS-XXL"]},
+                "uses": ["Cold weather", "Commuting", "Winter hikes"],
+                "aspects": ["warmth", "fit", "material quality", "sizing"],
+            },
+            "T-Shirt Pack": {
+                "features": ["100% organic cotton", "Tagless neck label", "Reinforced seams",
+                             "Machine washable", "Available in {colors} colors"],
+                "specs": {"Material": ["Cotton", "Cotton blend"],
+                          "Fit": ["Regular", "Slim"],
+                          "Pack size": ["3", "5"]},
+                "uses": ["Everyday wear", "Layering", "Sleepwear"],
+                "aspects": ["softness", "fit", "shrinkage", "sizing"],
+            },
+            "Denim Jeans": {
+                "features": ["Stretch denim for comfort", "Reinforced seams",
+                             "Five-pocket styling", "Machine washable",
+                             "Available in {colors} washes"],
+                "specs": {"Material": ["Denim", "Stretch denim"],
+                          "Fit": ["Regular", "Slim", "Relaxed"],
+                          "Sizes": ["28-40 waist"]},
+                "uses": ["Everyday wear", "Casual Fridays", "Weekends"],
+                "aspects": ["fit", "comfort", "material quality", "sizing"],
+            },
+            "Hoodie": {
+                "features": ["Brushed fleece lining", "Kangaroo pocket",
+                             "Adjustable drawstring hood", "Machine washable",
+                             "Available in {colors} colors"],
+                "specs": {"Material": ["Cotton", "Polyester blend"],
+                          "Fit": ["Regular", "Relaxed"],
+                          "Sizes": ["XS-XXL"]},
+                "uses": ["Everyday wear", "Layering", "Lounging"],
+                "aspects": ["warmth", "comfort", "material quality", "sizing"],
+            },
+            "Rain Jacket": {
+                "features": ["Waterproof breathable shell", "Taped seams",
+                             "Packs into its own pocket", "Adjustable hood",
+                             "Available in {colors} colors"],
+                "specs": {"Material": ["Nylon", "Polyester"],
+                          "Fit": ["Regular", "Relaxed"],
+                          "Sizes": ["XS-XXL"]},
+                "uses": ["Rainy commutes", "Hiking", "Travel"],
+                "aspects": ["waterproofing", "breathability", "fit", "packability"],
+            },
+        },
+    },
+    "Books": {
+        "brands": ["Northwind Press", "Harbor Books", "Quill House"],
+        "price": (9.0, 59.0),
+        "products": {
+            "Programming Guide": {
+                "features": ["{pages} pages", "Includes exercises and examples",
+                             "Downloadable code samples", "Covers beginner to advanced topics"],
+                "specs": {"Format": ["Hardcover", "Paperback"],
+                          "Language": ["English"],
+                          "Edition": ["2nd", "3rd"]},
+                "uses": ["Beginners", "Self-study", "Reference"],
+                "aspects": ["explanations", "examples", "depth", "print quality"],
+            },
+            "Cookbook": {
+                "features": ["Over 150 recipes", "Illustrated throughout",
+                             "Nutritional information for every recipe", "Lay-flat binding"],
+                "specs": {"Format": ["Hardcover", "Spiral bound"],
+                          "Language": ["English"],
+                          "Pages": ["240", "320"]},
+                "uses": ["Home cooks", "Gifts", "Meal planning"],
+                "aspects": ["recipes", "photography", "instructions", "variety"],
+            },
+            "Mystery Novel Collection": {
+                "features": ["Three complete novels", "{pages} pages",
+                             "Written by an award-winning author", "Includes a bonus short story"],
+                "specs": {"Format": ["Hardcover", "Paperback"],
+                          "Language": ["English"],
+                          "Books": ["3"]},
+                "uses": ["Book clubs", "Holiday reading", "Gifts"],
+                "aspects": ["plot", "pacing", "characters", "writing"],
+            },
+            "History of Science": {
+                "features": ["{pages} pages", "Illustrated throughout",
+                             "Timeline and index", "Written by an award-winning author"],
+                "specs": {"Format": ["Hardcover", "Paperback"],
+                          "Language": ["English"],
+                          "Pages": ["384", "512"]},
+                "uses": ["Curious readers", "Students", "Reference"],
+                "aspects": ["writing", "research", "illustrations", "depth"],
+            },
+            "Travel Journal": {
+                "features": ["{pages} dotted pages", "Pocket for tickets and receipts",
+                             "Elastic closure", "Lay-flat binding"],
+                "specs": {"Format": ["Hardcover", "Softcover"],
+                          "Paper": ["100gsm", "120gsm"],
+                          "Size": ["A5", "A6"]},
+                "uses": ["Travel", "Gifts", "Journaling"],
+                "aspects": ["paper quality", "binding", "size", "design"],
+            },
+            "Fantasy Trilogy": {
+                "features": ["All three books in one set", "{pages} pages in total",
+                             "Includes maps of the world", "Written by an award-winning author"],
+                "specs": {"Format": ["Hardcover", "Paperback"],
+                          "Language": ["English"],
+                          "Books": ["3"]},
+                "uses": ["Fantasy fans", "Book clubs", "Gifts"],
+                "aspects": ["world building", "pacing", "characters", "print quality"],
+            },
+        },
+    },
+    "Toys & Games": {
+        "brands": ["PlayForge", "BrightBlocks", "FunWorks"],
+        "price": (9.0, 89.0),
+        "products": {
+            "Building Blocks Set": {
+                "features": ["Ages {age}+", "Compatible with major brick brands",
+                             "Non-toxic materials", "Storage box included",
+                             "Idea booklet included"],
+                "specs": {"Pieces": ["500", "1000", "1500"],
+                          "Age": ["4+", "6+"],
+                          "Material": ["ABS plastic"]},
+                "uses": ["Creative play", "Education", "Gifts"],
+                "aspects": ["fun", "piece quality", "instructions", "replay value"],
+            },
+            "Board Game": {
+                "features": ["{players} players", "Ages {age}+",
+                             "Quick-start rulebook", "Storage box included"],
+                "specs": {"Players": ["2-4", "2-6"],
+                          "Age": ["8+", "12+"],
+                          "Play time": ["45 minutes", "90 minutes"]},
+                "uses": ["Family game night", "Parties", "Gifts"],
+                "aspects": ["fun", "rules", "component quality", "replay value"],
+            },
+            "Remote Control Car": {
+                "features": ["Rechargeable battery included", "Top speed of 20 mph",
+                             "Shock-absorbing suspension", "2.4GHz remote with 50m range",
+                             "Ages {age}+"],
+                "specs": {"Battery": ["Rechargeable 1200mAh"],
+                          "Scale": ["1:16", "1:18"],
+                          "Run time": ["20 minutes", "30 minutes"]},
+                "uses": ["Outdoor play", "Gifts", "Hobbyists"],
+                "aspects": ["speed", "battery life", "durability", "handling"],
+            },
+            "Puzzle 1000pc": {
+                "features": ["1000 precision-cut pieces", "Glare-free finish",
+                             "Poster of the image included", "Made from recycled board"],
+                "specs": {"Pieces": ["1000"],
+                          "Finished size": ['27" x 20"'],
+                          "Age": ["12+"]},
+                "uses": ["Relaxing evenings", "Family time", "Gifts"],
+                "aspects": ["piece fit", "image quality", "difficulty", "box quality"],
+            },
+            "Card Game": {
+                "features": ["{players} players", "Ages {age}+",
+                             "Games take 15 minutes", "Travel-sized box"],
+                "specs": {"Players": ["2-6", "3-8"],
+                          "Cards": ["110", "160"],
+                          "Play time": ["15 minutes", "30 minutes"]},
+                "uses": ["Parties", "Travel", "Family game night"],
+                "aspects": ["fun", "rules", "card quality", "replay value"],
+            },
+            "Science Kit": {
+                "features": ["Twenty hands-on experiments", "Ages {age}+",
+                             "Illustrated instruction manual", "Non-toxic materials"],
+                "specs": {"Experiments": ["20", "30"],
+                          "Age": ["8+", "10+"],
+                          "Adult supervision": ["Recommended"]},
+                "uses": ["Education", "Homeschooling", "Gifts"],
+                "aspects": ["educational value", "instructions", "fun", "materials"],
+            },
+        },
+    },
+    "Office Supplies": {
+        "brands": ["DeskPro", "Ergonix", "Paperline"],
+        "price": (8.0, 349.0),
+        "products": {
+            "Office Chair": {
+                "features": ["Adjustable lumbar support", "Breathable mesh back",
+                             "Height adjustable seat", "Padded armrests",
+                             "Smooth-rolling casters"],
+                "specs": {"Material": ["Mesh", "Fabric"],
+                          "Max load": ["120kg", "150kg"],
+                          "Seat height": ["42-52cm", "45-55cm"]},
+                "uses": ["Home office", "Long work sessions", "Gaming"],
+                "aspects": ["comfort", "assembly", "build quality", "adjustability"],
+            },
+            "Desk Lamp": {
+                "features": ["{levels} brightness levels", "Adjustable colour temperature",
+                             "USB charging port", "Flicker-free LED", "Foldable arm"],
+                "specs": {"Material": ["Aluminium", "ABS plastic"],
+                          "Power": ["8W", "12W"],
+                          "Colour temperature": ["3000-6500K"]},
+                "uses": ["Home office", "Students", "Reading"],
+                "aspects": ["brightness", "adjustability", "build quality", "value"],
+            },
+            "Notebook Set": {
+                "features": ["Recycled paper", "Lay-flat binding", "Numbered pages",
+                             "Elastic closure"],
+                "specs": {"Material": ["Recycled paper"],
+                          "Pack size": ["3", "5"],
+                          "Ruling": ["Lined", "Dotted", "Grid"]},
+                "uses": ["Students", "Meeting notes", "Journaling"],
+                "aspects": ["paper quality", "binding", "size", "value"],
+            },
+            "Wireless Mouse": {
+                "features": ["Silent clicks", "Ergonomic design",
+                             "Adjustable DPI up to 4000", "Battery lasts up to 18 months"],
+                "specs": {"Connectivity": ["2.4GHz receiver", "Bluetooth"],
+                          "Battery": ["1 x AA", "Rechargeable"],
+                          "Buttons": ["3", "6"]},
+                "uses": ["Home office", "Laptop setups", "Travel"],
+                "aspects": ["comfort", "tracking", "battery life", "connection stability"],
+            },
+            "Monitor Stand": {
+                "features": ["Height adjustable", "Storage drawer underneath",
+                             "Cable management slot", "Non-slip feet"],
+                "specs": {"Material": ["Aluminium", "Bamboo"],
+                          "Max load": ["20kg", "30kg"],
+                          "Height": ["10-14cm"]},
+                "uses": ["Home office", "Dual monitor setups", "Long work sessions"],
+                "aspects": ["stability", "build quality", "assembly", "value"],
+            },
+            "Standing Desk Mat": {
+                "features": ["Anti-fatigue cushioning", "Non-slip base",
+                             "Bevelled edges", "Easy to clean surface"],
+                "specs": {"Material": ["Polyurethane foam"],
+                          "Thickness": ["20mm", "25mm"],
+                          "Dimensions": ['20" x 32"', '24" x 36"']},
+                "uses": ["Standing desks", "Kitchens", "Long work sessions"],
+                "aspects": ["comfort", "durability", "grip", "value"],
+            },
+        },
+    },
+    "Pet Supplies": {
+        "brands": ["PawPal", "HappyTails", "NaturePet"],
+        "price": (7.0, 119.0),
+        "products": {
+            "Dog Food": {
+                "features": ["Vet recommended", "Grain-free recipe",
+                             "Real chicken as the first ingredient", "No artificial preservatives"],
+                "specs": {"Weight": ["2kg", "10kg", "15kg"],
+                          "Life stage": ["Puppy", "Adult", "Senior"],
+                          "Flavour": ["Chicken", "Lamb", "Salmon"]},
+                "uses": ["Dogs", "Sensitive stomachs", "Daily feeding"],
+                "aspects": ["pet approval", "ingredients", "digestion", "value"],
+            },
+            "Cat Scratching Post": {
+                "features": ["Sturdy sisal rope", "Weighted base", "Plush perch on top",
+                             "Dangling toy included"],
+                "specs": {"Height": ["60cm", "90cm"],
+                          "Material": ["Sisal", "Plush fabric"],
+                          "Base": ['16" x 16"']},
+                "uses": ["Cats", "Protecting furniture", "Indoor play"],
+                "aspects": ["pet approval", "stability", "durability", "size"],
+            },
+            "Pet Carrier": {
+                "features": ["Airline approved", "Mesh panels for ventilation",
+                             "For pets up to {weight} lbs", "Padded shoulder strap",
+                             "Washable fleece bed"],
+                "specs": {"Size": ["Small", "Medium"],
+                          "Material": ["Nylon", "Polyester"],
+                          "Max weight": ["15 lbs", "20 lbs"]},
+                "uses": ["Travel with pets", "Vet visits", "Cats"],
+                "aspects": ["ventilation", "size", "durability", "comfort"],
+            },
+            "Dog Bed": {
+                "features": ["Orthopedic memory foam", "Washable cover",
+                             "Non-slip bottom", "For dogs up to {weight} lbs"],
+                "specs": {"Size": ["Medium", "Large", "Extra large"],
+                          "Material": ["Memory foam", "Fleece"],
+                          "Cover": ["Removable, machine washable"]},
+                "uses": ["Dogs", "Senior dogs", "Crate training"],
+                "aspects": ["pet approval", "comfort", "washability", "size"],
+            },
+            "Cat Litter": {
+                "features": ["Clumping formula", "99% dust-free", "Odour control for 7 days",
+                             "Unscented"],
+                "specs": {"Weight": ["5kg", "10kg"],
+                          "Material": ["Clay", "Plant-based"],
+                          "Scent": ["Unscented", "Fresh scent"]},
+                "uses": ["Cats", "Multi-cat homes", "Small apartments"],
+                "aspects": ["odour control", "clumping", "dust", "value"],
+            },
+            "Chew Toys Set": {
+                "features": ["Non-toxic natural rubber", "Textured to clean teeth",
+                             "Treat-dispensing design", "Six toys per set"],
+                "specs": {"Size": ["Small", "Medium", "Large"],
+                          "Material": ["Natural rubber", "Nylon"],
+                          "Pieces": ["6"]},
+                "uses": ["Dogs", "Teething puppies", "Boredom"],
+                "aspects": ["pet approval", "durability", "size", "value"],
+            },
+        },
+    },
+    "Food & Grocery": {
+        "brands": ["Green Valley", "Roastery Co", "NutriBox"],
+        "price": (5.0, 59.0),
+        "products": {
+            "Organic Coffee Beans": {
+                "features": ["Certified organic", "Fair trade sourced",
+                             "Roasted in small batches", "Resealable packaging with valve"],
+                "specs": {"Net weight": ["250g", "500g", "1kg"],
+                          "Roast": ["Medium", "Dark"],
+                          "Origin": ["Colombia", "Ethiopia", "Single blend"]},
+                "uses": ["Breakfast", "Espresso", "Gifts"],
+                "aspects": ["taste", "freshness", "aroma", "value"],
+            },
+            "Protein Bars Box": {
+                "features": ["{grams}g protein per serving", "No artificial sweeteners",
+                             "Individually wrapped", "Gluten-free"],
+                "specs": {"Servings": ["12", "24"],
+                          "Flavour": ["Chocolate peanut", "Salted caramel"],
+                          "Dietary": ["Gluten-free", "Vegan"]},
+                "uses": ["Post-workout", "Snacking", "On the go"],
+                "aspects": ["taste", "texture", "protein content", "value"],
+            },
+            "Green Tea Collection": {
+                "features": ["Certified organic", "Six varieties", "Biodegradable tea bags",
+                             "Fair trade sourced"],
+                "specs": {"Servings": ["40", "60"],
+                          "Net weight": ["80g", "120g"],
+                          "Dietary": ["Vegan", "Caffeine-free options"]},
+                "uses": ["Breakfast", "Afternoon breaks", "Gifts"],
+                "aspects": ["taste", "variety", "freshness", "packaging"],
+            },
+            "Trail Mix": {
+                "features": ["Nuts, seeds and dried fruit", "No added sugar",
+                             "Resealable packaging", "{grams}g protein per serving"],
+                "specs": {"Net weight": ["250g", "500g"],
+                          "Servings": ["12", "24"],
+                          "Dietary": ["Vegan", "Keto friendly"]},
+                "uses": ["Snacking", "Hiking", "On the go"],
+                "aspects": ["taste", "freshness", "mix", "value"],
+            },
+            "Olive Oil": {
+                "features": ["Extra virgin, cold pressed", "Single-estate olives",
+                             "Dark glass bottle protects flavour", "Harvest date on every bottle"],
+                "specs": {"Volume": ["500ml", "1L"],
+                          "Origin": ["Greece", "Italy", "Spain"],
+                          "Acidity": ["<0.3%", "<0.5%"]},
+                "uses": ["Salad dressings", "Everyday cooking", "Gifts"],
+                "aspects": ["taste", "freshness", "packaging", "value"],
+            },
+            "Granola": {
+                "features": ["Whole grain oats", "Sweetened with honey",
+                             "{grams}g protein per serving", "Resealable packaging"],
+                "specs": {"Net weight": ["400g", "750g"],
+                          "Servings": ["10", "18"],
+                          "Dietary": ["Gluten-free", "Vegan"]},
+                "uses": ["Breakfast", "Snacking", "Yogurt topping"],
+                "aspects": ["taste", "crunch", "sweetness", "value"],
+            },
+        },
+    },
+}
+
+ADJECTIVES = ["Premium", "Classic", "Pro", "Essential", "Deluxe", "Compact", "Ultra", "Eco"]
+REVIEWER_FIRST_NAMES = [
+    "Sarah", "Mike", "Jennifer", "David", "Emily", "Michael", "Priya", "Tom", "Sophia",
+    "James", "Aisha", "Carlos", "Mei", "Lucas", "Olivia", "Raj", "Hannah", "Omar",
+]
+REVIEW_OPENERS = {
+    5: ["Absolutely love it!", "Best purchase this year.", "Exceeded my expectations."],
+    4: ["Really good overall.", "Very happy with this.", "Solid choice for the price."],
+    3: ["It's okay.", "Decent, but not perfect.", "Mixed feelings about this one."],
+    2: ["Disappointed.", "Not what I hoped for.", "Had some problems."],
+    1: ["Would not recommend.", "Stopped working quickly.", "Waste of money."],
+}
+REVIEW_ASPECTS = {
+    "good": ["The {aspect} {verb} excellent", "I'm impressed by the {aspect}",
+             "Great {aspect} for the price"],
+    "bad": ["The {aspect} could be better", "I had issues with the {aspect}",
+            "Not happy with the {aspect}"],
+}
+REVIEW_CLOSERS = {
+    5: ["Would buy again.", "Using it daily now.", "Already recommended it to friends.", ""],
+    4: ["Arrived quickly and well packaged.", "Would buy again.",
+        "Customer service was helpful.", ""],
+    3: ["Does the job for now.", "Might try another brand next time.", ""],
+    2: ["Customer service was slow to respond.", "Thinking about returning it.", ""],
+    1: ["Returned it after two weeks.", "Asked for a refund.", ""],
+}
+
+# Generated product numbers are six digits so they never clash with the
+# three-digit ids of the hand-authored pages
+GENERATED_ID_DIGITS = 6
+PAGE_BATCH_SIZE = 1000
+
+# SKU prefix per category, taken from its first hand-authored product
+CATEGORY_PREFIXES = {
+    category: products[0][0][:4] for category, products in CATEGORIES.items()
+}
+
+
+def _is_plural(
+    aspect: str,
+) -> bool:
+    """Whether a review aspect takes "are" ("brush heads", not "bass" or "softness")."""
+    return aspect.endswith("s") and not aspect.endswith("ss")
+
+
+def _rating_distribution(
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Probabilities of 1..5 stars for one product, skewed towards 4-5."""
+    mean = rng.uniform(2.8, 4.9)
+    stars = np.arange(1, 6)
+    # Concentrate mass around the mean; sharper for extreme means
+    weights = np.exp(-((stars - mean) ** 2) / rng.uniform(0.6, 1.4))
+    return weights / weights.sum()
+
+
+def _render_product_page(
+    number: int,
+    reviews_per_product: int,
+    rng: np.random.Generator,
+) -> tuple[str, str]:
+    """Return (product id, page text) for generated product ``number``.
+
+    The shown reviews are drawn from the product's full review histogram,
+    and the Average Rating is the mean of that histogram, so the two agree.
+    """
+    categories = list(CATEGORIES)
+    category = categories[number % len(categories)]
+    template = PAGE_TEMPLATES[category]
+
+    def pick(options: list) -> Any:
+        return options[int(rng.integers(len(options)))]
+
+    product_id = (
+        f"{CATEGORY_PREFIXES[category]}"
+        f"{number // len(categories):0{GENERATED_ID_DIGITS}d}"
+    )
+    noun = pick(list(template["products"]))
+    product = template["products"][noun]
+    name = f"{pick(ADJECTIVES)} {noun}"
+    brand = pick(template["brands"])
+    low, high = template["price"]
+    price = round(float(rng.uniform(low, high)), 0) - 0.01
+
+    fill = {
+        "hours": int(rng.integers(8, 61)), "ip": int(rng.integers(4, 9)),
+        "liters": round(float(rng.uniform(1.0, 6.5)), 1), "weight": int(rng.integers(1, 60)),
+        "modes": int(rng.integers(2, 6)), "colors": int(rng.integers(3, 13)),
+        "pages": int(rng.integers(150, 900)), "age": int(rng.integers(3, 13)),
+        "players": f"{int(rng.integers(1, 3))}-{int(rng.integers(4, 9))}",
+        "levels": int(rng.integers(3, 11)), "grams": int(rng.integers(10, 31)),
+    }
+    feature_count = min(len(product["features"]), int(rng.integers(4, 8)))
+    features = [
+        product["features"][i].format(**fill)
+        for i in rng.choice(len(product["features"]), feature_count, replace=False)
+    ]
+    specs = [f"{key}: {pick(values)}" for key, values in product["specs"].items()]
+    uses = [
+        product["uses"][i]
+        for i in rng.choice(len(product["uses"]), min(3, len(product["uses"])), replace=False)
+    ]
+    aspects = product["aspects"]
+    description = (
+        f"The {brand} {name} is built for {uses[0].lower()} and "
+        f"{uses[-1].lower()}. {features[0]}, {features[1].lower()} and "
+        f"{features[2].lower()} make it a dependable choice in {category}."
+    )
+
+    probabilities = _rating_distribution(rng)
+    review_count = max(int(rng.lognormal(5.5, 1.2)), reviews_per_product)
+    histogram = rng.multinomial(review_count, probabilities)
+    average = float((histogram * np.arange(1, 6)).sum() / review_count)
+    shown = np.repeat(np.arange(1, 6), histogram)
+    shown = rng.choice(shown, reviews_per_product, replace=False)
+
+    review_blocks = []
+    for index, stars in enumerate(shown, start=1):
+        stars = int(stars)
+        aspect = pick(aspects)
+        tone = "good" if stars >= 4 else "bad"
+        body = " ".join(part for part in (
+            pick(REVIEW_OPENERS[stars]),
+            pick(REVIEW_ASPECTS[tone]).format(
+                aspect=aspect, verb="are" if _is_plural(aspect) else "is"
+            ) + ".",
+            pick(REVIEW_CLOSERS[stars]),
+        ) if part)
+        reviewer = f"{pick(REVIEWER_FIRST_NAMES)} {chr(ord('A') + int(rng.integers(26)))}."
+        badge = "Verified Purchase" if rng.random() < 0.9 else "Unverified"
+        review_blocks.append(
+            f"Review {index} - {reviewer} ({badge}) - {stars} "
+            f"{'star' if stars == 1 else 'stars'}\n\"{body}\""
+        )
+
+    banner = "=" * 40
+    rule = "-" * 40
+    page = "\n".join([
+        banner,
+        f"{name.upper()} - PRODUCT PAGE",
+        banner,
+        "",
+        f"Product: {name}",
+        f"Brand: {brand}",
+        f"Price: ${price:.2f}",
+        f"SKU: {product_id}",
+        f"Category: {category}",
+        "",
+        "PRODUCT DESCRIPTION:",
+        description,
+        "",
+        "Key Features:",
+        *(f"- {feature}" for feature in features),
+        "",
+        "Technical Specifications:",
+        *(f"- {spec}" for spec in specs),
+        "",
+        "Best For:",
+        *(f"- {use}" for use in uses),
+        "",
+        "CUSTOMER REVIEWS:",
+        rule,
+        "",
+        "\n\n".join(review_blocks),
+        "",
+        f"Average Rating: {average:.1f}/5 ({review_count:,} reviews)",
+        rule,
+    ])
+    return product_id, page
+
+
+def _write_generated_pages(
+    task: tuple[str, int, int, int, int | None, int]
+) -> int:
+    """Write generated pages ``start`` to ``stop``; runs in a worker process.
+
+    Each batch seeds its own generator from (seed, start), so the output
+    does not depend on the number of workers.
+    """
+    output_dir, start, stop, reviews_per_product, seed, shard_size = task
+    rng = np.random.default_rng(None if seed is None else [seed, start])
+    for number in range(start, stop):
+        product_id, page = _render_product_page(number, reviews_per_product, rng)
+        directory = Path(output_dir)
+        if shard_size:
+            directory = directory / f"shard-{number // shard_size:05d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / f"{product_id}_product_page.txt", "w") as f:
+            f.write(page)
+    return stop - start
+
+
+def _generate_templated_pages(
+    output_dir: Path,
+    num_products: int,
+    reviews_per_product: int = 5,
+    seed: int | None = None,
+    workers: int | None = None,
+    shard_size: int = 0,
+) -> None:
+    """Generate ``num_products`` templated product pages across processes.
+
+    Products cycle through CATEGORIES. With ``shard_size`` set, pages are
+    written into ``shard-NNNNN`` subdirectories of that many pages each.
+    """
+    batch = min(shard_size, PAGE_BATCH_SIZE) if shard_size else PAGE_BATCH_SIZE
+    tasks = [
+        (str(output_dir), start, min(start + batch, num_products),
+         reviews_per_product, seed, shard_size)
+        for start in range(0, num_products, batch)
+    ]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        written = sum(map(_write_generated_pages, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            written = sum(pool.map(_write_generated_pages, tasks))
+    print(f"Generated {written} templated product pages in {output_dir}")
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--num-rows",
+        type=int,
+        default=1000,
+        help="Number of sales rows to generate (default: 1000)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Rows generated and written per chunk; bounds memory use",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for reproducible output",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Also write a memory-mappable columnar store next to the CSV",
+    )
+    parser.add_argument(
+        "--cube",
+        action="store_true",
+        help="Also write a precomputed day x product x region rollup cube",
+    )
+    parser.add_argument(
+        "--append-days",
+        type=int,
+        default=0,
+        help=(
+            "Append --num-rows rows spread over this many new days to the "
+            "existing CSV and update its sidecar index instead of regenerating"
+        ),
+    )
+    parser.add_argument(
+        "--num-products",
+        type=int,
+        default=0,
+        help="Also generate this many templated product pages",
+    )
+    parser.add_argument(
+        "--reviews-per-product",
+        type=int,
+        default=5,
+        help="Reviews shown on each templated page (default: 5)",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=0,
+        help="Write templated pages into subdirectories of this many pages",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes writing templated pages (default: CPU count)",
+    )
+    parser.add_argument(
+        "--pages-dir",
+        type=Path,
+        default=None,
+        help="Directory for product pages (default: data/unstructured)",
+    )
+    parser.add_argument(
+        "--pages-only",
+        action="store_true",
+        help="Only generate product pages; leave the sales data untouched",
+    )
+    args = parser.parse_args()
+    if args.append_days and (args.columnar or args.cube):
+        parser.error("--append-days cannot be combined with --columnar or --cube")
+    return args
+
+
+def _generate_pages(
+    output_dir: Path,
+    args: argparse.Namespace,
+) -> None:
+    """Write the hand-authored pages and any requested templated pages."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    _generate_product_pages(output_dir)
+    if args.num_products:
+        _generate_templated_pages(
+            output_dir,
+            args.num_products,
+            reviews_per_product=args.reviews_per_product,
+            seed=args.seed,
+            workers=args.workers,
+            shard_size=args.shard_size,
+        )
+
+
 def main() -> None:
     """Main function to generate all data."""
+    args = _parse_args()
     base_dir = Path(__file__).parent.parent / "data"
 
-    # Generate CSV
     csv_path = base_dir / "structured" / "daily_sales.csv"
-    _generate_sales_csv(csv_path, num_rows=1000)
+    unstructured_dir = args.pages_dir or base_dir / "unstructured"
+    if args.pages_only:
+        _generate_pages(unstructured_dir, args)
+        return
+
+    if args.append_days:
+        _append_sales_days(
+            csv_path,
+            num_days=args.append_days,
+            num_rows=args.num_rows,
+            chunk_size=args.chunk_size,
+            seed=args.seed,
+        )
+        return
 
-    # Generate product pages
-    unstructured_dir = base_dir / "unstructured"
-    _generate_product_pages(unstructured_dir)
+    # Generate CSV
+    _generate_sales_csv(
+        csv_path,
+        num_rows=args.num_rows,
+        chunk_size=args.chunk_size,
+        seed=args.seed,
+        columnar_dir=(
+            base_dir / "structured" / "daily_sales_columnar"
+            if args.columnar
+            else None
+        ),
+        cube_path=(
+            base_dir / "structured" / "daily_sales_cube.npz"
+            if args.cube
+            else None
+        ),
+    )
+
+    _generate_pages(unstructured_dir, args)
 
     print("\nData generation complete!")
     print(f"CSV file: {csv_path}")
@@ -0,0 +1 @@
+"""Retrieval, routing and data-access components for the Advanced RAG assignment."""
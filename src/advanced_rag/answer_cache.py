@@ -0,0 +1,275 @@
+"""
+Semantic cache for LLM answers.
+
+Near-identical questions ("which region sells the most?", "Which region
+has the highest sales?") should not each cost an LLM round-trip. Answers
+are stored in SQLite with the question's embedding and a hash of the
+context they were generated from. A lookup:
+
+1. tries an exact match on the normalized question (no embedding needed)
+2. otherwise embeds the question and takes cached questions whose cosine
+   similarity is at least ``threshold``, best first
+3. accepts the first candidate with the same model and context hash that
+   is younger than ``ttl`` seconds
+
+Because the context hash must match, a changed row in daily_sales.csv or
+an edited code file changes the retrieved context and misses the cache
+instead of returning a stale answer. The cache holds at most
+``max_entries`` answers, evicting the least recently used.
+
+Example::
+
+    cache = AnswerCache()
+    answer = cache.get_or_compute(
+        question, context, lambda: ask_llm(question, context), model=LLM_MODEL
+    )
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from advanced_rag.cache import normalize_query
+from advanced_rag.embedding_cache import CachedEncoder
+
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+CACHE_PATH = DATA_DIR / "index" / "answer_cache.sqlite"
+
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_TTL = 24 * 3600.0
+DEFAULT_MAX_ENTRIES = 10_000
+# Expired entries are swept at most this often (and whenever the cache is full)
+EXPIRY_INTERVAL = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    id INTEGER PRIMARY KEY,
+    query TEXT NOT NULL,
+    normalized TEXT NOT NULL,
+    model TEXT NOT NULL,
+    context_hash TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    embedding BLOB NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS answers_exact ON answers (normalized, model, context_hash);
+CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used);
+CREATE INDEX IF NOT EXISTS answers_created ON answers (created);
+"""
+
+
+@dataclass
+class CachedAnswer:
+    """A cache hit."""
+
+    answer: str
+    query: str
+    similarity: float
+    age: float
+
+
+def context_hash(
+    context: str | Sequence[str]
+) -> str:
+    """SHA-256 of the retrieved context an answer was generated from."""
+    parts = [context] if isinstance(context, str) else list(context)
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class AnswerCache:
+    """SQLite-backed semantic answer cache."""
+
+    def __init__(
+        self,
+        path: Path = CACHE_PATH,
+        encoder: SentenceTransformer | CachedEncoder | None = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        if encoder is None:
+            from advanced_rag.product_index import DEFAULT_MODEL
+
+            encoder = CachedEncoder(DEFAULT_MODEL)
+        self.encoder = encoder
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._expire()
+
+        # Question embeddings held in memory for the similarity scan
+        rows = self._db.execute("SELECT id, embedding FROM answers ORDER BY id").fetchall()
+        self._ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self._matrix = (
+            np.stack([np.frombuffer(row[1], dtype=np.float16) for row in rows]).astype(np.float32)
+            if rows else None
+        )
+
+    def _embed(
+        self,
+        query: str,
+    ) -> np.ndarray:
+        return np.asarray(
+            self.encoder.encode([query], normalize_embeddings=True, show_progress_bar=False)[0],
+            dtype=np.float32,
+        )
+
+    def _expire(self) -> None:
+        """Delete expired entries and trim to max_entries by last use."""
+        now = time.time()
+        self._next_expiry = now + min(self.ttl, EXPIRY_INTERVAL)
+        with self._db:
+            self._db.execute("DELETE FROM answers WHERE created < ?", (now - self.ttl,))
+            self._db.execute(
+                "DELETE FROM answers WHERE id NOT IN "
+                "(SELECT id FROM answers ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def _drop_missing(self) -> None:
+        """Remove in-memory rows whose entries were deleted."""
+        if self._matrix is None:
+            return
+        alive = {row[0] for row in self._db.execute("SELECT id FROM answers")}
+        keep = np.array([row_id in alive for row_id in self._ids], dtype=bool)
+        self._ids, self._matrix = self._ids[keep], self._matrix[keep]
+        if not len(self._ids):
+            self._matrix = None
+
+    def _hit(
+        self,
+        row_id: int,
+        answer: str,
+        query: str,
+        similarity: float,
+        created: float,
+    ) -> CachedAnswer:
+        now = time.time()
+        with self._db:
+            self._db.execute(
+                "UPDATE answers SET last_used = ?, hits = hits + 1 WHERE id = ?",
+                (now, row_id),
+            )
+        self.hits += 1
+        return CachedAnswer(answer, query, similarity, now - created)
+
+    def get(
+        self,
+        query: str,
+        context_digest: str,
+        model: str = "",
+    ) -> CachedAnswer | None:
+        """A cached answer for ``query`` generated from the same context, or None.
+
+        The query is embedded outside the lock, and only when no exact match
+        exists, so a slow encoder does not block other lookups and puts.
+        """
+        normalized = normalize_query(query)
+        oldest = time.time() - self.ttl
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, answer, query, created FROM answers WHERE normalized = ? "
+                "AND model = ? AND context_hash = ? AND created >= ? "
+                "ORDER BY created DESC LIMIT 1",
+                (normalized, model, context_digest, oldest),
+            ).fetchone()
+            if row is not None:
+                return self._hit(row[0], row[1], row[2], 1.0, row[3])
+            if self._matrix is None:
+                self.misses += 1
+                return None
+
+        embedding = self._embed(query)
+        with self._lock:
+            if self._matrix is None:
+                self.misses += 1
+                return None
+            similarities = self._matrix @ embedding
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            for position in candidates[np.argsort(-similarities[candidates])]:
+                row = self._db.execute(
+                    "SELECT id, answer, query, created FROM answers WHERE id = ? "
+                    "AND model = ? AND context_hash = ? AND created >= ?",
+                    (int(self._ids[position]), model, context_digest, oldest),
+                ).fetchone()
+                if row is not None:
+                    return self._hit(
+                        row[0], row[1], row[2], float(similarities[position]), row[3]
+                    )
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        query: str,
+        context_digest: str,
+        answer: str,
+        model: str = "",
+    ) -> None:
+        """Store an answer, evicting expired and least recently used entries."""
+        embedding = self._embed(query)
+        now = time.time()
+        with self._lock:
+            with self._db:
+                cursor = self._db.execute(
+                    "INSERT INTO answers (query, normalized, model, context_hash, answer, "
+                    "embedding, created, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        query,
+                        normalize_query(query),
+                        model,
+                        context_digest,
+                        answer,
+                        embedding.astype(np.float16).tobytes(),
+                        now,
+                        now,
+                    ),
+                )
+            self._ids = np.append(self._ids, cursor.lastrowid)
+            row = embedding.astype(np.float16).astype(np.float32)[None, :]
+            self._matrix = row if self._matrix is None else np.vstack([self._matrix, row])
+
+            if len(self._ids) > self.max_entries or now >= self._next_expiry:
+                self._expire()
+                self._drop_missing()
+
+    def get_or_compute(
+        self,
+        query: str,
+        context: str | Sequence[str],
+        compute: Callable[[], str],
+        model: str = "",
+    ) -> str:
+        """Return a cached answer or call ``compute`` and cache its result."""
+        digest = context_hash(context)
+        cached = self.get(query, digest, model)
+        if cached is not None:
+            return cached.answer
+        answer = compute()
+        self.put(query, digest, answer, model)
+        return answer
+
+    def close(self) -> None:
+        self._db.close()
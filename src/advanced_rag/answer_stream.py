@@ -0,0 +1,337 @@
+"""
+Streaming answer generation: Router -> retrieve -> LLM, token by token.
+
+For interactive use the time to the first answer token matters more than
+the total latency. AnswerStreamer yields events as the pipeline makes
+progress:
+
+- ``route``: the router's decision
+- ``source``: each retrieval source's result, as soon as it finishes
+- ``context``: the packed context the answer is generated from
+- ``token``: a piece of the answer, streamed from ``litellm``
+- ``error``: generation failed; the answer so far is kept
+- ``done``: a StreamSummary with the full answer and timings
+
+Generation does not wait for the slowest source. It starts once every
+source of the route has finished, or ``grace`` seconds after the first
+successful result, whichever comes first. Sources that finish later are
+still reported (``late=True``) but are not in the context. A cache hit in
+the optional AnswerCache is delivered as a single token without calling
+the LLM.
+
+Example::
+
+    streamer = AnswerStreamer(executor, router, itemizers={"text": text_items})
+    async for event in streamer.astream("Which region sells the most?"):
+        if event.kind == EVENT_TOKEN:
+            print(event.data, end="", flush=True)
+
+    for event in streamer.stream(question):  # outside an event loop
+        ...
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+import litellm
+
+from advanced_rag.answer_cache import AnswerCache, context_hash
+from advanced_rag.context_packer import (
+    ContextItem,
+    ContextPacker,
+    PackingCombiner,
+    count_tokens,
+)
+from advanced_rag.executor import ROUTE_SOURCES, MultiSourceExecutor
+from advanced_rag.router import DEFAULT_LLM_MODEL, QueryRouter
+from advanced_rag.tracing import count, span, tracer
+
+
+DEFAULT_GRACE = 0.25
+DEFAULT_MAX_TOKENS = 512
+
+EVENT_ROUTE = "route"
+EVENT_SOURCE = "source"
+EVENT_CONTEXT = "context"
+EVENT_TOKEN = "token"
+EVENT_ERROR = "error"
+EVENT_DONE = "done"
+
+SYSTEM_PROMPT = (
+    "Answer the question using only the provided context. "
+    "If the context does not contain the answer, say so. "
+    "Mention any data source that was unavailable."
+)
+
+
+@dataclass
+class StreamEvent:
+    """One step of a streamed answer; ``elapsed`` is seconds since the query."""
+
+    kind: str
+    data: Any = None
+    elapsed: float = 0.0
+    late: bool = False
+
+
+@dataclass
+class StreamSummary:
+    """The final event of a streamed answer."""
+
+    answer: str
+    route: str
+    sources: list[str] = field(default_factory=list)
+    late_sources: list[str] = field(default_factory=list)
+    context_tokens: int = 0
+    cached: bool = False
+    time_to_context: float = 0.0
+    time_to_first_token: float | None = None
+    total: float = 0.0
+
+
+def build_messages(
+    query: str,
+    context: str,
+) -> list[dict[str, str]]:
+    """Chat messages asking the LLM to answer ``query`` from ``context``."""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {query}"},
+    ]
+
+
+class AnswerStreamer:
+    """Stream retrieval results and answer tokens for one query at a time."""
+
+    def __init__(
+        self,
+        executor: MultiSourceExecutor,
+        router: QueryRouter | None = None,
+        packer: ContextPacker | None = None,
+        itemizers: Mapping[str, Callable[[Any], Iterable[ContextItem]]] | None = None,
+        formatters: Mapping[str, Callable[[Any], str]] | None = None,
+        llm_model: str = DEFAULT_LLM_MODEL,
+        grace: float = DEFAULT_GRACE,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        cache: AnswerCache | None = None,
+    ) -> None:
+        self.executor = executor
+        self.router = router
+        self.packer = packer or ContextPacker()
+        self.itemizers = dict(itemizers or {})
+        self.formatters = dict(formatters or {})
+        self.llm_model = llm_model
+        self.grace = grace
+        self.max_tokens = max_tokens
+        self.cache = cache
+
+    async def _collect(
+        self,
+        query: str,
+        sources: list[str],
+        results: asyncio.Queue,
+    ) -> None:
+        """Feed source results into ``results``; None marks the end."""
+        try:
+            async for result in self.executor.stream(query, sources):
+                await results.put(result)
+        finally:
+            await results.put(None)
+
+    async def astream(
+        self,
+        query: str,
+        route: str | None = None,
+    ) -> AsyncIterator[StreamEvent]:
+        """Yield StreamEvents for ``query``; ``route`` skips the router.
+
+        The query is traced as one ``answer_stream`` request, so the events
+        must be consumed from a single task (as ``stream`` does).
+        """
+        with tracer.request("answer_stream", query=query, route=route):
+            async for event in self._astream(query, route):
+                yield event
+
+    async def _astream(
+        self,
+        query: str,
+        route: str | None,
+    ) -> AsyncIterator[StreamEvent]:
+        start = time.perf_counter()
+
+        def event(kind: str, data: Any = None, late: bool = False) -> StreamEvent:
+            return StreamEvent(kind, data, time.perf_counter() - start, late)
+
+        if route is None:
+            if self.router is None:
+                raise ValueError("A route is required when no router is configured")
+            decision = await asyncio.to_thread(self.router.route, query)
+            route = decision.route
+            yield event(EVENT_ROUTE, decision)
+        sources = ROUTE_SOURCES.get(route, list(self.executor.sources))
+        summary = StreamSummary(answer="", route=route)
+
+        results: asyncio.Queue = asyncio.Queue()
+        collector = asyncio.create_task(self._collect(query, sources, results))
+        combiner = PackingCombiner(query, self.packer, self.itemizers, self.formatters)
+        finished = False
+        first_ok: float | None = None
+        try:
+            # Gather context until all sources are in or the grace period ends
+            while True:
+                timeout = None
+                if first_ok is not None:
+                    timeout = max(first_ok + self.grace - time.perf_counter(), 0)
+                try:
+                    result = await asyncio.wait_for(results.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if result is None:
+                    finished = True
+                    break
+                combiner.add(result)
+                summary.sources.append(result.source)
+                if result.ok and first_ok is None:
+                    first_ok = time.perf_counter()
+                yield event(EVENT_SOURCE, result)
+
+            with span("packing"):
+                context = combiner.render()
+            summary.context_tokens = combiner.packed.tokens
+            summary.time_to_context = time.perf_counter() - start
+            yield event(EVENT_CONTEXT, combiner.packed)
+
+            digest = context_hash(context)
+            cached = None
+            if self.cache is not None:
+                cached = await asyncio.to_thread(
+                    self.cache.get, query, digest, self.llm_model
+                )
+
+            pieces = []
+            if cached is not None:
+                summary.cached = True
+                summary.time_to_first_token = time.perf_counter() - start
+                pieces.append(cached.answer)
+                yield event(EVENT_TOKEN, cached.answer)
+            else:
+                messages = build_messages(query, context)
+                count("tokens_sent", sum(count_tokens(m["content"]) for m in messages))
+                generation_start = time.perf_counter()
+                try:
+                    response = await litellm.acompletion(
+                        model=self.llm_model,
+                        messages=messages,
+                        temperature=0,
+                        max_tokens=self.max_tokens,
+                        stream=True,
+                    )
+                    async for chunk in response:
+                        while not finished and not results.empty():
+                            late = results.get_nowait()
+                            if late is None:
+                                finished = True
+                            else:
+                                summary.late_sources.append(late.source)
+                                yield event(EVENT_SOURCE, late, late=True)
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if not delta:
+                            continue
+                        if summary.time_to_first_token is None:
+                            summary.time_to_first_token = time.perf_counter() - start
+                            tracer.record(
+                                "generation.first_token",
+                                time.perf_counter() - generation_start,
+                            )
+                        pieces.append(delta)
+                        yield event(EVENT_TOKEN, delta)
+                except Exception as exc:
+                    yield event(EVENT_ERROR, f"{type(exc).__name__}: {exc}")
+                else:
+                    tracer.record("generation", time.perf_counter() - generation_start)
+                    count("stream_chunks", len(pieces))
+                    if self.cache is not None:
+                        await asyncio.to_thread(
+                            self.cache.put, query, digest, "".join(pieces), self.llm_model
+                        )
+            summary.answer = "".join(pieces)
+
+            while not finished:
+                late = await results.get()
+                if late is None:
+                    break
+                summary.late_sources.append(late.source)
+                yield event(EVENT_SOURCE, late, late=True)
+
+            summary.total = time.perf_counter() - start
+            yield event(EVENT_DONE, summary)
+        finally:
+            collector.cancel()
+
+    def stream(
+        self,
+        query: str,
+        route: str | None = None,
+    ) -> Iterator[StreamEvent]:
+        """Blocking generator over astream for callers outside an event loop.
+
+        One task drives astream from start to finish, so the request trace
+        it opens covers every step.
+        """
+        loop = asyncio.new_event_loop()
+        events: asyncio.Queue = asyncio.Queue(maxsize=1)
+        closing = asyncio.Event()
+        end = object()
+
+        async def pump() -> None:
+            generator = self.astream(query, route)
+            try:
+                async for event in generator:
+                    await events.put(event)
+                    if closing.is_set():
+                        return
+            except Exception as exc:
+                await events.put(exc)
+                return
+            finally:
+                await generator.aclose()
+            await events.put(end)
+
+        async def drain() -> None:
+            # The cancellation can be absorbed by a wait_for inside astream,
+            # so keep taking events until the pump sees ``closing``
+            closing.set()
+            task.cancel()
+            while not task.done():
+                getter = asyncio.ensure_future(events.get())
+                await asyncio.wait([task, getter], return_when=asyncio.FIRST_COMPLETED)
+                getter.cancel()
+
+        task = loop.create_task(pump())
+        try:
+            while True:
+                item = loop.run_until_complete(events.get())
+                if item is end:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            loop.run_until_complete(drain())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def answer(
+        self,
+        query: str,
+        route: str | None = None,
+    ) -> StreamSummary:
+        """Consume the stream and return its summary."""
+        summary = None
+        for event in self.stream(query, route):
+            if event.kind == EVENT_DONE:
+                summary = event.data
+        return summary
@@ -0,0 +1,230 @@
+"""
+Persistent bash worker pool for the Part 1 retrieval tools.
+
+Part 1 answers questions about ``mcp-gateway-registry`` by running
+``grep``/``find``/``cat``/``tree`` against the clone. Instead of starting a
+new subprocess (and shell) for each step, BashToolPool keeps a few
+long-lived ``bash`` workers whose working directory is the target
+repository and feeds them commands over stdin.
+
+Output is bounded at the pipe: every command is wrapped as
+``{ cmd; } 2>&1 | head -c N``, so a runaway ``grep -r`` is stopped by
+SIGPIPE instead of being buffered in full, and the result is flagged as
+truncated. Wall time is recorded for every command so the tools that
+dominate latency show up in timing_report().
+
+Example::
+
+    with BashToolPool(Path("mcp-gateway-registry")) as pool:
+        results = pool.run_many([
+            "cat pyproject.toml",
+            "find . -name 'main.py' -not -path '*/node_modules/*'",
+            "grep -rn '@router' registry --include='*.py'",
+        ])
+        print(pool.timing_report())
+"""
+
+import os
+import queue
+import select
+import shlex
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_OUTPUT_BYTES = 64 * 1024
+DEFAULT_TIMEOUT = 30.0
+
+_READ_SIZE = 64 * 1024
+
+
+@dataclass
+class ToolResult:
+    """The captured result of one bash command.
+
+    A truncated command is usually stopped by SIGPIPE, in which case
+    ``exit_code`` is 141 rather than the command's own status.
+    """
+
+    command: str
+    output: str
+    exit_code: int | None
+    elapsed: float
+    truncated: bool = False
+    timed_out: bool = False
+
+
+class _BashWorker:
+    """One long-lived bash process executing commands sent over stdin."""
+
+    def __init__(
+        self,
+        cwd: Path,
+    ) -> None:
+        self.cwd = cwd
+        self.process = subprocess.Popen(
+            ["bash", "--noprofile", "--norc"],
+            cwd=cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        self._fd = self.process.stdout.fileno()
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(
+        self,
+        command: str,
+        max_output_bytes: int,
+        timeout: float,
+    ) -> tuple[bytes, int | None, bool]:
+        """Run ``command``; return (output, exit code, timed out).
+
+        At most ``max_output_bytes + 1`` bytes of output are produced, so
+        the caller can tell whether the output was cut.
+        """
+        marker = f"__TOOL_DONE_{uuid.uuid4().hex}__".encode()
+        script = (
+            f"cd {shlex.quote(str(self.cwd))}\n"
+            f"{{ {command}\n}} 2>&1 < /dev/null | head -c {max_output_bytes + 1}\n"
+            f"printf '\\n%s %s\\n' {marker.decode()} \"${{PIPESTATUS[0]}}\"\n"
+        )
+        self.process.stdin.write(script.encode())
+        self.process.stdin.flush()
+
+        buffer = bytearray()
+        deadline = time.monotonic() + timeout
+        while True:
+            end = buffer.rfind(marker)
+            if end != -1 and buffer.endswith(b"\n") and end < len(buffer) - 1:
+                status = buffer[end + len(marker):].strip()
+                # Drop the newline printed before the marker
+                output = bytes(buffer[:max(end - 1, 0)])
+                return output, int(status) if status.isdigit() else None, False
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.kill()
+                return bytes(buffer), None, True
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if ready:
+                chunk = os.read(self._fd, _READ_SIZE)
+                if not chunk:
+                    return bytes(buffer), self.process.poll(), False
+                buffer.extend(chunk)
+
+    def kill(self) -> None:
+        """Kill the worker and everything it started."""
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.process.wait()
+
+
+class BashToolPool:
+    """A pool of persistent bash workers rooted at a repository."""
+
+    def __init__(
+        self,
+        repo_dir: Path,
+        workers: int = DEFAULT_WORKERS,
+        max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        self.repo_dir = repo_dir.resolve()
+        self.max_output_bytes = max_output_bytes
+        self.timeout = timeout
+        self._idle: queue.Queue[_BashWorker] = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(_BashWorker(self.repo_dir))
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="bash-tool"
+        )
+        self._timings: dict[str, list[float]] = defaultdict(list)
+        self._timings_lock = threading.Lock()
+
+    def run(
+        self,
+        command: str,
+        max_output_bytes: int | None = None,
+        timeout: float | None = None,
+    ) -> ToolResult:
+        """Run one command on an idle worker."""
+        limit = max_output_bytes or self.max_output_bytes
+        worker = self._idle.get()
+        start = time.perf_counter()
+        try:
+            output, exit_code, timed_out = worker.run(
+                command, limit, timeout or self.timeout
+            )
+        finally:
+            if not worker.alive():
+                worker = _BashWorker(self.repo_dir)
+            self._idle.put(worker)
+        elapsed = time.perf_counter() - start
+
+        tool = command.split(maxsplit=1)[0] if command.strip() else ""
+        with self._timings_lock:
+            self._timings[tool].append(elapsed)
+
+        return ToolResult(
+            command=command,
+            output=output[:limit].decode("utf-8", errors="replace"),
+            exit_code=exit_code,
+            elapsed=elapsed,
+            truncated=len(output) > limit,
+            timed_out=timed_out,
+        )
+
+    def run_many(
+        self,
+        commands: Sequence[str],
+        max_output_bytes: int | None = None,
+        timeout: float | None = None,
+    ) -> list[ToolResult]:
+        """Run independent commands concurrently; results keep input order."""
+        futures = [
+            self._executor.submit(self.run, command, max_output_bytes, timeout)
+            for command in commands
+        ]
+        return [future.result() for future in futures]
+
+    def timing_report(self) -> dict[str, dict[str, float]]:
+        """Per-tool call count and total/mean/max wall time in seconds."""
+        with self._timings_lock:
+            return {
+                tool: {
+                    "calls": len(times),
+                    "total": sum(times),
+                    "mean": sum(times) / len(times),
+                    "max": max(times),
+                }
+                for tool, times in sorted(
+                    self._timings.items(), key=lambda item: -sum(item[1])
+                )
+            }
+
+    def close(self) -> None:
+        """Stop all workers."""
+        self._executor.shutdown(wait=True)
+        while not self._idle.empty():
+            self._idle.get().kill()
+
+    def __enter__(self) -> "BashToolPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
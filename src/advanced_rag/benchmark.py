@@ -0,0 +1,542 @@
+"""
+End-to-end latency benchmark for the Part 1 and Part 2 pipelines.
+
+Replays the README question sets, plus synthetic variants of them, through
+both pipelines with a local stub LLM in place of the ``litellm`` call, so
+runs are repeatable and cost nothing. Every query is split into stages:
+
+- ``routing``: Part 1 question classification or the Part 2 QueryRouter
+- ``retrieval``: prepared symbol answers / trigram search, or the
+  concurrent CSV and product-page sources
+- ``rerank``: CrossEncoderReranker over the retrieved chunks
+- ``packing``: ContextPacker into the prompt budget
+- ``generation``: the stub LLM, whose delay grows with the prompt size
+
+The report has p50/p95/p99 latency per stage and end to end, and
+throughput at several concurrency levels. Results are written as JSON; pass
+an earlier result file to ``--compare`` to print the change per stage.
+
+Example::
+
+    python -m advanced_rag.benchmark --repo mcp-gateway-registry --output bench.json
+    python -m advanced_rag.benchmark --part 2 --compare bench.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import re
+import subprocess
+import time
+from bisect import bisect_right
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from advanced_rag.answer_stream import build_messages
+from advanced_rag.code_chunker import CodeChunk
+from advanced_rag.code_search import TrigramIndex
+from advanced_rag.code_symbols import QUESTION_PATTERNS, SymbolIndex
+from advanced_rag.context_packer import (
+    ContextItem,
+    ContextPacker,
+    PackingCombiner,
+    count_tokens,
+    item_from_code_chunk,
+    item_from_retrieved,
+)
+from advanced_rag.executor import ROUTE_SOURCES, MultiSourceExecutor
+from advanced_rag.reranker import CrossEncoderReranker
+from advanced_rag.router import QueryRouter
+from advanced_rag.tracing import tracer
+
+
+STAGES = ("routing", "retrieval", "rerank", "packing", "generation")
+DEFAULT_VARIANTS = 24
+DEFAULT_CONCURRENCY = (1, 4, 16)
+PERCENTILES = (50, 95, 99)
+
+PART1_QUESTIONS = [
+    "What Python dependencies does this project use?",
+    "What is the main entry point file for the registry service?",
+    "What programming languages and file types are used in this repository? "
+    "(e.g., Python, TypeScript, YAML, JSON, Dockerfile, etc.)",
+    "How does the authentication flow work, from token validation to user authorization?",
+    "What are all the API endpoints available in the registry service and what scopes "
+    "do they require?",
+    "How would you add support for a new OAuth provider (e.g., Okta) to the authentication "
+    "system? What files would need to be modified and what interfaces must be implemented?",
+]
+
+PART2_QUESTIONS = [
+    "What was the total revenue for Electronics category in December 2024?",
+    "Which region had the highest sales volume?",
+    "What are the key features of the Wireless Bluetooth Headphones?",
+    "What do customers say about the Air Fryer's ease of cleaning?",
+    "Which product has the best customer reviews and how well is it selling?",
+    "I want a product for fitness that is highly rated and sells well in the West region. "
+    "What do you recommend?",
+]
+
+# Phrases swapped for alternatives when generating question variants
+SUBSTITUTIONS = {
+    "Electronics": ["Clothing", "Home & Kitchen", "Sports & Outdoors", "Books"],
+    "December": ["October", "November"],
+    "West": ["East", "North", "South", "Central"],
+    "Wireless Bluetooth Headphones": ["Ergonomic Office Chair", "Yoga Mat", "Air Fryer"],
+    "Air Fryer": ["Electric Toothbrush", "Camping Tent", "Office Chair"],
+    "ease of cleaning": ["noise level", "build quality", "battery life"],
+    "fitness": ["cooking", "the office", "pets"],
+    "Okta": ["Auth0", "Keycloak", "GitHub"],
+    "authentication": ["authorization", "login"],
+    "registry service": ["gateway", "auth server"],
+}
+PREFIXES = ["", "Quick question: ", "Can you tell me ", "I'd like to know: "]
+
+_STOPWORDS = frozenset(
+    "what which where when does this that with from would have they their there "
+    "about into them work file files used must need needs like tell know".split()
+)
+
+
+def question_variants(
+    questions: Sequence[str],
+    count: int,
+    seed: int = 0,
+) -> list[str]:
+    """Reworded copies of ``questions`` with swapped entities and prefixes."""
+    rng = random.Random(seed)
+    variants = []
+    for i in range(count):
+        question = questions[i % len(questions)]
+        for phrase, alternatives in SUBSTITUTIONS.items():
+            if phrase in question and rng.random() < 0.7:
+                question = question.replace(phrase, rng.choice(alternatives))
+        prefix = rng.choice(PREFIXES)
+        if prefix:
+            question = prefix + question[0].lower() + question[1:]
+        if rng.random() < 0.3:
+            question = question.rstrip("?").lower()
+        variants.append(question)
+    return variants
+
+
+class StubLLM:
+    """A local stand-in for the answer LLM with a latency model.
+
+    A call sleeps for prompt prefill, time to first token, and decoding of
+    ``answer_tokens`` tokens, then returns a fixed answer.
+    """
+
+    def __init__(
+        self,
+        first_token: float = 0.05,
+        prefill_tokens_per_second: float = 20_000.0,
+        tokens_per_second: float = 500.0,
+        answer_tokens: int = 80,
+    ) -> None:
+        self.first_token = first_token
+        self.prefill_tokens_per_second = prefill_tokens_per_second
+        self.tokens_per_second = tokens_per_second
+        self.answer_tokens = answer_tokens
+
+    def complete(
+        self,
+        messages: Sequence[Mapping[str, str]],
+    ) -> str:
+        prompt_tokens = sum(count_tokens(message["content"]) for message in messages)
+        time.sleep(
+            self.first_token
+            + prompt_tokens / self.prefill_tokens_per_second
+            + self.answer_tokens / self.tokens_per_second
+        )
+        return " ".join(["answer"] * self.answer_tokens)
+
+
+@dataclass
+class QueryTiming:
+    """Seconds spent per stage for one query."""
+
+    question: str
+    stages: dict[str, float] = field(default_factory=dict)
+    context_tokens: int = 0
+
+    @property
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+
+class _Timer:
+    """Records stage durations into a QueryTiming."""
+
+    def __init__(
+        self,
+        timing: QueryTiming,
+    ) -> None:
+        self.timing = timing
+
+    def __call__(
+        self,
+        stage: str,
+        function: Callable,
+        *args,
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.timing.stages[stage] = (
+                self.timing.stages.get(stage, 0.0) + time.perf_counter() - start
+            )
+
+
+class CodePipeline:
+    """Part 1: prepared symbol answers, else trigram search over code chunks."""
+
+    def __init__(
+        self,
+        symbols: SymbolIndex,
+        trigrams: TrigramIndex,
+        chunks: Sequence[CodeChunk],
+        llm: StubLLM,
+        reranker: CrossEncoderReranker | None = None,
+        packer: ContextPacker | None = None,
+        max_candidates: int = 30,
+    ) -> None:
+        self.symbols = symbols
+        self.trigrams = trigrams
+        self.llm = llm
+        self.reranker = reranker
+        self.packer = packer or ContextPacker()
+        self.max_candidates = max_candidates
+        self._starts: dict[str, list[int]] = {}
+        self._chunks: dict[str, list[CodeChunk]] = {}
+        for chunk in sorted(chunks, key=lambda chunk: (chunk.path, chunk.start_line)):
+            self._starts.setdefault(chunk.path, []).append(chunk.start_line)
+            self._chunks.setdefault(chunk.path, []).append(chunk)
+
+    def classify(
+        self,
+        question: str,
+    ) -> str | None:
+        return next(
+            (key for key, pattern in QUESTION_PATTERNS if pattern.search(question)), None
+        )
+
+    def search(
+        self,
+        question: str,
+    ) -> list[CodeChunk]:
+        """Chunks containing the most distinct question keywords."""
+        keywords = {
+            word.lower() for word in re.findall(r"[A-Za-z_]{4,}", question)
+        } - _STOPWORDS
+        hits: dict[tuple[str, int], set[str]] = {}
+        for keyword in keywords:
+            for match in self.trigrams.search(keyword, ignore_case=True, max_results=200):
+                starts = self._starts.get(match.path)
+                if not starts:
+                    continue
+                position = bisect_right(starts, match.line_number) - 1
+                if position >= 0:
+                    hits.setdefault((match.path, position), set()).add(keyword)
+        ranked = sorted(hits, key=lambda key: -len(hits[key]))[:self.max_candidates]
+        return [self._chunks[path][position] for path, position in ranked]
+
+    def run(
+        self,
+        question: str,
+    ) -> QueryTiming:
+        with tracer.request("part1", question=question):
+            return self._run(question)
+
+    def _run(
+        self,
+        question: str,
+    ) -> QueryTiming:
+        timing = QueryTiming(question)
+        timed = _Timer(timing)
+        key = timed("routing", self.classify, question)
+        if key is not None:
+            items = [ContextItem(timed("retrieval", self.symbols.answers.get, key), 1.0, key)]
+        else:
+            chunks = timed("retrieval", self.search, question)
+            if self.reranker is not None:
+                ranked = timed("rerank", self.reranker.rerank, question, chunks)
+                items = [item_from_code_chunk(entry.item, entry.score) for entry in ranked]
+            else:
+                items = [
+                    item_from_code_chunk(chunk, 1.0 / (rank + 1))
+                    for rank, chunk in enumerate(chunks)
+                ]
+        packed = timed("packing", self.packer.pack, items, question)
+        timing.context_tokens = packed.tokens
+        timed("generation", self.llm.complete, build_messages(question, packed.text))
+        return timing
+
+
+class ProductPipeline:
+    """Part 2: routed CSV and product-page sources run concurrently."""
+
+    def __init__(
+        self,
+        router: QueryRouter,
+        executor: MultiSourceExecutor,
+        llm: StubLLM,
+        reranker: CrossEncoderReranker | None = None,
+        packer: ContextPacker | None = None,
+    ) -> None:
+        self.router = router
+        self.executor = executor
+        self.llm = llm
+        self.reranker = reranker
+        self.packer = packer or ContextPacker()
+
+    def run(
+        self,
+        question: str,
+    ) -> QueryTiming:
+        with tracer.request("part2", question=question):
+            return self._run(question)
+
+    def _run(
+        self,
+        question: str,
+    ) -> QueryTiming:
+        timing = QueryTiming(question)
+        timed = _Timer(timing)
+        decision = timed("routing", self.router.route, question)
+        results = timed(
+            "retrieval", self.executor.run, question, ROUTE_SOURCES[decision.route]
+        )
+
+        combiner = PackingCombiner(
+            question,
+            self.packer,
+            itemizers={"text": lambda hits: [item_from_retrieved(hit) for hit in hits]},
+        )
+        for result in results:
+            if result.ok and result.source == "text" and self.reranker is not None:
+                ranked = timed("rerank", self.reranker.rerank, question, result.content)
+                for entry in ranked:
+                    entry.item.score = entry.score
+                result.content = [entry.item for entry in ranked]
+            combiner.add(result)
+        context = timed("packing", combiner.render)
+        timing.context_tokens = combiner.packed.tokens
+        timed("generation", self.llm.complete, build_messages(question, context))
+        return timing
+
+
+def _summarize(
+    values: Sequence[float]
+) -> dict[str, float]:
+    """Count, mean and percentiles of durations, in milliseconds."""
+    if not values:
+        return {"count": 0}
+    ms = np.asarray(values) * 1000
+    summary = {"count": len(ms), "mean_ms": round(float(ms.mean()), 3)}
+    for q in PERCENTILES:
+        summary[f"p{q}_ms"] = round(float(np.percentile(ms, q)), 3)
+    return summary
+
+
+def stage_report(
+    timings: Sequence[QueryTiming]
+) -> dict[str, dict[str, float]]:
+    """Latency summary per stage plus ``total``."""
+    report = {
+        stage: _summarize([t.stages[stage] for t in timings if stage in t.stages])
+        for stage in STAGES
+    }
+    report["total"] = _summarize([t.total for t in timings])
+    return report
+
+
+def throughput(
+    run: Callable[[str], QueryTiming],
+    questions: Sequence[str],
+    concurrency: int,
+) -> dict[str, float]:
+    """Queries per second and end-to-end latency with ``concurrency`` workers."""
+    latencies = []
+
+    def timed_run(question: str) -> None:
+        start = time.perf_counter()
+        run(question)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed_run, questions))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "queries": len(questions),
+        "seconds": round(elapsed, 3),
+        "qps": round(len(questions) / elapsed, 2),
+        **{key: value for key, value in _summarize(latencies).items() if key != "count"},
+    }
+
+
+def run_benchmark(
+    run: Callable[[str], QueryTiming],
+    questions: Sequence[str],
+    concurrency: Sequence[int] = DEFAULT_CONCURRENCY,
+) -> dict[str, Any]:
+    """Stage latencies over one sequential pass (after a warm-up), then throughput."""
+    for question in questions[:3]:
+        run(question)
+    timings = [run(question) for question in questions]
+    tokens = [timing.context_tokens for timing in timings]
+    return {
+        "questions": len(questions),
+        "context_tokens": {
+            "mean": round(float(np.mean(tokens)), 1),
+            "p95": round(float(np.percentile(tokens, 95)), 1),
+        },
+        "stages": stage_report(timings),
+        "throughput": [throughput(run, questions, workers) for workers in concurrency],
+    }
+
+
+def compare_results(
+    previous: Mapping[str, Any],
+    current: Mapping[str, Any],
+) -> list[str]:
+    """Per-stage p50/p95 change between two result files."""
+    lines = []
+    for part, result in current["parts"].items():
+        before = previous.get("parts", {}).get(part)
+        if before is None:
+            continue
+        for stage, summary in result["stages"].items():
+            old = before["stages"].get(stage, {})
+            for key in ("p50_ms", "p95_ms"):
+                if key in summary and old.get(key):
+                    change = (summary[key] - old[key]) / old[key] * 100
+                    lines.append(
+                        f"{part:<6}{stage:<16}{key:<8}{old[key]:>10.3f}"
+                        f"{summary[key]:>10.3f}{change:>+9.1f}%"
+                    )
+    return lines
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _code_pipeline(
+    args: argparse.Namespace,
+    llm: StubLLM,
+    reranker: CrossEncoderReranker | None,
+) -> CodePipeline:
+    from advanced_rag.code_chunker import chunk_repository
+    from advanced_rag.code_indexer import IncrementalCodeIndexer
+    from advanced_rag.code_symbols import load_symbol_index
+
+    indexer = IncrementalCodeIndexer(args.repo)
+    indexer.update()
+    return CodePipeline(
+        load_symbol_index(args.repo),
+        indexer.index(),
+        chunk_repository(args.repo),
+        llm,
+        reranker,
+        ContextPacker(args.budget),
+    )
+
+
+def _product_pipeline(
+    args: argparse.Namespace,
+    llm: StubLLM,
+    reranker: CrossEncoderReranker | None,
+) -> ProductPipeline:
+    from advanced_rag.hybrid_retriever import HybridRetriever
+    from advanced_rag.product_index import load_product_index
+    from advanced_rag.product_join import ProductJoinIndex, product_source
+
+    join = ProductJoinIndex.open()
+    retriever = HybridRetriever(load_product_index())
+    executor = MultiSourceExecutor({
+        "csv": product_source(join, join.sales.answer),
+        "text": lambda query: retriever.search(query, k=20),
+    })
+    # Route locally only; the LLM fallback would put network time into routing
+    return ProductPipeline(
+        QueryRouter(llm_model=None), executor, llm, reranker, ContextPacker(args.budget)
+    )
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="End-to-end RAG latency benchmark")
+    parser.add_argument("--part", choices=["1", "2", "all"], default="all")
+    parser.add_argument("--repo", type=Path, default=None, help="Repository for Part 1")
+    parser.add_argument("--variants", type=int, default=DEFAULT_VARIANTS,
+                        help="Synthetic question variants per part")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=list(DEFAULT_CONCURRENCY))
+    parser.add_argument("--budget", type=int, default=3000, help="Context token budget")
+    parser.add_argument("--no-rerank", action="store_true", help="Skip the re-rank stage")
+    parser.add_argument("--first-token", type=float, default=0.05,
+                        help="Stub LLM time to first token in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="Write results as JSON")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier results to diff")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Benchmark the selected parts and print or write the results."""
+    args = _parse_args()
+    parts = ["1", "2"] if args.part == "all" else [args.part]
+    if "1" in parts and args.repo is None:
+        if args.part == "1":
+            raise SystemExit("--repo is required for Part 1")
+        parts.remove("1")
+
+    llm = StubLLM(first_token=args.first_token)
+    reranker = None if args.no_rerank else CrossEncoderReranker()
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "config": {key: str(value) for key, value in vars(args).items()},
+        },
+        "parts": {},
+    }
+    for part in parts:
+        if part == "1":
+            pipeline, base = _code_pipeline(args, llm, reranker), PART1_QUESTIONS
+        else:
+            pipeline, base = _product_pipeline(args, llm, reranker), PART2_QUESTIONS
+        questions = list(base) + question_variants(base, args.variants, args.seed)
+        results["parts"][f"part{part}"] = run_benchmark(pipeline.run, questions, args.concurrency)
+
+    print(json.dumps(results["parts"], indent=2))
+    if args.compare:
+        with open(args.compare) as f:
+            print("\n".join(compare_results(json.load(f), results)))
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+In-memory caches shared by the routing and embedding layers.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(
+    query: str
+) -> str:
+    """Lowercase, collapse whitespace and trim edge punctuation."""
+    return _WHITESPACE_RE.sub(" ", query.lower()).strip(" \t\n?!.,;:'\"")
+
+
+class LRUCache:
+    """A small thread-safe LRU mapping."""
+
+    def __init__(
+        self,
+        max_size: int,
+    ) -> None:
+        self.max_size = max_size
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        key,
+    ):
+        """Return the cached value for ``key`` (marking it recent) or None."""
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(
+        self,
+        key,
+        value,
+    ) -> None:
+        """Insert ``value``, evicting the least recently used entry if full."""
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._items.clear()
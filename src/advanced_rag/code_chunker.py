@@ -0,0 +1,627 @@
+"""
+Code-aware chunking of the Part 1 codebase.
+
+Files are split along their structure instead of by character count:
+
+- Python is parsed with ``ast``: one chunk per top-level function or class
+  (decorators and leading comments included), with module-level statements
+  between them grouped into ``<module>`` chunks. Classes longer than
+  MAX_SYMBOL_LINES are split into one chunk per method.
+- TypeScript/JavaScript, YAML, Dockerfiles and Markdown are split by a
+  lightweight line tokenizer at top-level declarations, top-level keys,
+  ``FROM`` stages and headings respectively.
+- Anything else is cut into fixed line windows.
+
+Every chunk carries its file's import header (Python/TS imports, YAML
+``apiVersion``/``kind``, Dockerfile global ``ARG`` lines), so a chunk is
+readable on its own.
+
+Chunking results are cached on disk per content hash, so re-chunking an
+unchanged repository only reads and hashes files. Files are chunked on a
+process pool.
+
+Example::
+
+    chunks = chunk_repository(Path("mcp-gateway-registry"))
+    routes = [c for c in chunks if c.language == "python" and "@router" in c.body]
+
+Run as a script to write ``chunks.jsonl`` for a repository:
+
+    python -m advanced_rag.code_chunker mcp-gateway-registry
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from advanced_rag.code_indexer import ChangeSet
+from advanced_rag.code_search import iter_source_files
+
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+INDEX_ROOT = DATA_DIR / "index" / "code_chunks"
+CACHE_DIR = INDEX_ROOT / "cache"
+CHUNKS_FILE = "chunks.jsonl"
+
+# Bump when chunking changes so cached results are not reused
+CHUNKER_VERSION = 2
+
+MAX_SYMBOL_LINES = 200
+WINDOW_LINES = 80
+# Below this many files the process pool costs more than it saves
+MIN_PARALLEL_FILES = 64
+
+LANGUAGE_SUFFIXES = {
+    ".py": "python",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".js": "typescript",
+    ".jsx": "typescript",
+    ".mjs": "typescript",
+    ".cjs": "typescript",
+    ".yml": "yaml",
+    ".yaml": "yaml",
+    ".md": "markdown",
+}
+
+_TS_IMPORT_RE = re.compile(r"^(?:import\b|export\s+(?:\*|\{[^}]*\})\s*from\b)")
+_TS_SYMBOL_RE = re.compile(
+    r"^(?:export\s+)?(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?(?:async\s+)?"
+    r"(function\*?|class|interface|type|enum|const|let|var|namespace)\s+([A-Za-z_$][\w$]*)"
+)
+_YAML_KEY_RE = re.compile(r"""^("[^"]+"|'[^']+'|[^\s#'"-][^:#]*?)\s*:(?:\s|$)""")
+_YAML_HEADER_RE = re.compile(r"^(apiVersion|kind)\s*:")
+_DOCKER_FROM_RE = re.compile(r"^FROM\s+(\S+)(?:\s+AS\s+(\S+))?", re.IGNORECASE)
+_MARKDOWN_HEADING_RE = re.compile(r"^#{1,2}\s+(.*)")
+
+
+@dataclass
+class CodeChunk:
+    """One symbol-level chunk of a source file. Lines are 1-based, inclusive."""
+
+    path: str
+    language: str
+    symbol: str
+    kind: str
+    start_line: int
+    end_line: int
+    header: str
+    body: str
+    content_hash: str
+
+    @property
+    def chunk_id(self) -> str:
+        return f"{self.path}:{self.start_line}"
+
+    @property
+    def text(self) -> str:
+        """The chunk as it should be embedded or shown to the LLM."""
+        return f"{self.header}\n\n{self.body}" if self.header else self.body
+
+
+def detect_language(
+    path: str
+) -> str:
+    """Chunking language for a repository-relative path."""
+    name = Path(path).name
+    if name == "Dockerfile" or name.startswith("Dockerfile.") or name.endswith(".dockerfile"):
+        return "dockerfile"
+    return LANGUAGE_SUFFIXES.get(Path(path).suffix.lower(), "text")
+
+
+def _span(
+    lines: list[str],
+    start: int,
+    end: int,
+    symbol: str,
+    kind: str,
+) -> dict:
+    """A chunk dict for 0-based lines [start, end), trailing blanks trimmed."""
+    while end > start + 1 and not lines[end - 1].strip():
+        end -= 1
+    return {
+        "symbol": symbol,
+        "kind": kind,
+        "start_line": start + 1,
+        "end_line": end,
+        "body": "\n".join(lines[start:end]),
+    }
+
+
+def _windows(
+    lines: list[str],
+    start: int = 0,
+    end: int | None = None,
+) -> list[dict]:
+    """Fixed-size line windows over [start, end)."""
+    end = len(lines) if end is None else end
+    return [
+        _span(lines, offset, min(offset + WINDOW_LINES, end), "<window>", "window")
+        for offset in range(start, end, WINDOW_LINES)
+        if any(line.strip() for line in lines[offset:min(offset + WINDOW_LINES, end)])
+    ]
+
+
+def _leading_comments(
+    lines: list[str],
+    start: int,
+    floor: int,
+    prefix: str,
+) -> int:
+    """Move ``start`` up over comment lines directly above it."""
+    while start > floor and lines[start - 1].lstrip().startswith(prefix):
+        start -= 1
+    return start
+
+
+def _chunk_python(
+    lines: list[str],
+    source: str,
+) -> tuple[str, list[dict]]:
+    """Header and chunks of a Python module; raises SyntaxError."""
+    tree = ast.parse(source)
+    header_lines = []
+    import_lines: set[int] = set()
+    symbols = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            header_lines.extend(lines[node.lineno - 1:node.end_lineno])
+            import_lines.update(range(node.lineno - 1, node.end_lineno))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            symbols.append(node)
+
+    chunks: list[dict] = []
+
+    def module_chunk(start: int, end: int) -> None:
+        """Group module-level lines in [start, end) between imports into chunks."""
+        run_start = None
+        for i in range(start, end + 1):
+            if i < end and i not in import_lines:
+                run_start = i if run_start is None else run_start
+                continue
+            if run_start is not None and any(
+                line.strip() for line in lines[run_start:i]
+            ):
+                first = next(j for j in range(run_start, i) if lines[j].strip())
+                chunks.append(_span(lines, first, i, "<module>", "module"))
+            run_start = None
+
+    covered = 0
+    for node in symbols:
+        first = _symbol_start(node)
+        start = _leading_comments(lines, first, covered, "#")
+        module_chunk(covered, start)
+
+        kind = "class" if isinstance(node, ast.ClassDef) else "function"
+        end = node.end_lineno
+        if kind == "class" and end - first > MAX_SYMBOL_LINES:
+            chunks.extend(_split_class(lines, node, start))
+        else:
+            chunks.append(_span(lines, start, end, node.name, kind))
+        covered = end
+    module_chunk(covered, len(lines))
+    return "\n".join(header_lines), chunks
+
+
+def _symbol_start(
+    node: ast.AST
+) -> int:
+    """0-based first line of a function or class, decorators included."""
+    return min([node.lineno] + [d.lineno for d in node.decorator_list]) - 1
+
+
+def _split_class(
+    lines: list[str],
+    node: ast.ClassDef,
+    start: int,
+) -> list[dict]:
+    """One chunk for the class body up to its first method, one per method.
+
+    Method chunks start with the class line so they keep their context.
+    """
+    methods = [
+        child for child in node.body
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
+    ]
+    if not methods:
+        return [_span(lines, start, node.end_lineno, node.name, "class")]
+
+    class_line = lines[node.lineno - 1]
+    # Comments above a method belong to it, not to the method before
+    starts = [
+        _leading_comments(lines, _symbol_start(method), node.lineno, "#")
+        for method in methods
+    ] + [node.end_lineno]
+    chunks = [_span(lines, start, starts[0], node.name, "class")]
+    for position, method in enumerate(methods):
+        chunk = _span(
+            lines, starts[position], starts[position + 1],
+            f"{node.name}.{method.name}", "method",
+        )
+        chunk["body"] = f"{class_line}\n    ...\n{chunk['body']}"
+        chunks.append(chunk)
+    return chunks
+
+
+def _ts_line_depths(
+    source: str
+) -> list[int]:
+    """Bracket depth at the start of every line, ignoring strings and comments.
+
+    Template literals are treated as opaque strings, including their
+    ``${...}`` substitutions.
+    """
+    depths = [0]
+    depth = 0
+    state = None  # None, "//", "/*", or the open quote character
+    i = 0
+    length = len(source)
+    while i < length:
+        char = source[i]
+        pair = source[i:i + 2]
+        if char == "\n":
+            if state == "//" or state in ("'", '"'):
+                state = None
+            depths.append(depth)
+        elif state == "/*":
+            if pair == "*/":
+                state = None
+                i += 1
+        elif state == "//":
+            pass
+        elif state is not None:
+            if char == "\\":
+                i += 1
+            elif char == state:
+                state = None
+        elif pair in ("//", "/*"):
+            state = pair
+            i += 1
+        elif char in "'\"`":
+            state = char
+        elif char in "{[(":
+            depth += 1
+        elif char in "}])":
+            depth = max(depth - 1, 0)
+        i += 1
+    return depths
+
+
+def _split_top_level(
+    lines: list[str],
+    is_start: list[bool],
+    comment_prefix: str,
+) -> list[tuple[int, int]]:
+    """Spans [start, end) beginning at each start line (and line 0).
+
+    Comment lines directly above a start line belong to its span.
+    """
+    starts = [0]
+    for i, start in enumerate(is_start):
+        if start and i > 0:
+            starts.append(_leading_comments(lines, i, starts[-1] + 1, comment_prefix))
+    return [
+        (start, end)
+        for start, end in zip(starts, starts[1:] + [len(lines)])
+        if any(line.strip() for line in lines[start:end])
+    ]
+
+
+def _first_start(
+    is_start: list[bool],
+    start: int,
+    end: int,
+) -> int | None:
+    """The start line inside span [start, end), past its leading comments."""
+    return next((i for i in range(start, end) if is_start[i]), None)
+
+
+def _chunk_typescript(
+    lines: list[str],
+    source: str,
+) -> tuple[str, list[dict]]:
+    """Header and chunks of a TypeScript/JavaScript module."""
+    depths = _ts_line_depths(source)
+    is_start = [
+        depths[i] == 0
+        and bool(line)
+        and not line[0].isspace()
+        and line[0] not in "})].,;"
+        and not line.startswith(("//", "/*", "*"))
+        for i, line in enumerate(lines)
+    ]
+
+    header_lines = []
+    chunks = []
+    for start, end in _split_top_level(lines, is_start, "//"):
+        first = _first_start(is_start, start, end)
+        statement = lines[start if first is None else first]
+        if _TS_IMPORT_RE.match(statement):
+            header_lines.extend(line for line in lines[start:end] if line.strip())
+            continue
+        match = _TS_SYMBOL_RE.match(statement)
+        if match:
+            chunks.append(_span(lines, start, end, match.group(2), match.group(1)))
+        elif chunks and chunks[-1]["kind"] == "module":
+            # Merge adjacent module-level statements
+            merged = _span(lines, chunks[-1]["start_line"] - 1, end, "<module>", "module")
+            chunks[-1] = merged
+        else:
+            chunks.append(_span(lines, start, end, "<module>", "module"))
+    return "\n".join(header_lines), chunks
+
+
+def _chunk_yaml(
+    lines: list[str],
+) -> tuple[str, list[dict]]:
+    """One chunk per top-level key of every ``---`` separated document.
+
+    The ``apiVersion``/``kind`` lines of a document are its chunks' header
+    rather than chunks of their own.
+    """
+    chunks = []
+    document_start = 0
+    boundaries = [i for i, line in enumerate(lines) if line.startswith("---")]
+    for document_end in boundaries + [len(lines)]:
+        document = lines[document_start:document_end]
+        is_start = [bool(_YAML_KEY_RE.match(line)) for line in document]
+        header = "\n".join(line for line in document if _YAML_HEADER_RE.match(line))
+        for start, end in _split_top_level(document, is_start, "#"):
+            first = _first_start(is_start, start, end)
+            if first is not None and _YAML_HEADER_RE.match(document[first]):
+                continue
+            key = (
+                _YAML_KEY_RE.match(document[first]).group(1).strip("'\"")
+                if first is not None else "<document>"
+            )
+            chunk = _span(
+                lines,
+                document_start + start,
+                document_start + end,
+                key,
+                "document" if first is None else "key",
+            )
+            chunk["header"] = header
+            chunks.append(chunk)
+        document_start = document_end + 1
+    return "", chunks
+
+
+def _chunk_dockerfile(
+    lines: list[str],
+) -> tuple[str, list[dict]]:
+    """Global ARG header and one chunk per build stage."""
+    is_start = [bool(_DOCKER_FROM_RE.match(line)) for line in lines]
+    header_lines = []
+    chunks = []
+    for start, end in _split_top_level(lines, is_start, "#"):
+        first = _first_start(is_start, start, end)
+        if first is None:
+            header_lines.extend(
+                line for line in lines[start:end] if line.upper().startswith("ARG")
+            )
+            continue
+        match = _DOCKER_FROM_RE.match(lines[first])
+        chunks.append(
+            _span(lines, start, end, match.group(2) or match.group(1), "stage")
+        )
+    return "\n".join(header_lines), chunks
+
+
+def _chunk_markdown(
+    lines: list[str],
+) -> tuple[str, list[dict]]:
+    """One chunk per level 1-2 section, outside fenced code blocks."""
+    is_start = []
+    fenced = False
+    for line in lines:
+        if line.startswith("```"):
+            fenced = not fenced
+        is_start.append(not fenced and bool(_MARKDOWN_HEADING_RE.match(line)))
+
+    chunks = []
+    for start, end in _split_top_level(lines, is_start, "<!--"):
+        match = _MARKDOWN_HEADING_RE.match(lines[start])
+        if end - start > MAX_SYMBOL_LINES:
+            chunks.extend(_windows(lines, start, end))
+        else:
+            chunks.append(
+                _span(lines, start, end, match.group(1) if match else "<preamble>", "section")
+            )
+    return "", chunks
+
+
+def chunk_source(
+    source: str,
+    language: str,
+) -> tuple[str, list[dict]]:
+    """Split ``source`` into (header, chunk dicts) for ``language``.
+
+    A chunk dict with its own ``header`` key overrides the file header.
+    """
+    lines = source.splitlines()
+    if language == "python":
+        try:
+            return _chunk_python(lines, source)
+        except SyntaxError:
+            return "", _windows(lines)
+    if language == "typescript":
+        return _chunk_typescript(lines, source)
+    if language == "yaml":
+        return _chunk_yaml(lines)
+    if language == "dockerfile":
+        return _chunk_dockerfile(lines)
+    if language == "markdown":
+        return _chunk_markdown(lines)
+    return "", _windows(lines)
+
+
+def _cache_key(
+    content: bytes,
+    language: str,
+) -> str:
+    digest = hashlib.sha1(f"{CHUNKER_VERSION}\0{language}\0".encode())
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def _chunk_file(
+    task: tuple[str, str, str],
+) -> list[dict]:
+    """Chunk one file, using the on-disk cache. Runs in a worker process."""
+    repo_dir, path, cache_dir = task
+    try:
+        content = (Path(repo_dir) / path).read_bytes()
+    except OSError:
+        # Deleted or unreadable since it was listed; the next refresh drops it
+        return []
+    language = detect_language(path)
+    key = _cache_key(content, language)
+    cache_path = Path(cache_dir) / key[:2] / f"{key}.json"
+
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        header, chunks = chunk_source(content.decode("utf-8", errors="replace"), language)
+        cached = {"header": header, "chunks": chunks}
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(cached, f)
+        os.replace(tmp, cache_path)
+
+    content_hash = hashlib.sha1(content).hexdigest()
+    return [
+        {
+            "path": path,
+            "language": language,
+            "header": cached["header"],
+            "content_hash": content_hash,
+            **chunk,
+        }
+        for chunk in cached["chunks"]
+    ]
+
+
+def chunk_files(
+    repo_dir: Path,
+    paths: Iterable[str],
+    cache_dir: Path = CACHE_DIR,
+    workers: int | None = None,
+) -> dict[str, list[CodeChunk]]:
+    """Chunk repository-relative ``paths``; returns chunks per path."""
+    tasks = [(str(repo_dir), path, str(cache_dir)) for path in paths]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) < MIN_PARALLEL_FILES:
+        results = map(_chunk_file, tasks)
+        return {
+            task[1]: [CodeChunk(**chunk) for chunk in chunks]
+            for task, chunks in zip(tasks, results)
+        }
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            _chunk_file, tasks, chunksize=max(1, len(tasks) // (workers * 4))
+        )
+        return {
+            task[1]: [CodeChunk(**chunk) for chunk in chunks]
+            for task, chunks in zip(tasks, results)
+        }
+
+
+def chunk_repository(
+    repo_dir: Path,
+    cache_dir: Path = CACHE_DIR,
+    workers: int | None = None,
+) -> list[CodeChunk]:
+    """Chunk every indexable file under ``repo_dir``."""
+    paths = [str(path.relative_to(repo_dir)) for path in iter_source_files(repo_dir)]
+    by_path = chunk_files(repo_dir, paths, cache_dir, workers)
+    return [chunk for path in paths for chunk in by_path[path]]
+
+
+class CodeChunkIndex:
+    """Chunks of a repository, kept current from IncrementalCodeIndexer changes.
+
+    Pass ``refresh`` as a listener to IncrementalCodeIndexer so only
+    changed files are re-chunked.
+    """
+
+    def __init__(
+        self,
+        repo_dir: Path,
+        cache_dir: Path = CACHE_DIR,
+        workers: int | None = None,
+    ) -> None:
+        self.repo_dir = repo_dir
+        self.cache_dir = cache_dir
+        self.workers = workers
+        paths = [str(path.relative_to(repo_dir)) for path in iter_source_files(repo_dir)]
+        self.by_path = chunk_files(repo_dir, paths, cache_dir, workers)
+
+    @property
+    def chunks(self) -> list[CodeChunk]:
+        return [chunk for path in sorted(self.by_path) for chunk in self.by_path[path]]
+
+    def refresh(
+        self,
+        changes: ChangeSet,
+    ) -> None:
+        """Drop removed files and re-chunk added or modified ones."""
+        for path in changes.removed:
+            self.by_path.pop(path, None)
+        self.by_path.update(
+            chunk_files(
+                self.repo_dir,
+                changes.added + changes.modified,
+                self.cache_dir,
+                self.workers,
+            )
+        )
+
+    def save(
+        self,
+        path: Path,
+    ) -> None:
+        """Write chunks as JSON lines."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            for chunk in self.chunks:
+                f.write(json.dumps(asdict(chunk)) + "\n")
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Code-aware chunking of a repository")
+    parser.add_argument("repo_dir", type=Path, help="Repository to chunk")
+    parser.add_argument("--output", type=Path, default=None, help="chunks.jsonl path")
+    parser.add_argument("--workers", type=int, default=None)
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Chunk a repository and write chunks.jsonl."""
+    args = _parse_args()
+    output = args.output or INDEX_ROOT / args.repo_dir.resolve().name / CHUNKS_FILE
+    index = CodeChunkIndex(args.repo_dir, workers=args.workers)
+    index.save(output)
+
+    chunks = index.chunks
+    languages: dict[str, int] = {}
+    for chunk in chunks:
+        languages[chunk.language] = languages.get(chunk.language, 0) + 1
+    print(f"Wrote {len(chunks)} chunks from {len(index.by_path)} files to {output}")
+    for language, count in sorted(languages.items(), key=lambda item: -item[1]):
+        print(f"  {language}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+Incremental re-indexing of the Part 1 codebase.
+
+The trigram index (see code_search) records ``[mtime_ns, size, sha1]`` for
+every indexed file. IncrementalCodeIndexer compares that manifest with the
+working tree, hashes only files whose stat changed, and re-reads only files
+whose content changed. Postings of unchanged files are carried over from
+the current generation, still sorted, and the postings of changed files
+are merged into them, so an update costs one linear pass over the postings
+rather than a re-read of the repository. Each generation still stores the
+full flat arrays; there are no per-update segments.
+
+Each update is written as a new generation and published with an atomic
+pointer swap; readers keep the generation they opened until they reload.
+Other indexes over the codebase (chunks, symbols, ``tree`` output) can
+register listeners that receive the ChangeSet after each publish.
+
+Updates run on startup and then either on filesystem events (via the
+optional ``watchfiles`` package, which uses inotify on Linux) or on a
+polling loop when it is not installed. Files that vanish mid-scan are
+skipped, and a failed update is logged without stopping the watcher.
+
+Example::
+
+    indexer = IncrementalCodeIndexer(Path("mcp-gateway-registry"))
+    indexer.update()
+    matches = indexer.index().search("validate_token")
+
+    stop = threading.Event()
+    threading.Thread(target=indexer.watch, args=(stop,), daemon=True).start()
+"""
+
+import argparse
+import logging
+import threading
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from advanced_rag.code_search import (
+    INDEX_ROOT,
+    TrigramIndex,
+    current_generation,
+    file_state,
+    file_trigrams,
+    invert_postings,
+    iter_source_files,
+    publish_generation,
+    write_generation,
+)
+
+try:
+    import watchfiles
+except ImportError:  # fall back to polling
+    watchfiles = None
+
+
+DEFAULT_POLL_INTERVAL = 2.0
+TREE_FILE = "tree.txt"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChangeSet:
+    """Relative paths that changed between two generations."""
+
+    added: list[str] = field(default_factory=list)
+    modified: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    # Stat changed but content did not; only the manifest is refreshed
+    touched: list[str] = field(default_factory=list)
+
+    @property
+    def content_changed(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+    def __bool__(self) -> bool:
+        return self.content_changed or bool(self.touched)
+
+
+def render_tree(
+    files: Sequence[str]
+) -> str:
+    """Render a ``tree``-style listing of relative file paths."""
+    lines = []
+    previous: list[str] = []
+    for path in sorted(files):
+        parts = path.split("/")
+        common = 0
+        while (
+            common < min(len(parts) - 1, len(previous) - 1)
+            and parts[common] == previous[common]
+        ):
+            common += 1
+        for depth in range(common, len(parts)):
+            suffix = "/" if depth < len(parts) - 1 else ""
+            lines.append(f"{'    ' * depth}{parts[depth]}{suffix}")
+        previous = parts
+    return "\n".join(lines) + "\n"
+
+
+class IncrementalCodeIndexer:
+    """Keep a trigram index of a repository up to date."""
+
+    def __init__(
+        self,
+        repo_dir: Path,
+        index_root: Path | None = None,
+        listeners: Sequence[Callable[[ChangeSet], None]] = (),
+    ) -> None:
+        self.repo_dir = repo_dir
+        self.index_root = index_root or INDEX_ROOT / repo_dir.resolve().name
+        self.listeners = list(listeners)
+        self._index: TrigramIndex | None = None
+        self._lock = threading.Lock()
+
+    def index(self) -> TrigramIndex:
+        """The current index, reopened only when a new generation is published."""
+        generation = current_generation(self.index_root)
+        if generation is None:
+            raise FileNotFoundError(f"No trigram index under {self.index_root}")
+        if self._index is None or self._index.generation != generation:
+            self._index = TrigramIndex(generation)
+        return self._index
+
+    def _scan(
+        self,
+        previous: TrigramIndex | None,
+    ) -> tuple[ChangeSet, dict[str, list], dict[str, np.ndarray]]:
+        """Diff the working tree against ``previous``.
+
+        Returns the change set, the manifest state of every current file and
+        the trigram sets of files whose content changed.
+        """
+        old_states = (
+            dict(zip(previous.files, previous.states)) if previous else {}
+        )
+        changes = ChangeSet()
+        states: dict[str, list] = {}
+        trigram_sets: dict[str, np.ndarray] = {}
+
+        for path in iter_source_files(self.repo_dir):
+            relative = str(path.relative_to(self.repo_dir))
+            old = old_states.get(relative)
+            try:
+                stat = path.stat()
+                if old is None or old[:2] != [stat.st_mtime_ns, stat.st_size]:
+                    content = path.read_bytes()
+                    state = file_state(path, content)
+            except OSError:
+                # Deleted or replaced since the walk (checkout, editor temp
+                # file); a previously indexed file is reported as removed
+                continue
+            old_states.pop(relative, None)
+            if old is not None and old[:2] == [stat.st_mtime_ns, stat.st_size]:
+                states[relative] = old
+                continue
+
+            states[relative] = state
+            if old is not None and old[2] == state[2]:
+                changes.touched.append(relative)
+                continue
+            (changes.modified if old is not None else changes.added).append(relative)
+            trigram_sets[relative] = file_trigrams(content)
+
+        changes.removed = sorted(old_states)
+        return changes, states, trigram_sets
+
+    def _merge_postings(
+        self,
+        previous: TrigramIndex | None,
+        files: list[str],
+        trigram_sets: dict[str, np.ndarray],
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Postings for ``files``: carried over unless the file is in trigram_sets.
+
+        Carried-over postings stay sorted by (trigram, file id) when the old
+        file ids map to new ones in order, which holds for generations
+        written by update. The new files' postings are then sorted on their
+        own and merged in; otherwise everything is re-sorted.
+        """
+        new_ids = {path: file_id for file_id, path in enumerate(files)}
+        old_keys = np.zeros(0, dtype=np.uint32)
+        old_ids = np.zeros(0, dtype=np.int32)
+        in_order = True
+        if previous is not None:
+            # Map old file ids to new ones; -1 drops the file's old postings
+            remap = np.array(
+                [
+                    -1 if path in trigram_sets else new_ids.get(path, -1)
+                    for path in previous.files
+                ] or [-1],
+                dtype=np.int32,
+            )
+            kept = remap[remap >= 0]
+            in_order = bool(np.all(np.diff(kept) > 0))
+            old_keys = np.repeat(
+                np.asarray(previous.trigrams), np.diff(previous.offsets)
+            )
+            old_ids = remap[np.asarray(previous.postings)]
+            keep = old_ids >= 0
+            old_keys, old_ids = old_keys[keep], old_ids[keep]
+
+        added_keys = np.concatenate(
+            [np.zeros(0, dtype=np.uint32), *trigram_sets.values()]
+        ).astype(np.uint32)
+        added_ids = np.concatenate([np.zeros(0, dtype=np.int32)] + [
+            np.full(len(trigrams), new_ids[path], dtype=np.int32)
+            for path, trigrams in trigram_sets.items()
+        ])
+        if not in_order:
+            return invert_postings(
+                np.concatenate([old_keys, added_keys]),
+                np.concatenate([old_ids, added_ids]),
+            )
+
+        # Merge on a (trigram << 32 | file id) composite key
+        old_pairs = (old_keys.astype(np.uint64) << 32) | old_ids.astype(np.uint64)
+        added_pairs = np.sort(
+            (added_keys.astype(np.uint64) << 32) | added_ids.astype(np.uint64)
+        )
+        pairs = np.insert(old_pairs, np.searchsorted(old_pairs, added_pairs), added_pairs)
+        keys = (pairs >> 32).astype(np.uint32)
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])[:len(keys)]
+        offsets = np.append(starts, len(keys)).astype(np.int64)
+        return keys[starts], offsets, (pairs & 0xFFFFFFFF).astype(np.int32)
+
+    def update(self) -> ChangeSet:
+        """Re-index changed files and publish a new generation if needed."""
+        with self._lock:
+            generation = current_generation(self.index_root)
+            previous = TrigramIndex(generation) if generation else None
+            changes, states, trigram_sets = self._scan(previous)
+            if previous is not None and not changes:
+                return changes
+
+            files = sorted(states)
+            if previous is not None and not changes.content_changed:
+                # Only stats changed: file ids and postings are unchanged
+                arrays = previous.generation
+            else:
+                arrays = self._merge_postings(previous, files, trigram_sets)
+
+            new_generation = write_generation(
+                self.index_root,
+                self.repo_dir,
+                files,
+                [states[path] for path in files],
+                arrays,
+            )
+            (new_generation / TREE_FILE).write_text(render_tree(files))
+            publish_generation(self.index_root, new_generation)
+
+        if changes.content_changed:
+            for listener in self.listeners:
+                listener(changes)
+        return changes
+
+    def watch(
+        self,
+        stop: threading.Event | None = None,
+        interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> None:
+        """Update now and after every batch of changes until ``stop`` is set.
+
+        A failing update is logged and retried on the next change or poll.
+        """
+        stop = stop or threading.Event()
+        self._try_update()
+        if watchfiles is not None:
+            for _ in watchfiles.watch(self.repo_dir, stop_event=stop):
+                self._try_update()
+            return
+        while not stop.wait(interval):
+            self._try_update()
+
+    def _try_update(self) -> None:
+        try:
+            self.update()
+        except Exception:
+            logger.exception("Re-indexing %s failed", self.repo_dir)
+
+
+def tree_text(
+    index_root: Path
+) -> str:
+    """The ``tree`` listing of the current generation."""
+    generation = current_generation(index_root)
+    if generation is None:
+        raise FileNotFoundError(f"No trigram index under {index_root}")
+    if not (generation / TREE_FILE).exists():
+        # Generations written by a full build_trigram_index carry no listing
+        return render_tree(TrigramIndex(generation).files)
+    return (generation / TREE_FILE).read_text()
+
+
+def _describe(
+    changes: ChangeSet
+) -> str:
+    return (
+        f"{len(changes.added)} added, {len(changes.modified)} modified, "
+        f"{len(changes.removed)} removed, {len(changes.touched)} touched"
+    )
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Incrementally index a repository")
+    parser.add_argument("repo_dir", type=Path, help="Repository to index")
+    parser.add_argument("--index-dir", type=Path, default=None)
+    parser.add_argument("--watch", action="store_true", help="Keep watching for changes")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="Polling interval in seconds when watchfiles is not installed",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Update the index once, or keep it updated with --watch."""
+    args = _parse_args()
+    indexer = IncrementalCodeIndexer(
+        args.repo_dir,
+        args.index_dir,
+        listeners=[lambda changes: print(f"Re-indexed: {_describe(changes)}")],
+    )
+    if not args.watch:
+        changes = indexer.update()
+        print(f"{indexer.index().generation}: {_describe(changes)}")
+        return
+    try:
+        indexer.watch(interval=args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+"""
+Trigram index for literal and regex search over the Part 1 codebase.
+
+Every text file in the repository is reduced to the set of (lowercased)
+byte trigrams it contains. The index stores one sorted posting list of file
+ids per trigram in three flat ``.npy`` arrays that are memory-mapped on
+load. Each build is written as an immutable generation directory and
+published by atomically replacing a ``CURRENT`` pointer file. A search
+extracts the literal fragments a match must contain, intersects their
+trigram posting lists to get candidate files, and only runs the real
+pattern over those candidates - the same approach as Google Code Search
+and zoekt, without the per-query directory walk of ``grep -r``.
+
+Example::
+
+    index = load_trigram_index(build_trigram_index(Path("mcp-gateway-registry")))
+    for match in index.search(r"@router\\.(get|post)\\(", regex=True):
+        print(f"{match.path}:{match.line_number}: {match.line}")
+
+Run as a script to build (if needed) and query an index:
+
+    python -m advanced_rag.code_search mcp-gateway-registry "def validate_token"
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from advanced_rag.tracing import count, tracer
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+
+INDEX_ROOT = Path(__file__).resolve().parents[2] / "data" / "index" / "code"
+
+SKIP_DIRS = {
+    ".git",
+    "node_modules",
+    ".venv",
+    "venv",
+    "__pycache__",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    "dist",
+    "build",
+}
+MAX_FILE_BYTES = 1 << 20
+# A NUL byte in the first block marks a file as binary
+BINARY_SNIFF_BYTES = 8192
+
+CURRENT_FILE = "CURRENT"
+GENERATION_PREFIX = "gen-"
+KEEP_GENERATIONS = 2
+
+FILES_FILE = "files.json"
+TRIGRAMS_FILE = "trigrams.npy"
+OFFSETS_FILE = "offsets.npy"
+POSTINGS_FILE = "postings.npy"
+
+
+@dataclass
+class Match:
+    """One matching line."""
+
+    path: str
+    line_number: int
+    line: str
+
+
+def iter_source_files(
+    repo_dir: Path
+) -> list[Path]:
+    """Return indexable text files under ``repo_dir`` in a stable order."""
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(repo_dir):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for filename in sorted(filenames):
+            path = Path(dirpath) / filename
+            try:
+                if not path.is_file() or path.stat().st_size > MAX_FILE_BYTES:
+                    continue
+                with open(path, "rb") as f:
+                    if b"\0" in f.read(BINARY_SNIFF_BYTES):
+                        continue
+            except OSError:
+                continue
+            paths.append(path)
+    return paths
+
+
+def file_trigrams(
+    content: bytes
+) -> np.ndarray:
+    """Sorted unique trigram keys of lowercased ``content``."""
+    data = np.frombuffer(content.lower(), dtype=np.uint8).astype(np.uint32)
+    if len(data) < 3:
+        return np.zeros(0, dtype=np.uint32)
+    return np.unique((data[:-2] << 16) | (data[1:-1] << 8) | data[2:])
+
+
+def literal_trigrams(
+    literal: str
+) -> np.ndarray:
+    """Trigram keys a file must contain to contain ``literal``."""
+    return file_trigrams(literal.encode("utf-8"))
+
+
+def invert_postings(
+    keys: np.ndarray,
+    file_ids: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Invert (trigram, file id) pairs into (trigrams, offsets, postings).
+
+    The file ids of ``trigrams[i]`` are ``postings[offsets[i]:offsets[i + 1]]``,
+    in ascending order.
+    """
+    order = np.lexsort((file_ids, keys))
+    keys, file_ids = keys[order], file_ids[order].astype(np.int32)
+    trigrams, starts = np.unique(keys, return_index=True)
+    offsets = np.append(starts, len(keys)).astype(np.int64)
+    return trigrams.astype(np.uint32), offsets, file_ids
+
+
+def build_postings(
+    file_trigram_sets: list[np.ndarray],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Invert per-file trigram sets, file id = list position."""
+    if not file_trigram_sets:
+        return invert_postings(
+            np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.int32)
+        )
+    return invert_postings(
+        np.concatenate(file_trigram_sets),
+        np.repeat(
+            np.arange(len(file_trigram_sets), dtype=np.int32),
+            [len(trigrams) for trigrams in file_trigram_sets],
+        ),
+    )
+
+
+def file_state(
+    path: Path,
+    content: bytes,
+) -> list:
+    """[mtime_ns, size, sha1] recorded per file to detect changes."""
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size, hashlib.sha1(content).hexdigest()]
+
+
+def current_generation(
+    index_root: Path
+) -> Path | None:
+    """The published generation directory under ``index_root``, if any."""
+    try:
+        name = (index_root / CURRENT_FILE).read_text().strip()
+    except FileNotFoundError:
+        return None
+    return index_root / name
+
+
+def write_generation(
+    index_root: Path,
+    repo_dir: Path,
+    files: list[str],
+    states: list[list],
+    arrays: tuple[np.ndarray, np.ndarray, np.ndarray] | Path,
+) -> Path:
+    """Write a new, unpublished generation directory and return it.
+
+    ``arrays`` is either (trigrams, offsets, postings) or an existing
+    generation whose arrays are unchanged and are hard-linked.
+    """
+    current = current_generation(index_root)
+    number = int(current.name.split("-")[1]) + 1 if current else 0
+    generation = index_root / f"{GENERATION_PREFIX}{number:06d}"
+    shutil.rmtree(generation, ignore_errors=True)
+    generation.mkdir(parents=True)
+
+    names = (TRIGRAMS_FILE, OFFSETS_FILE, POSTINGS_FILE)
+    if isinstance(arrays, Path):
+        for name in names:
+            try:
+                os.link(arrays / name, generation / name)
+            except OSError:
+                shutil.copyfile(arrays / name, generation / name)
+    else:
+        for name, array in zip(names, arrays):
+            np.save(generation / name, array)
+    with open(generation / FILES_FILE, "w") as f:
+        json.dump(
+            {"root": str(repo_dir.resolve()), "files": files, "states": states}, f
+        )
+    return generation
+
+
+def publish_generation(
+    index_root: Path,
+    generation: Path,
+    keep: int = KEEP_GENERATIONS,
+) -> None:
+    """Atomically make ``generation`` current and drop old generations.
+
+    Readers resolve CURRENT once when they open the index, so they see
+    either the old or the new generation, never a partial one. The
+    previous ``keep - 1`` generations are left for readers still using them.
+    """
+    pointer = index_root / f"{CURRENT_FILE}.tmp"
+    pointer.write_text(generation.name)
+    os.replace(pointer, index_root / CURRENT_FILE)
+
+    generations = sorted(index_root.glob(f"{GENERATION_PREFIX}*"))
+    for old in generations[:-keep]:
+        if old != generation:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def build_trigram_index(
+    repo_dir: Path,
+    index_root: Path | None = None,
+) -> Path:
+    """Index every text file under ``repo_dir``; return the index root."""
+    index_root = index_root or INDEX_ROOT / repo_dir.resolve().name
+    files, states, trigram_sets = [], [], []
+    for path in iter_source_files(repo_dir):
+        content = path.read_bytes()
+        files.append(str(path.relative_to(repo_dir)))
+        states.append(file_state(path, content))
+        trigram_sets.append(file_trigrams(content))
+
+    generation = write_generation(
+        index_root, repo_dir, files, states, build_postings(trigram_sets)
+    )
+    publish_generation(index_root, generation)
+    return index_root
+
+
+def _required_literals(
+    parsed,
+) -> tuple:
+    """Reduce a parsed regex to a boolean query over required literals.
+
+    Returns ``("all",)`` (no constraint), ``("lit", text)``,
+    ``("and", [queries])`` or ``("or", [queries])``. The result may be
+    weaker than the regex but never stricter, so no match is missed.
+    """
+    parts = []
+    run: list[str] = []
+
+    def flush() -> None:
+        if run:
+            parts.append(("lit", "".join(run)))
+            run.clear()
+
+    for op, arg in parsed:
+        if op is sre_constants.LITERAL:
+            run.append(chr(arg))
+            continue
+        if op is sre_constants.AT:
+            # Anchors consume nothing, so the literal run continues
+            continue
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            parts.append(_required_literals(arg[-1]))
+        elif op is sre_constants.BRANCH:
+            parts.append(("or", [_required_literals(branch) for branch in arg[1]]))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, _, item = arg
+            if low >= 1:
+                parts.append(_required_literals(item))
+        # Character classes, wildcards and the rest constrain nothing
+    flush()
+
+    parts = [part for part in parts if part != ("all",)]
+    if not parts:
+        return ("all",)
+    return parts[0] if len(parts) == 1 else ("and", parts)
+
+
+class TrigramIndex:
+    """A memory-mapped trigram index over one repository."""
+
+    def __init__(
+        self,
+        generation: Path,
+    ) -> None:
+        with open(generation / FILES_FILE) as f:
+            metadata = json.load(f)
+        self.generation = generation
+        self.root = Path(metadata["root"])
+        self.files: list[str] = metadata["files"]
+        self.states: list[list] = metadata["states"]
+        self.trigrams = np.load(generation / TRIGRAMS_FILE, mmap_mode="r")
+        self.offsets = np.load(generation / OFFSETS_FILE, mmap_mode="r")
+        self.postings = np.load(generation / POSTINGS_FILE, mmap_mode="r")
+
+    def _posting_list(
+        self,
+        trigram: int,
+    ) -> np.ndarray:
+        position = int(np.searchsorted(self.trigrams, trigram))
+        if position == len(self.trigrams) or self.trigrams[position] != trigram:
+            return np.zeros(0, dtype=np.int32)
+        return self.postings[self.offsets[position]:self.offsets[position + 1]]
+
+    def _literal_candidates(
+        self,
+        literal: str,
+    ) -> np.ndarray | None:
+        """File ids containing every trigram of ``literal``; None if unconstrained."""
+        keys = literal_trigrams(literal)
+        if not len(keys):
+            return None
+        lists = sorted((self._posting_list(int(key)) for key in keys), key=len)
+        result = np.asarray(lists[0])
+        for posting in lists[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, posting, assume_unique=True)
+        return result
+
+    def _evaluate(
+        self,
+        query: tuple,
+    ) -> np.ndarray | None:
+        """Candidate file ids for a literal query tree; None means all files."""
+        kind = query[0]
+        if kind == "all":
+            return None
+        if kind == "lit":
+            return self._literal_candidates(query[1])
+
+        results = [self._evaluate(part) for part in query[1]]
+        if kind == "or":
+            if any(result is None for result in results):
+                return None
+            return np.unique(np.concatenate(results))
+
+        constrained = [result for result in results if result is not None]
+        if not constrained:
+            return None
+        combined = constrained[0]
+        for result in constrained[1:]:
+            combined = np.intersect1d(combined, result, assume_unique=True)
+        return combined
+
+    def candidates(
+        self,
+        pattern: str,
+        regex: bool = False,
+    ) -> np.ndarray:
+        """File ids that may contain a match of ``pattern``."""
+        query = (
+            _required_literals(sre_parse.parse(pattern)) if regex
+            else ("lit", pattern)
+        )
+        result = self._evaluate(query)
+        if result is None:
+            return np.arange(len(self.files), dtype=np.int32)
+        return np.asarray(result, dtype=np.int32)
+
+    def search(
+        self,
+        pattern: str,
+        regex: bool = False,
+        ignore_case: bool = False,
+        path_glob: str | None = None,
+        max_results: int = 1000,
+    ) -> list[Match]:
+        """Return matching lines, verifying only candidate files.
+
+        Patterns are matched line by line as grep does, so ``^`` and ``$``
+        anchor at line boundaries.
+        """
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        compiled = re.compile(pattern if regex else re.escape(pattern), flags)
+
+        matches = []
+        for file_id in self.candidates(pattern, regex):
+            path = self.files[file_id]
+            if path_glob and not fnmatch.fnmatch(path, path_glob):
+                continue
+            try:
+                raw = (self.root / path).read_bytes()
+            except OSError:
+                continue
+            count("files_scanned")
+            count("bytes_read", len(raw))
+            text = raw.decode("utf-8", errors="replace")
+            if not compiled.search(text):
+                continue
+            for line_number, line in enumerate(text.splitlines(), start=1):
+                if compiled.search(line):
+                    matches.append(Match(path, line_number, line))
+                    if len(matches) >= max_results:
+                        return matches
+        return matches
+
+
+def load_trigram_index(
+    index_root: Path
+) -> TrigramIndex:
+    """Open the current generation of an index written by build_trigram_index."""
+    generation = current_generation(index_root)
+    if generation is None:
+        raise FileNotFoundError(f"No trigram index under {index_root}")
+    return TrigramIndex(generation)
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Trigram code search")
+    parser.add_argument("repo_dir", type=Path, help="Repository to index")
+    parser.add_argument("pattern", nargs="?", help="Pattern to search for")
+    parser.add_argument("--regex", action="store_true", help="Treat pattern as a regex")
+    parser.add_argument("-i", "--ignore-case", action="store_true")
+    parser.add_argument("--glob", default=None, help="Only report paths matching this glob")
+    parser.add_argument("--index-dir", type=Path, default=None)
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index first")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Build the index if needed and run an optional search."""
+    args = _parse_args()
+    index_root = args.index_dir or INDEX_ROOT / args.repo_dir.resolve().name
+    if args.rebuild or current_generation(index_root) is None:
+        build_trigram_index(args.repo_dir, index_root)
+    index = load_trigram_index(index_root)
+    print(
+        f"Index {index.generation}: {len(index.files)} files, "
+        f"{len(index.trigrams)} trigrams"
+    )
+
+    if args.pattern:
+        with tracer.request("code_search", pattern=args.pattern):
+            for match in index.search(
+                args.pattern,
+                regex=args.regex,
+                ignore_case=args.ignore_case,
+                path_glob=args.glob,
+            ):
+                print(f"{match.path}:{match.line_number}: {match.line}")
+
+
+if __name__ == "__main__":
+    main()
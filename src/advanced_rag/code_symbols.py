@@ -0,0 +1,666 @@
+"""
+Structural index of the Part 1 codebase: API routes, entry points and
+declared dependencies.
+
+Questions such as "What is the main entry point file for the registry
+service?" or "What are all the API endpoints and what scopes do they
+require?" otherwise need a broad grep-and-read on every ask. This module
+extracts the answers from the code once:
+
+- every FastAPI route decorator (``@router.get(...)``, ``@app.api_route``,
+  ...) with method, full path (router and ``include_router`` prefixes
+  applied), handler, ``Depends``/``Security`` dependencies and scopes
+- ``if __name__ == "__main__"`` blocks, ``uvicorn.run`` calls, FastAPI app
+  instances, ``[project.scripts]`` and Dockerfile ``CMD``/``ENTRYPOINT``
+- dependencies from ``pyproject.toml``, ``requirements*.txt`` and
+  ``package.json``
+- file counts per extension
+
+Facts are stored per file, so SymbolIndex.refresh (an IncrementalCodeIndexer
+listener) only re-parses changed files. Answers for the known question
+types are rendered once per build; SymbolIndex.answer matches the question
+and returns the prepared context, or None so the caller falls back to
+search.
+
+Example::
+
+    symbols = load_symbol_index(Path("mcp-gateway-registry"))
+    context = symbols.answer("What API endpoints exist and which scopes do they need?")
+    if context is None:
+        context = run_search_tools(question)
+
+Run as a script to build the index and print the prepared answers:
+
+    python -m advanced_rag.code_symbols mcp-gateway-registry
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import re
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from advanced_rag.code_indexer import ChangeSet
+from advanced_rag.code_search import iter_source_files
+from advanced_rag.tracing import tracer
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+INDEX_ROOT = DATA_DIR / "index" / "code_symbols"
+SYMBOLS_FILE = "symbols.json"
+
+# Bump when extraction changes so stored facts are not reused
+EXTRACTOR_VERSION = 1
+
+HTTP_METHODS = {"get", "post", "put", "delete", "patch", "options", "head", "trace"}
+ROUTE_DECORATORS = HTTP_METHODS | {"api_route", "websocket"}
+APP_CLASSES = {"FastAPI", "APIRouter"}
+
+_SCOPE_CALL_RE = re.compile(r"scope|permission", re.IGNORECASE)
+_REQUIREMENT_NAME_RE = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+_DOCKER_ENTRY_RE = re.compile(r"^\s*(CMD|ENTRYPOINT)\s+(.*)", re.IGNORECASE)
+_PYPROJECT_DEPENDENCIES_RE = re.compile(r"^dependencies\s*=\s*\[(.*?)\]", re.DOTALL | re.MULTILINE)
+
+# Question patterns -> prepared answer key, checked in order. Each one only
+# matches questions asking for a listing, so "what starts the health check
+# task?" or "how does FastAPI dependency injection work?" go to search
+_LISTING = r"\b(all|list|every|which|what)\b[^?.]*"
+QUESTION_PATTERNS = [
+    ("routes", re.compile(_LISTING + r"\b(endpoints|routes)\b", re.IGNORECASE)),
+    ("entry_points", re.compile(
+        r"\b(entry ?points?|main (file|module|script))\b"
+        r"|\bhow (do|does|can) (i|you|we) (start|run|launch)\b[^?.]*"
+        r"\b(app|application|service|server|project)\b",
+        re.IGNORECASE,
+    )),
+    ("python_dependencies", re.compile(
+        _LISTING + r"\bpython\b[^?.]*\b(dependencies|packages|libraries)\b", re.IGNORECASE
+    )),
+    ("node_dependencies", re.compile(
+        _LISTING + r"\b(node|npm|javascript|typescript|frontend)\b[^?.]*"
+        r"\b(dependencies|packages|libraries)\b",
+        re.IGNORECASE,
+    )),
+    ("dependencies", re.compile(
+        _LISTING + r"\b(dependencies|requirements(\.txt)?|third[- ]party (packages|libraries))\b"
+        r"(?![^?.]*\b(injection|injected|inject)\b)",
+        re.IGNORECASE,
+    )),
+    ("file_types", re.compile(
+        _LISTING + r"\b(languages|file types|file extensions)\b[^?.]*"
+        r"\b(repo|repository|codebase|project|written)\b",
+        re.IGNORECASE,
+    )),
+]
+
+
+@dataclass
+class Route:
+    """One API route with its prefixes resolved."""
+
+    method: str
+    path: str
+    handler: str
+    file: str
+    line: int
+    dependencies: list[str] = field(default_factory=list)
+    scopes: list[str] = field(default_factory=list)
+
+
+def module_name(
+    path: str
+) -> str:
+    """Dotted module name of a repository-relative ``.py`` path."""
+    parts = Path(path).with_suffix("").parts
+    if parts and parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def _constant_strings(
+    node: ast.AST
+) -> list[str]:
+    """String constants anywhere inside ``node``."""
+    return [
+        child.value for child in ast.walk(node)
+        if isinstance(child, ast.Constant) and isinstance(child.value, str)
+    ]
+
+
+def _keyword(
+    call: ast.Call,
+    name: str,
+) -> ast.AST | None:
+    return next((kw.value for kw in call.keywords if kw.arg == name), None)
+
+
+def _string_value(
+    node: ast.AST | None
+) -> str:
+    """Value of a string constant or f-string (placeholders kept), else ''."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        return ast.unparse(node)[2:-1]
+    return ""
+
+
+def _callee(
+    call: ast.Call
+) -> str:
+    return ast.unparse(call.func)
+
+
+def _dependency_calls(
+    node: ast.AST
+) -> list[ast.Call]:
+    """``Depends(...)``/``Security(...)`` calls inside ``node``."""
+    return [
+        child for child in ast.walk(node)
+        if isinstance(child, ast.Call)
+        and _callee(child).split(".")[-1] in ("Depends", "Security")
+    ]
+
+
+def _describe_dependencies(
+    node: ast.AST
+) -> tuple[list[str], list[str]]:
+    """(dependencies, scopes) declared by the Depends/Security calls in ``node``."""
+    dependencies, scopes = [], []
+    for call in _dependency_calls(node):
+        if call.args:
+            dependencies.append(ast.unparse(call.args[0]))
+            # Factory dependencies such as Depends(require_scope("servers:read"))
+            if isinstance(call.args[0], ast.Call):
+                scopes.extend(_constant_strings(call.args[0]))
+        scope_list = _keyword(call, "scopes")
+        if scope_list is not None:
+            scopes.extend(_constant_strings(scope_list))
+    return dependencies, scopes
+
+
+def _scope_checks(
+    function: ast.AST
+) -> list[str]:
+    """String arguments of scope/permission checks called in a handler body."""
+    scopes = []
+    for child in ast.walk(function):
+        if isinstance(child, ast.Call) and _SCOPE_CALL_RE.search(_callee(child)):
+            for arg in child.args:
+                if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                    scopes.append(arg.value)
+    return scopes
+
+
+def _resolve_import(
+    path: str,
+    node: ast.ImportFrom,
+) -> str:
+    """Absolute module of a (possibly relative) ``from ... import``."""
+    if not node.level:
+        return node.module or ""
+    package = module_name(path).split(".")
+    if not path.endswith("__init__.py"):
+        package = package[:-1]
+    base = package[:len(package) - node.level + 1]
+    return ".".join(base + ([node.module] if node.module else []))
+
+
+def analyze_python(
+    path: str,
+    source: str,
+) -> dict:
+    """Per-file facts: imports, app/router objects, include_router calls,
+    routes (unprefixed) and entry points.
+    """
+    tree = ast.parse(source)
+    module = module_name(path)
+    imports: dict[str, str] = {}
+    routers: dict[str, dict] = {}
+    includes: list[dict] = []
+    routes: list[dict] = []
+    entry_points: list[dict] = []
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            base = _resolve_import(path, node)
+            for alias in node.names:
+                imports[alias.asname or alias.name] = f"{base}.{alias.name}"
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                imports[alias.asname or alias.name.split(".")[0]] = (
+                    alias.name if alias.asname else alias.name.split(".")[0]
+                )
+
+    def reference(expr: ast.AST) -> str:
+        """Dotted ``module.attribute`` of a router expression."""
+        if isinstance(expr, ast.Name):
+            return imports.get(expr.id, f"{module}.{expr.id}")
+        if isinstance(expr, ast.Attribute) and isinstance(expr.value, ast.Name):
+            return f"{imports.get(expr.value.id, expr.value.id)}.{expr.attr}"
+        return ast.unparse(expr)
+
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Assign)
+            and isinstance(node.value, ast.Call)
+            and _callee(node.value).split(".")[-1] in APP_CLASSES
+        ):
+            dependencies, scopes = _describe_dependencies(
+                _keyword(node.value, "dependencies") or ast.List(elts=[])
+            )
+            kind = _callee(node.value).split(".")[-1]
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    routers[target.id] = {
+                        "kind": kind,
+                        "prefix": _string_value(_keyword(node.value, "prefix")),
+                        "dependencies": dependencies,
+                        "scopes": scopes,
+                        "line": node.lineno,
+                    }
+                    if kind == "FastAPI":
+                        entry_points.append(
+                            {"kind": "app", "file": path, "line": node.lineno,
+                             "detail": f"{target.id} = {kind}(...)"}
+                        )
+
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            if node.func.attr == "include_router" and node.args:
+                dependencies, scopes = _describe_dependencies(
+                    _keyword(node, "dependencies") or ast.List(elts=[])
+                )
+                includes.append({
+                    "parent": reference(node.func.value),
+                    "router": reference(node.args[0]),
+                    "prefix": _string_value(_keyword(node, "prefix")),
+                    "dependencies": dependencies,
+                    "scopes": scopes,
+                })
+            elif _callee(node) == "uvicorn.run":
+                target = ast.unparse(node.args[0]) if node.args else ""
+                entry_points.append(
+                    {"kind": "uvicorn", "file": path, "line": node.lineno,
+                     "detail": f"uvicorn.run({target})"}
+                )
+
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for decorator in node.decorator_list:
+                if not (
+                    isinstance(decorator, ast.Call)
+                    and isinstance(decorator.func, ast.Attribute)
+                    and decorator.func.attr in ROUTE_DECORATORS
+                ):
+                    continue
+                attr = decorator.func.attr
+                route_path = _string_value(
+                    decorator.args[0] if decorator.args else _keyword(decorator, "path")
+                )
+                if attr == "api_route":
+                    methods = [m.upper() for m in _constant_strings(
+                        _keyword(decorator, "methods") or ast.List(elts=[])
+                    )] or ["GET"]
+                else:
+                    methods = ["WEBSOCKET" if attr == "websocket" else attr.upper()]
+
+                dependencies, scopes = _describe_dependencies(
+                    _keyword(decorator, "dependencies") or ast.List(elts=[])
+                )
+                arguments = node.args.args + node.args.kwonlyargs
+                defaults = node.args.defaults + node.args.kw_defaults
+                for arg in arguments:
+                    annotated, annotated_scopes = _describe_dependencies(
+                        arg.annotation or ast.List(elts=[])
+                    )
+                    dependencies.extend(f"{arg.arg}: {dep}" for dep in annotated)
+                    scopes.extend(annotated_scopes)
+                for arg, default in zip(arguments[len(arguments) - len(defaults):], defaults):
+                    if default is None:
+                        continue
+                    declared, declared_scopes = _describe_dependencies(default)
+                    dependencies.extend(f"{arg.arg}: {dep}" for dep in declared)
+                    scopes.extend(declared_scopes)
+                scopes.extend(_scope_checks(node))
+
+                for method in methods:
+                    routes.append({
+                        "router": reference(decorator.func.value),
+                        "method": method,
+                        "path": route_path,
+                        "handler": node.name,
+                        "line": node.lineno,
+                        "dependencies": dependencies,
+                        "scopes": list(dict.fromkeys(scopes)),
+                    })
+
+    for node in tree.body:
+        if (
+            isinstance(node, ast.If)
+            and isinstance(node.test, ast.Compare)
+            and ast.unparse(node.test).replace("'", '"') == '__name__ == "__main__"'
+        ):
+            calls = [
+                _callee(child) for child in ast.walk(node) if isinstance(child, ast.Call)
+            ]
+            entry_points.append(
+                {"kind": "main", "file": path, "line": node.lineno,
+                 "detail": f"__main__ calls {', '.join(dict.fromkeys(calls)) or 'nothing'}"}
+            )
+
+    return {
+        "module": module,
+        "routers": routers,
+        "includes": includes,
+        "routes": routes,
+        "entry_points": entry_points,
+    }
+
+
+def _parse_pyproject(
+    path: str,
+    text: str,
+) -> dict:
+    """Dependencies and console scripts of a pyproject.toml."""
+    if tomllib is None:
+        match = _PYPROJECT_DEPENDENCIES_RE.search(text)
+        names = re.findall(r"[\"']([^\"']+)[\"']", match.group(1)) if match else []
+        return {"dependencies": {"python": names}, "entry_points": []}
+
+    data = tomllib.loads(text)
+    project = data.get("project", {})
+    dependencies = list(project.get("dependencies", []))
+    for group, extra in project.get("optional-dependencies", {}).items():
+        dependencies.extend(f"{requirement} [{group}]" for requirement in extra)
+    poetry = data.get("tool", {}).get("poetry", {})
+    dependencies.extend(
+        f"{name} {spec}" if isinstance(spec, str) else name
+        for name, spec in poetry.get("dependencies", {}).items()
+        if name != "python"
+    )
+    scripts = {**project.get("scripts", {}), **poetry.get("scripts", {})}
+    return {
+        "dependencies": {"python": dependencies},
+        "entry_points": [
+            {"kind": "script", "file": path, "line": 0, "detail": f"{name} = {target}"}
+            for name, target in scripts.items()
+        ],
+    }
+
+
+def analyze_file(
+    path: str,
+    content: bytes,
+) -> dict:
+    """Facts for one repository-relative file; empty for irrelevant files."""
+    name = Path(path).name
+    text = content.decode("utf-8", errors="replace")
+    try:
+        if path.endswith(".py"):
+            return analyze_python(path, text)
+        if name == "pyproject.toml":
+            return _parse_pyproject(path, text)
+        if name == "package.json":
+            data = json.loads(text)
+            return {"dependencies": {"node": [
+                f"{package} {version}" + ("" if section == "dependencies" else f" [{section}]")
+                for section in ("dependencies", "devDependencies", "peerDependencies")
+                for package, version in data.get(section, {}).items()
+            ]}}
+    except (SyntaxError, ValueError) as exc:
+        return {"error": f"{type(exc).__name__}: {exc}"}
+    if name.startswith("requirements") and name.endswith(".txt"):
+        return {"dependencies": {"python": [
+            line.split("#")[0].strip() for line in text.splitlines()
+            if _REQUIREMENT_NAME_RE.match(line) and not line.lstrip().startswith("-")
+        ]}}
+    if name == "Dockerfile" or name.startswith("Dockerfile."):
+        return {"entry_points": [
+            {"kind": "docker", "file": path, "line": number, "detail": match.group(0).strip()}
+            for number, line in enumerate(text.splitlines(), start=1)
+            if (match := _DOCKER_ENTRY_RE.match(line))
+        ]}
+    return {}
+
+
+def _file_type(
+    path: str
+) -> str:
+    name = Path(path).name
+    if name == "Dockerfile" or name.startswith("Dockerfile."):
+        return "Dockerfile"
+    return Path(path).suffix.lower() or name
+
+
+class SymbolIndex:
+    """Per-file structural facts with resolved routes and prepared answers."""
+
+    def __init__(
+        self,
+        repo_dir: Path,
+        files: dict[str, dict] | None = None,
+    ) -> None:
+        self.repo_dir = repo_dir
+        # path -> {"hash": sha1, "facts": {...}}
+        self.files: dict[str, dict] = files or {}
+        self.routes: list[Route] = []
+        self.answers: dict[str, str] = {}
+        self._resolve()
+
+    def _analyze(
+        self,
+        paths: list[str],
+    ) -> None:
+        for path in paths:
+            try:
+                content = (self.repo_dir / path).read_bytes()
+            except OSError:
+                # Deleted or unreadable since it was listed; drop its old facts
+                self.files.pop(path, None)
+                continue
+            digest = hashlib.sha1(content).hexdigest()
+            if self.files.get(path, {}).get("hash") != digest:
+                self.files[path] = {"hash": digest, "facts": analyze_file(path, content)}
+
+    def refresh(
+        self,
+        changes: ChangeSet,
+    ) -> None:
+        """Re-analyze changed files; usable as an IncrementalCodeIndexer listener."""
+        for path in changes.removed:
+            self.files.pop(path, None)
+        self._analyze(changes.added + changes.modified)
+        self._resolve()
+
+    def _resolve(self) -> None:
+        """Apply router and include_router prefixes, then render answers."""
+        routers: dict[str, dict] = {}
+        for entry in self.files.values():
+            facts = entry["facts"]
+            for name, router in facts.get("routers", {}).items():
+                routers[f"{facts['module']}.{name}"] = router
+
+        def canonical(reference: str) -> str:
+            """Match a dotted reference to a known router, tolerating src/ layouts."""
+            if reference in routers:
+                return reference
+            return next(
+                (key for key in routers if key.endswith(f".{reference}")), reference
+            )
+
+        mounts: dict[str, list[dict]] = {}
+        for entry in self.files.values():
+            for include in entry["facts"].get("includes", []):
+                mounts.setdefault(canonical(include["router"]), []).append(include)
+
+        def mount_points(router_key: str, seen: frozenset = frozenset()) -> list[tuple]:
+            """(prefix, dependencies, scopes) for every place a router is mounted."""
+            router = routers.get(router_key, {})
+            own = (
+                router.get("prefix", ""),
+                router.get("dependencies", []),
+                router.get("scopes", []),
+            )
+            parents = [m for m in mounts.get(router_key, []) if router_key not in seen]
+            if not parents:
+                return [own]
+            points = []
+            for include in parents:
+                for prefix, dependencies, scopes in mount_points(
+                    canonical(include["parent"]), seen | {router_key}
+                ):
+                    points.append((
+                        prefix + include["prefix"] + own[0],
+                        dependencies + include["dependencies"] + own[1],
+                        scopes + include["scopes"] + own[2],
+                    ))
+            return points
+
+        self.routes = []
+        for path, entry in sorted(self.files.items()):
+            for route in entry["facts"].get("routes", []):
+                for prefix, dependencies, scopes in mount_points(canonical(route["router"])):
+                    self.routes.append(Route(
+                        method=route["method"],
+                        path=prefix + route["path"],
+                        handler=route["handler"],
+                        file=path,
+                        line=route["line"],
+                        dependencies=list(dict.fromkeys(dependencies + route["dependencies"])),
+                        scopes=list(dict.fromkeys(scopes + route["scopes"])),
+                    ))
+        self.routes.sort(key=lambda route: (route.path, route.method))
+        self.answers = self._render_answers()
+
+    def _render_answers(self) -> dict[str, str]:
+        """Context text for each question type, rendered once per build."""
+        routes = [
+            f"{route.method} {route.path} -> {route.handler} ({route.file}:{route.line})"
+            + (f"\n    dependencies: {', '.join(route.dependencies)}" if route.dependencies else "")
+            + (f"\n    scopes: {', '.join(route.scopes)}" if route.scopes else "")
+            for route in self.routes
+        ]
+
+        entry_points = []
+        for path, entry in sorted(self.files.items()):
+            for point in entry["facts"].get("entry_points", []):
+                location = f"{path}:{point['line']}" if point["line"] else path
+                entry_points.append(f"[{point['kind']}] {location}: {point['detail']}")
+
+        dependencies: dict[str, list[str]] = {"python": [], "node": []}
+        for path, entry in sorted(self.files.items()):
+            for ecosystem, declared in entry["facts"].get("dependencies", {}).items():
+                if declared:
+                    dependencies[ecosystem].append(
+                        f"{path}:\n" + "\n".join(f"  - {item}" for item in declared)
+                    )
+
+        file_types = Counter(_file_type(path) for path in self.files)
+        answers = {
+            "routes": f"API routes ({len(self.routes)}):\n" + "\n".join(routes),
+            "entry_points": "Entry points:\n" + "\n".join(entry_points),
+            "python_dependencies": "Python dependencies:\n" + "\n".join(dependencies["python"]),
+            "node_dependencies": "Node dependencies:\n" + "\n".join(dependencies["node"]),
+            "file_types": "File types (files per extension):\n" + "\n".join(
+                f"{file_type}: {count}" for file_type, count in file_types.most_common()
+            ),
+        }
+        answers["dependencies"] = (
+            answers["python_dependencies"] + "\n\n" + answers["node_dependencies"]
+        )
+        return answers
+
+    def answer(
+        self,
+        question: str,
+    ) -> str | None:
+        """Prepared context for a known question type, else None."""
+        for key, pattern in QUESTION_PATTERNS:
+            if pattern.search(question):
+                return self.answers[key]
+        return None
+
+    def answer_or_search(
+        self,
+        question: str,
+        search: Callable[[str], str],
+    ) -> str:
+        """Prepared context when available, otherwise ``search(question)``."""
+        context = self.answer(question)
+        return context if context is not None else search(question)
+
+    def save(
+        self,
+        path: Path,
+    ) -> None:
+        """Write per-file facts as JSON."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(
+                {"version": EXTRACTOR_VERSION, "root": str(self.repo_dir.resolve()),
+                 "files": self.files},
+                f,
+            )
+
+
+def build_symbol_index(
+    repo_dir: Path
+) -> SymbolIndex:
+    """Analyze every indexable file under ``repo_dir``."""
+    index = SymbolIndex(repo_dir)
+    index._analyze([str(path.relative_to(repo_dir)) for path in iter_source_files(repo_dir)])
+    index._resolve()
+    return index
+
+
+def load_symbol_index(
+    repo_dir: Path,
+    index_path: Path | None = None,
+) -> SymbolIndex:
+    """Load stored facts, re-analyzing only files whose content changed."""
+    index_path = index_path or INDEX_ROOT / repo_dir.resolve().name / SYMBOLS_FILE
+    files = {}
+    if index_path.exists():
+        with open(index_path) as f:
+            stored = json.load(f)
+        if stored.get("version") == EXTRACTOR_VERSION:
+            files = stored["files"]
+
+    paths = [str(path.relative_to(repo_dir)) for path in iter_source_files(repo_dir)]
+    index = SymbolIndex(repo_dir, {path: files[path] for path in paths if path in files})
+    index._analyze(paths)
+    index._resolve()
+    index.save(index_path)
+    return index
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Build the code symbol index")
+    parser.add_argument("repo_dir", type=Path, help="Repository to analyze")
+    parser.add_argument("question", nargs="?", help="Print the prepared context for a question")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Build or refresh the index and print prepared answers."""
+    args = _parse_args()
+    index = load_symbol_index(args.repo_dir)
+    if args.question:
+        with tracer.request("code_symbols", question=args.question):
+            print(index.answer(args.question) or "No prepared answer; fall back to search")
+        return
+    for answer in index.answers.values():
+        print(answer, end="\n\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+"""
+Token-budgeted context assembly for the answer prompt.
+
+Multi-source answers combine CSV aggregates, review chunks, code excerpts
+and bash tool output, and the README warns that bash output can be large.
+ContextPacker turns scored context items into a prompt section that fits a
+fixed token budget:
+
+1. every item is tokenized once; unit (line/sentence) token counts are
+   derived from the same pass and reused by compression
+2. duplicates are removed: identical text (repeated reviews), overlapping
+   or adjacent line ranges of the same file (merged into one excerpt), and
+   near-duplicates by token-shingle Jaccard similarity
+3. items are ranked by score and packed greedily
+4. an item that does not fit whole is compressed extractively: its lines
+   or sentences that best overlap the question are kept, in their original
+   order, until the remaining budget is used
+
+Token counts come from a pluggable counter; the default regex tokenizer
+approximates BPE counts closely enough for budgeting without loading a
+model-specific tokenizer.
+
+PackingCombiner applies the same packing to MultiSourceExecutor results.
+
+Example::
+
+    packer = ContextPacker(budget=2000)
+    items = [item_from_retrieved(hit) for hit in retriever.search(question, k=20)]
+    packed = packer.pack(items, question)
+    prompt = f"Context:\\n{packed.text}\\n\\nQuestion: {question}"
+
+    combiner = PackingCombiner(
+        question, packer, itemizers={"text": lambda hits: map(item_from_retrieved, hits)}
+    )
+    executor.run(question, ROUTE_SOURCES["both"], combiner)
+    context = combiner.render()
+"""
+
+import hashlib
+import re
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from advanced_rag.executor import ContextCombiner
+
+if TYPE_CHECKING:
+    from advanced_rag.bash_tools import ToolResult
+    from advanced_rag.code_chunker import CodeChunk
+    from advanced_rag.hybrid_retriever import RetrievedChunk
+
+
+DEFAULT_BUDGET = 3000
+DEFAULT_NEAR_DUPLICATE = 0.9
+# Do not bother compressing into less than this many tokens
+MIN_FRAGMENT_TOKENS = 24
+SHINGLE_SIZE = 3
+ELLIPSIS = "..."
+SECTION_SEPARATOR = "\n\n"
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'])")
+_WORD_RE = re.compile(r"\w+")
+
+
+def count_tokens(
+    text: str
+) -> int:
+    """Approximate LLM token count: words and punctuation marks."""
+    return len(_TOKEN_RE.findall(text))
+
+
+@dataclass
+class ContextItem:
+    """One piece of candidate context.
+
+    Items with ``path`` and a line range are excerpts of a file; their
+    ranges are merged when they overlap.
+    """
+
+    text: str
+    score: float
+    source: str
+    path: str | None = None
+    start_line: int | None = None
+    end_line: int | None = None
+
+
+@dataclass
+class PackedContext:
+    """The packed prompt section and what happened to each item."""
+
+    text: str
+    tokens: int
+    included: list[ContextItem] = field(default_factory=list)
+    compressed: list[ContextItem] = field(default_factory=list)
+    dropped: list[ContextItem] = field(default_factory=list)
+    duplicates: int = 0
+
+
+def item_from_retrieved(
+    hit: "RetrievedChunk"
+) -> ContextItem:
+    """A product-page chunk from HybridRetriever."""
+    return ContextItem(
+        text=hit.chunk.text,
+        score=hit.score,
+        source=f"{hit.chunk.source} - {hit.chunk.section}",
+    )
+
+
+def item_from_code_chunk(
+    chunk: "CodeChunk",
+    score: float,
+) -> ContextItem:
+    """A code chunk; its import header is left out to save tokens."""
+    return ContextItem(
+        text=chunk.body,
+        score=score,
+        source=f"{chunk.path}:{chunk.start_line}-{chunk.end_line} ({chunk.symbol})",
+        path=chunk.path,
+        start_line=chunk.start_line,
+        end_line=chunk.end_line,
+    )
+
+
+def item_from_tool_result(
+    result: "ToolResult",
+    score: float,
+) -> ContextItem:
+    """Output of a bash tool command."""
+    return ContextItem(text=result.output, score=score, source=f"$ {result.command}")
+
+
+class _Prepared:
+    """An item with its tokenization, computed once.
+
+    ``unit_tokens`` are the regex tokens of each unit, used for relevance
+    and near-duplicate checks; ``unit_costs`` and ``tokens`` come from the
+    packer's token counter.
+    """
+
+    __slots__ = ("item", "units", "unit_tokens", "unit_costs", "tokens", "shingles")
+
+    def __init__(
+        self,
+        item: ContextItem,
+        header_tokens: int,
+        token_counter: Callable[[str], int],
+    ) -> None:
+        self.item = item
+        self.units = _split_units(item.text)
+        self.unit_tokens = [_TOKEN_RE.findall(unit) for unit in self.units]
+        if token_counter is count_tokens:
+            self.unit_costs = [len(tokens) for tokens in self.unit_tokens]
+            body_tokens = sum(self.unit_costs)
+        else:
+            self.unit_costs = [token_counter(unit) for unit in self.units]
+            body_tokens = token_counter(item.text)
+        self.tokens = header_tokens + body_tokens
+        words = [token.lower() for tokens in self.unit_tokens for token in tokens]
+        self.shingles = {
+            hash(tuple(words[i:i + SHINGLE_SIZE]))
+            for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))
+        }
+
+
+def _split_units(
+    text: str
+) -> list[str]:
+    """Lines, with long prose lines further split into sentences."""
+    units = []
+    for line in text.splitlines():
+        if len(line) > 200:
+            units.extend(_SENTENCE_RE.split(line))
+        else:
+            units.append(line)
+    return units
+
+
+def merge_line_ranges(
+    items: Sequence[ContextItem]
+) -> tuple[list[ContextItem], int]:
+    """Merge overlapping or adjacent excerpts of the same file.
+
+    Returns the items and how many were merged away. Excerpts that merge
+    with nothing are returned unchanged; a merged excerpt is labelled
+    ``path:start-end`` and keeps the highest score.
+    """
+    ranged: dict[str, list[ContextItem]] = {}
+    others = []
+    for item in items:
+        if item.path is not None and item.start_line is not None:
+            ranged.setdefault(item.path, []).append(item)
+        else:
+            others.append(item)
+
+    merged_away = 0
+    result = list(others)
+    for path, excerpts in ranged.items():
+        excerpts.sort(key=lambda item: item.start_line)
+        groups: list[list[ContextItem]] = []
+        group_end = 0
+        for item in excerpts:
+            end = item.end_line or item.start_line + len(item.text.splitlines()) - 1
+            if groups and item.start_line <= group_end + 1:
+                groups[-1].append(item)
+                group_end = max(group_end, end)
+            else:
+                groups.append([item])
+                group_end = end
+
+        for group in groups:
+            if len(group) == 1:
+                result.append(group[0])
+                continue
+            merged_away += len(group) - 1
+            lines: dict[int, str] = {}
+            for item in group:
+                for offset, line in enumerate(item.text.splitlines()):
+                    lines.setdefault(item.start_line + offset, line)
+            start = group[0].start_line
+            end = max(
+                item.end_line or item.start_line + len(item.text.splitlines()) - 1
+                for item in group
+            )
+            result.append(ContextItem(
+                text="\n".join(lines[n] for n in sorted(lines)),
+                score=max(item.score for item in group),
+                source=f"{path}:{start}-{end}",
+                path=path,
+                start_line=start,
+                end_line=end,
+            ))
+    return result, merged_away
+
+
+class ContextPacker:
+    """Deduplicate, rank and pack context items into a token budget."""
+
+    def __init__(
+        self,
+        budget: int = DEFAULT_BUDGET,
+        near_duplicate: float = DEFAULT_NEAR_DUPLICATE,
+        token_counter: Callable[[str], int] = count_tokens,
+    ) -> None:
+        self.budget = budget
+        self.near_duplicate = near_duplicate
+        self.token_counter = token_counter
+
+    def _header(
+        self,
+        item: ContextItem,
+    ) -> str:
+        return f"[{item.source}]"
+
+    def _header_cost(
+        self,
+        item: ContextItem,
+    ) -> int:
+        """Tokens of the header line including its newline."""
+        return self.token_counter(self._header(item)) + self.token_counter("\n")
+
+    def _deduplicate(
+        self,
+        items: Sequence[ContextItem],
+    ) -> tuple[list[_Prepared], int]:
+        """Drop identical and near-identical items, keeping the better scored."""
+        items, duplicates = merge_line_ranges(items)
+        seen_text = set()
+        kept: list[_Prepared] = []
+        for item in sorted(items, key=lambda item: -item.score):
+            digest = hashlib.sha1(" ".join(item.text.split()).lower().encode()).digest()
+            if digest in seen_text or not item.text.strip():
+                duplicates += 1
+                continue
+            seen_text.add(digest)
+
+            prepared = _Prepared(item, self._header_cost(item), self.token_counter)
+            if any(
+                len(prepared.shingles & other.shingles)
+                / len(prepared.shingles | other.shingles) >= self.near_duplicate
+                for other in kept
+            ):
+                duplicates += 1
+                continue
+            kept.append(prepared)
+        return kept, duplicates
+
+    def _compress(
+        self,
+        prepared: _Prepared,
+        budget: int,
+        query_words: set[str],
+    ) -> str | None:
+        """Best-matching units of an item that fit ``budget`` tokens, in order.
+
+        ``budget`` covers the header line; skipped runs of units are marked
+        with an ellipsis line, whose cost is counted too.
+        """
+        available = budget - self._header_cost(prepared.item)
+        if available < MIN_FRAGMENT_TOKENS:
+            return None
+        newline = self.token_counter("\n")
+        ellipsis = self.token_counter(ELLIPSIS)
+        last = len(prepared.units) - 1
+
+        def cost(positions: list[int]) -> int:
+            """Tokens of the fragment rendered from sorted ``positions``."""
+            if not positions:
+                return 0
+            ellipses = int(positions[0] != 0) + int(positions[-1] != last) + sum(
+                1 for a, b in zip(positions, positions[1:]) if b != a + 1
+            )
+            lines = len(positions) + ellipses
+            return (
+                sum(prepared.unit_costs[position] for position in positions)
+                + ellipses * ellipsis
+                + (lines - 1) * newline
+            )
+
+        def relevance(position: int) -> tuple:
+            words = {token.lower() for token in prepared.unit_tokens[position]}
+            # Prefer question overlap, then earlier units
+            return (-len(words & query_words), position)
+
+        def render(positions: list[int]) -> str:
+            parts, previous = [], -1
+            for position in positions:
+                if position != previous + 1:
+                    parts.append(ELLIPSIS)
+                parts.append(prepared.units[position])
+                previous = position
+            if previous != last:
+                parts.append(ELLIPSIS)
+            return "\n".join(parts)
+
+        chosen: list[int] = []
+        added: list[int] = []
+        for position in sorted(range(len(prepared.units)), key=relevance):
+            if not prepared.unit_costs[position]:
+                continue
+            candidate = sorted(chosen + [position])
+            if cost(candidate) <= available:
+                chosen = candidate
+                added.append(position)
+
+        # A counter that is not additive over lines can still overshoot;
+        # drop the least relevant units until the rendered fragment fits
+        while chosen:
+            fragment = render(chosen)
+            if self.token_counter(fragment) <= available:
+                return fragment
+            chosen.remove(added.pop())
+        return None
+
+    def pack(
+        self,
+        items: Sequence[ContextItem],
+        query: str = "",
+    ) -> PackedContext:
+        """Pack ``items`` into the budget, best score first.
+
+        ``tokens`` counts every section with its header and the blank line
+        separating it from the previous one, and never exceeds the budget.
+        """
+        prepared, duplicates = self._deduplicate(items)
+        query_words = {word.lower() for word in _WORD_RE.findall(query)}
+        separator = self.token_counter(SECTION_SEPARATOR)
+
+        sections, used = [], 0
+        packed = PackedContext(text="", tokens=0, duplicates=duplicates)
+        for entry in prepared:
+            spacing = separator if sections else 0
+            remaining = self.budget - used - spacing
+            if entry.tokens <= remaining:
+                sections.append(f"{self._header(entry.item)}\n{entry.item.text}")
+                used += spacing + entry.tokens
+                packed.included.append(entry.item)
+                continue
+
+            fragment = self._compress(entry, remaining, query_words)
+            if fragment is None:
+                packed.dropped.append(entry.item)
+                continue
+            sections.append(f"{self._header(entry.item)}\n{fragment}")
+            used += spacing + self._header_cost(entry.item) + self.token_counter(fragment)
+            packed.compressed.append(entry.item)
+
+        packed.text = SECTION_SEPARATOR.join(sections)
+        packed.tokens = used
+        return packed
+
+
+class PackingCombiner(ContextCombiner):
+    """A ContextCombiner that packs source results into a token budget.
+
+    ``itemizers`` turn a source's content into scored items; a source
+    without one becomes a single item scored ``default_score``. Notices
+    for degraded sources are always kept and count against the budget.
+    """
+
+    def __init__(
+        self,
+        query: str,
+        packer: ContextPacker | None = None,
+        itemizers: Mapping[str, Callable[[Any], Iterable[ContextItem]]] | None = None,
+        formatters: Mapping[str, Callable[[Any], str]] | None = None,
+        default_score: float = 1.0,
+    ) -> None:
+        super().__init__(formatters)
+        self.query = query
+        self.packer = packer or ContextPacker()
+        self.itemizers = dict(itemizers or {})
+        self.default_score = default_score
+        self.packed: PackedContext | None = None
+
+    def render(self) -> str:
+        """Return the packed context text; details are kept in ``packed``."""
+        items, notices = [], []
+        for result in self.results:
+            if not result.ok:
+                notices.append(
+                    f"[{result.source}] unavailable: "
+                    + (result.error or f"no result within {result.elapsed:.2f}s")
+                )
+            elif result.source in self.itemizers:
+                items.extend(self.itemizers[result.source](result.content))
+            else:
+                formatter = self.formatters.get(result.source, str)
+                items.append(ContextItem(
+                    text=formatter(result.content),
+                    score=self.default_score,
+                    source=result.source,
+                ))
+
+        notice_text = "\n".join(notices)
+        notice_tokens = 0
+        if notice_text:
+            notice_tokens = self.packer.token_counter(SECTION_SEPARATOR + notice_text)
+        packer = ContextPacker(
+            max(self.packer.budget - notice_tokens, 0),
+            self.packer.near_duplicate,
+            self.packer.token_counter,
+        )
+        self.packed = packer.pack(items, self.query)
+        return SECTION_SEPARATOR.join(part for part in (self.packed.text, notice_text) if part)
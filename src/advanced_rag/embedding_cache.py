@@ -0,0 +1,398 @@
+"""
+Persistent embedding cache with batched, deduplicated encoding.
+
+Review texts, code chunks and user queries repeat across runs, and each
+repeat costs a sentence-transformers forward pass on CPU. CachedEncoder
+puts three layers in front of the model:
+
+1. an in-memory LRU of recent vectors
+2. an on-disk store per model: an append-only float16 matrix read through
+   a memory map, plus a file of fixed-size SHA-1 keys giving the row of
+   each (model, normalization, text)
+3. the model itself, loaded only on the first miss; pending texts are
+   deduplicated and encoded together, longest first, in batches that are
+   persisted as they finish
+
+CachedEncoder.encode accepts the arguments the repo passes to
+``SentenceTransformer.encode``, so it can replace the encoder in
+build_product_index, HybridRetriever or QueryRouter. BatchingEncoder
+collects single-text requests from concurrent callers into one batch.
+
+The store assumes one writing process per cache directory. Within a
+process every encoder shares one EmbeddingStore per directory (see
+open_store), so row numbers are handed out in one place.
+
+Example::
+
+    encoder = CachedEncoder("all-MiniLM-L6-v2")
+    vectors = encoder.encode(texts, normalize_embeddings=True)
+    print(encoder.stats)
+"""
+
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import Future
+from pathlib import Path
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from advanced_rag.cache import LRUCache
+from advanced_rag.tracing import count, span
+
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+CACHE_DIR = DATA_DIR / "index" / "embedding_cache"
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_MEMORY_SIZE = 10_000
+# Texts encoded per call to the model; each group is persisted when done
+DEFAULT_FLUSH_SIZE = 4096
+DEFAULT_MAX_DELAY = 0.005
+
+VECTORS_FILE = "vectors.f16"
+KEYS_FILE = "keys.bin"
+META_FILE = "meta.json"
+KEY_BYTES = 20
+
+
+def embedding_key(
+    text: str,
+    model_name: str,
+    normalize: bool,
+) -> bytes:
+    """SHA-1 digest identifying an embedding."""
+    digest = hashlib.sha1(f"{model_name}\0{int(normalize)}\0".encode("utf-8"))
+    digest.update(text.encode("utf-8"))
+    return digest.digest()
+
+
+class EmbeddingStore:
+    """Append-only float16 vectors on disk, addressed by key.
+
+    Row ``i`` of ``vectors.f16`` belongs to the ``i``-th 20-byte key in
+    ``keys.bin``. Vectors are written before their keys, so after a crash
+    the shorter of the two files defines the valid rows.
+    """
+
+    def __init__(
+        self,
+        store_dir: Path,
+        dimension: int,
+    ) -> None:
+        self.store_dir = store_dir
+        self.dimension = dimension
+        self._vectors_path = store_dir / VECTORS_FILE
+        self._keys_path = store_dir / KEYS_FILE
+        self._lock = threading.Lock()
+
+        store_dir.mkdir(parents=True, exist_ok=True)
+        meta_path = store_dir / META_FILE
+        if meta_path.exists():
+            with open(meta_path) as f:
+                stored = json.load(f)["dimension"]
+            if stored != dimension:
+                raise ValueError(
+                    f"Embedding store {store_dir} has dimension {stored}, not {dimension}"
+                )
+        else:
+            with open(meta_path, "w") as f:
+                json.dump({"dimension": dimension, "dtype": "float16"}, f)
+        for path in (self._vectors_path, self._keys_path):
+            path.touch()
+
+        row_bytes = dimension * np.dtype(np.float16).itemsize
+        rows = min(
+            self._keys_path.stat().st_size // KEY_BYTES,
+            self._vectors_path.stat().st_size // row_bytes,
+        )
+        os.truncate(self._keys_path, rows * KEY_BYTES)
+        os.truncate(self._vectors_path, rows * row_bytes)
+
+        keys = self._keys_path.read_bytes()
+        self._rows = {
+            keys[offset:offset + KEY_BYTES]: row
+            for row, offset in enumerate(range(0, len(keys), KEY_BYTES))
+        }
+        self._matrix = self._map(rows)
+
+    def _map(
+        self,
+        rows: int,
+    ) -> np.ndarray | None:
+        if rows == 0:
+            return None
+        return np.memmap(
+            self._vectors_path, dtype=np.float16, mode="r", shape=(rows, self.dimension)
+        )
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def lookup(
+        self,
+        keys: Sequence[bytes],
+    ) -> dict[bytes, np.ndarray]:
+        """float32 vectors for the keys that are stored."""
+        with self._lock:
+            rows = {key: self._rows[key] for key in keys if key in self._rows}
+            matrix = self._matrix
+        if not rows:
+            return {}
+        vectors = np.asarray(matrix[list(rows.values())], dtype=np.float32)
+        return dict(zip(rows, vectors))
+
+    def add(
+        self,
+        keys: Sequence[bytes],
+        vectors: np.ndarray,
+    ) -> None:
+        """Append vectors for keys that are not stored yet."""
+        with self._lock:
+            new = [i for i, key in enumerate(keys) if key not in self._rows]
+            if not new:
+                return
+            with open(self._vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(vectors[new], dtype=np.float16).tobytes())
+            with open(self._keys_path, "ab") as f:
+                f.write(b"".join(keys[i] for i in new))
+            for i in new:
+                self._rows[keys[i]] = len(self._rows)
+            self._matrix = self._map(len(self._rows))
+
+
+_stores: dict[Path, EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(
+    store_dir: Path,
+    dimension: int,
+) -> EmbeddingStore:
+    """The process-wide EmbeddingStore for ``store_dir``.
+
+    Two stores over one directory would each number new rows from their
+    own count and overwrite each other's row assignments.
+    """
+    with _stores_lock:
+        store = _stores.get(store_dir.resolve())
+        if store is None:
+            store = _stores[store_dir.resolve()] = EmbeddingStore(store_dir, dimension)
+        elif store.dimension != dimension:
+            raise ValueError(
+                f"Embedding store {store_dir} has dimension {store.dimension}, not {dimension}"
+            )
+        return store
+
+
+def _model_dir_name(
+    model_name: str
+) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", model_name)
+
+
+class CachedEncoder:
+    """A SentenceTransformer-compatible encoder backed by EmbeddingStore."""
+
+    def __init__(
+        self,
+        model_name: str,
+        encoder: SentenceTransformer | None = None,
+        cache_dir: Path = CACHE_DIR,
+        memory_size: int = DEFAULT_MEMORY_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_size: int = DEFAULT_FLUSH_SIZE,
+    ) -> None:
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.flush_size = flush_size
+        self.memory = LRUCache(memory_size)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "encoded": 0, "duplicates": 0}
+        self._encoder = encoder
+        self._store_dir = cache_dir / _model_dir_name(model_name)
+        self._store: EmbeddingStore | None = None
+        self._lock = threading.Lock()
+
+        meta_path = self._store_dir / META_FILE
+        if meta_path.exists():
+            with open(meta_path) as f:
+                self._store = open_store(self._store_dir, json.load(f)["dimension"])
+
+    @property
+    def encoder(self) -> SentenceTransformer:
+        """The underlying model, loaded on first use."""
+        with self._lock:
+            if self._encoder is None:
+                self._encoder = SentenceTransformer(self.model_name)
+            return self._encoder
+
+    def get_sentence_embedding_dimension(self) -> int:
+        if self._store is not None:
+            return self._store.dimension
+        return self.encoder.get_sentence_embedding_dimension()
+
+    def _encode_missing(
+        self,
+        texts: list[str],
+        keys: list[bytes],
+        normalize: bool,
+        batch_size: int,
+    ) -> dict[bytes, np.ndarray]:
+        """Encode unique texts longest first and persist each group."""
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        found = {}
+        for start in range(0, len(order), self.flush_size):
+            group = order[start:start + self.flush_size]
+            with span("embedding.encode", texts=len(group)):
+                vectors = self.encoder.encode(
+                    [texts[i] for i in group],
+                    batch_size=batch_size,
+                    convert_to_numpy=True,
+                    normalize_embeddings=normalize,
+                    show_progress_bar=False,
+                )
+            # Round through float16 so results do not depend on cache state
+            vectors = np.asarray(vectors, dtype=np.float16).astype(np.float32)
+            group_keys = [keys[i] for i in group]
+            with self._lock:
+                if self._store is None:
+                    self._store = open_store(self._store_dir, vectors.shape[1])
+            self._store.add(group_keys, vectors)
+            found.update(zip(group_keys, vectors))
+        self.stats["encoded"] += len(texts)
+        count("texts_encoded", len(texts))
+        return found
+
+    def encode(
+        self,
+        sentences: str | Sequence[str],
+        batch_size: int | None = None,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+        show_progress_bar: bool = False,
+        **kwargs,
+    ) -> np.ndarray:
+        """Embeddings for ``sentences`` as float32, encoding only cache misses.
+
+        Other SentenceTransformer.encode options are not supported; the
+        result is always a NumPy array.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        keys = [embedding_key(text, self.model_name, normalize_embeddings) for text in texts]
+
+        vectors: dict[bytes, np.ndarray] = {}
+        for key in dict.fromkeys(keys):
+            vector = self.memory.get(key)
+            if vector is not None:
+                vectors[key] = vector
+        self.stats["memory_hits"] += len(vectors)
+
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if missing and self._store is not None:
+            stored = self._store.lookup(missing)
+            self.stats["disk_hits"] += len(stored)
+            vectors.update(stored)
+            missing = [key for key in missing if key not in stored]
+
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            vectors.update(self._encode_missing(
+                [text_by_key[key] for key in missing],
+                missing,
+                normalize_embeddings,
+                batch_size or self.batch_size,
+            ))
+        self.stats["duplicates"] += len(keys) - len(set(keys))
+
+        for key, vector in vectors.items():
+            self.memory.put(key, vector)
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        result = np.stack([vectors[key] for key in keys])
+        return result[0] if single else result
+
+
+class BatchingEncoder:
+    """Coalesce concurrent single-text requests into batched encode calls.
+
+    A background thread takes the first pending request, waits up to
+    ``max_delay`` seconds for up to ``max_batch_size`` more, and encodes
+    them in one call.
+    """
+
+    def __init__(
+        self,
+        encoder: CachedEncoder,
+        max_batch_size: int = DEFAULT_BATCH_SIZE,
+        max_delay: float = DEFAULT_MAX_DELAY,
+    ) -> None:
+        self.encoder = encoder
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._pending: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="batching-encoder", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        text: str,
+        normalize_embeddings: bool = True,
+    ) -> Future:
+        """Queue ``text``; the future resolves to its float32 vector."""
+        future: Future = Future()
+        self._pending.put((text, normalize_embeddings, future))
+        return future
+
+    def encode_one(
+        self,
+        text: str,
+        normalize_embeddings: bool = True,
+    ) -> np.ndarray:
+        """Blocking single-text encode through the shared batch."""
+        return self.submit(text, normalize_embeddings).result()
+
+    def _run(self) -> None:
+        while True:
+            first = self._pending.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._pending.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._pending.put(None)
+                    break
+                batch.append(item)
+
+            for normalize in (True, False):
+                group = [item for item in batch if item[1] == normalize]
+                if not group:
+                    continue
+                try:
+                    vectors = self.encoder.encode(
+                        [text for text, _, _ in group], normalize_embeddings=normalize
+                    )
+                except Exception as exc:
+                    for _, _, future in group:
+                        future.set_exception(exc)
+                    continue
+                for (_, _, future), vector in zip(group, vectors):
+                    future.set_result(vector)
+
+    def close(self) -> None:
+        """Finish queued requests and stop the batching thread."""
+        self._pending.put(None)
+        self._thread.join()
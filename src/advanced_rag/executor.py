@@ -0,0 +1,206 @@
+"""
+Concurrent execution of retrieval sources for multi-source queries.
+
+A "both" question (e.g. "Which product has the best customer reviews and
+how well is it selling?") needs the CSV route and the text route. Rather
+than running them one after the other, MultiSourceExecutor dispatches every
+source onto a thread pool from asyncio, hands each result to a combiner as
+soon as it finishes, and gives every source its own deadline. A source that
+errors or misses its deadline is reported as degraded instead of holding
+back the answer.
+
+Example::
+
+    executor = MultiSourceExecutor(
+        {"csv": answer_from_sales, "text": retriever.search},
+        deadlines={"csv": 0.5, "text": 2.0},
+    )
+    combiner = ContextCombiner()
+    results = executor.run(query, ROUTE_SOURCES["both"], combiner)
+    context = combiner.render()
+"""
+
+import asyncio
+import contextvars
+import time
+from collections.abc import AsyncIterator, Callable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from advanced_rag.tracing import span
+
+
+DEFAULT_DEADLINE = 5.0
+
+# Router route -> sources to run
+ROUTE_SOURCES = {
+    "csv": ["csv"],
+    "text": ["text"],
+    "both": ["csv", "text"],
+}
+
+STATUS_OK = "ok"
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+
+
+@dataclass
+class SourceResult:
+    """The outcome of running one source for a query."""
+
+    source: str
+    status: str
+    content: Any = None
+    elapsed: float = 0.0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+
+class ContextCombiner:
+    """Collect source results as they arrive and render them as LLM context.
+
+    Results are rendered in arrival order; degraded sources are listed so
+    the answer can say which data was unavailable.
+    """
+
+    def __init__(
+        self,
+        formatters: Mapping[str, Callable[[Any], str]] | None = None,
+    ) -> None:
+        self.formatters = dict(formatters or {})
+        self.results: list[SourceResult] = []
+
+    def add(
+        self,
+        result: SourceResult,
+    ) -> None:
+        """Accept one finished source result."""
+        self.results.append(result)
+
+    def render(self) -> str:
+        """Return the combined context text."""
+        sections = []
+        for result in self.results:
+            if result.ok:
+                formatter = self.formatters.get(result.source, str)
+                sections.append(f"[{result.source}]\n{formatter(result.content)}")
+            elif result.status == STATUS_TIMEOUT:
+                sections.append(
+                    f"[{result.source}] unavailable: no result within "
+                    f"{result.elapsed:.2f}s"
+                )
+            else:
+                sections.append(f"[{result.source}] unavailable: {result.error}")
+        return "\n\n".join(sections)
+
+
+class MultiSourceExecutor:
+    """Run named retrieval sources concurrently with per-source deadlines.
+
+    Each source is a blocking callable taking the query. Sources run on a
+    shared thread pool; a source that misses its deadline is reported as
+    timed out, although its thread finishes in the background.
+    """
+
+    def __init__(
+        self,
+        sources: Mapping[str, Callable[[str], Any]],
+        deadlines: Mapping[str, float] | None = None,
+        default_deadline: float = DEFAULT_DEADLINE,
+        max_workers: int | None = None,
+    ) -> None:
+        self.sources = dict(sources)
+        self.deadlines = dict(deadlines or {})
+        self.default_deadline = default_deadline
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or max(4, 2 * len(self.sources)),
+            thread_name_prefix="source",
+        )
+
+    def _call_source(
+        self,
+        name: str,
+        query: str,
+    ) -> Any:
+        with span(f"source.{name}"):
+            return self.sources[name](query)
+
+    async def _run_source(
+        self,
+        name: str,
+        query: str,
+    ) -> SourceResult:
+        """Run one source under its deadline; never raises."""
+        loop = asyncio.get_running_loop()
+        deadline = self.deadlines.get(name, self.default_deadline)
+        start = time.perf_counter()
+        try:
+            # Run in a copy of the caller's context so spans join its trace
+            context = contextvars.copy_context()
+            content = await asyncio.wait_for(
+                loop.run_in_executor(
+                    self._pool, context.run, self._call_source, name, query
+                ),
+                timeout=deadline,
+            )
+        except asyncio.TimeoutError:
+            return SourceResult(
+                name, STATUS_TIMEOUT, elapsed=time.perf_counter() - start
+            )
+        except Exception as exc:
+            return SourceResult(
+                name,
+                STATUS_ERROR,
+                elapsed=time.perf_counter() - start,
+                error=f"{type(exc).__name__}: {exc}",
+            )
+        return SourceResult(
+            name, STATUS_OK, content=content, elapsed=time.perf_counter() - start
+        )
+
+    async def stream(
+        self,
+        query: str,
+        sources: Sequence[str] | None = None,
+    ) -> AsyncIterator[SourceResult]:
+        """Yield source results in completion order."""
+        names = list(sources) if sources is not None else list(self.sources)
+        unknown = [name for name in names if name not in self.sources]
+        if unknown:
+            raise ValueError(f"Unknown sources {unknown}; have {list(self.sources)}")
+
+        for next_result in asyncio.as_completed(
+            [self._run_source(name, query) for name in names]
+        ):
+            yield await next_result
+
+    async def arun(
+        self,
+        query: str,
+        sources: Sequence[str] | None = None,
+        combiner: ContextCombiner | None = None,
+    ) -> list[SourceResult]:
+        """Run sources, feeding each result to ``combiner`` as it finishes."""
+        results = []
+        async for result in self.stream(query, sources):
+            if combiner is not None:
+                combiner.add(result)
+            results.append(result)
+        return results
+
+    def run(
+        self,
+        query: str,
+        sources: Sequence[str] | None = None,
+        combiner: ContextCombiner | None = None,
+    ) -> list[SourceResult]:
+        """Blocking wrapper around arun for callers outside an event loop."""
+        return asyncio.run(self.arun(query, sources, combiner))
+
+    def close(self) -> None:
+        """Shut down the worker pool without waiting for stragglers."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
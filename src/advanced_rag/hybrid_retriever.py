@@ -0,0 +1,238 @@
+"""
+Hybrid BM25 + dense retrieval over the product-page index.
+
+BM25 and FAISS searches run concurrently and their rankings are merged with
+reciprocal-rank fusion (RRF). Rather than scoring every chunk the way
+``BM25Okapi.get_scores`` does, the BM25 side keeps doc-id sorted posting
+lists with precomputed per-posting scores and runs term-at-a-time MaxScore:
+once the score upper bounds of the remaining query terms cannot lift an
+unseen document into the current top-k, those terms only probe the
+surviving candidates. The work per query then follows the posting lists of
+the query terms, not the size of the corpus.
+
+Example::
+
+    retriever = HybridRetriever(load_product_index())
+    for hit in retriever.search("How easy is the air fryer to clean?", k=5):
+        print(hit.score, hit.chunk.product_name, hit.chunk.section)
+"""
+
+import contextvars
+from collections import Counter
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+from rank_bm25 import BM25Okapi
+from sentence_transformers import SentenceTransformer
+
+from advanced_rag.embedding_cache import CachedEncoder
+from advanced_rag.product_index import ProductChunk, ProductIndex, tokenize
+from advanced_rag.tracing import span
+
+
+DEFAULT_RRF_K = 60
+DEFAULT_CANDIDATES = 50
+
+
+@dataclass
+class RetrievedChunk:
+    """A fused retrieval result."""
+
+    chunk: ProductChunk
+    score: float
+    bm25_rank: int | None
+    dense_rank: int | None
+
+
+class BM25MaxScoreIndex:
+    """Inverted index over a BM25Okapi model answering top-k with MaxScore.
+
+    Scores are identical to ``BM25Okapi.get_scores``: each posting stores
+    the term's full BM25 contribution for that document, so a document's
+    score is the sum of its matching postings.
+    """
+
+    def __init__(
+        self,
+        bm25: BM25Okapi,
+    ) -> None:
+        doc_ids: dict[str, list[int]] = {}
+        frequencies: dict[str, list[int]] = {}
+        for doc_id, doc in enumerate(bm25.doc_freqs):
+            for term, tf in doc.items():
+                doc_ids.setdefault(term, []).append(doc_id)
+                frequencies.setdefault(term, []).append(tf)
+
+        doc_len = np.asarray(bm25.doc_len, dtype=np.float64)
+        norm = bm25.k1 * (1 - bm25.b + bm25.b * doc_len / bm25.avgdl)
+        self._postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for term, ids in doc_ids.items():
+            ids_array = np.asarray(ids, dtype=np.int32)
+            tf = np.asarray(frequencies[term], dtype=np.float64)
+            scores = bm25.idf.get(term, 0.0) * tf * (bm25.k1 + 1) / (tf + norm[ids_array])
+            self._postings[term] = (ids_array, scores)
+
+    def top_k(
+        self,
+        query_tokens: Sequence[str],
+        k: int,
+    ) -> list[tuple[int, float]]:
+        """Return up to ``k`` (doc id, score) pairs, best first.
+
+        Terms are processed in descending order of their score upper bound.
+        While an unseen document could still reach the current k-th best
+        score, a term's postings are merged into the candidate set; after
+        that, the remaining (lower bound) terms only probe the surviving
+        candidates, and candidates that can no longer reach the k-th best
+        score are dropped.
+        """
+        terms = []
+        for term, count in Counter(query_tokens).items():
+            if term in self._postings:
+                ids, scores = self._postings[term]
+                # Repeated query terms count once per occurrence, as in BM25Okapi
+                terms.append((ids, scores * count, float(scores.max()) * count))
+        if not terms or k <= 0:
+            return []
+
+        terms.sort(key=lambda term: -term[2])
+        # remaining[i]: summed upper bounds of the terms after terms[i]
+        remaining_bounds = np.cumsum([0.0] + [ub for _, _, ub in terms[:0:-1]])[::-1]
+
+        candidates = np.zeros(0, dtype=np.int32)
+        totals = np.zeros(0, dtype=np.float64)
+        merging = True
+        for (ids, scores, upper_bound), remaining in zip(terms, remaining_bounds):
+            threshold = (
+                float(np.partition(totals, -k)[-k]) if len(totals) >= k else 0.0
+            )
+            merging = merging and (len(totals) < k or upper_bound + remaining > threshold)
+
+            if merging:
+                candidates, inverse = np.unique(
+                    np.concatenate([candidates, ids]), return_inverse=True
+                )
+                totals = np.bincount(
+                    inverse, weights=np.concatenate([totals, scores])
+                )
+                continue
+
+            # Probe the surviving candidates only
+            positions = np.searchsorted(ids, candidates)
+            found = positions < len(ids)
+            found[found] = ids[positions[found]] == candidates[found]
+            totals[found] += scores[positions[found]]
+
+            threshold = float(np.partition(totals, -k)[-k])
+            keep = totals + remaining >= threshold
+            candidates, totals = candidates[keep], totals[keep]
+
+        order = np.lexsort((candidates, -totals))[:k]
+        return [(int(candidates[i]), float(totals[i])) for i in order]
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[int]],
+    k: int = DEFAULT_RRF_K,
+    weights: Sequence[float] | None = None,
+) -> list[tuple[int, float]]:
+    """Fuse ranked id lists: score(d) = sum_i w_i / (k + rank_i(d)).
+
+    Ranks start at 1. Returns (id, score) pairs, best first.
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: dict[int, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+class HybridRetriever:
+    """BM25 (MaxScore) and FAISS retrieval fused with RRF."""
+
+    def __init__(
+        self,
+        index: ProductIndex,
+        encoder: SentenceTransformer | CachedEncoder | None = None,
+        candidates: int = DEFAULT_CANDIDATES,
+        rrf_k: int = DEFAULT_RRF_K,
+        weights: tuple[float, float] = (1.0, 1.0),
+    ) -> None:
+        self.index = index
+        self.encoder = encoder or CachedEncoder(index.model_name)
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.weights = weights
+        self.bm25 = BM25MaxScoreIndex(index.bm25)
+        self._executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="hybrid-retriever"
+        )
+
+    def search_bm25(
+        self,
+        query: str,
+        k: int,
+    ) -> list[tuple[int, float]]:
+        """Top-k (chunk id, BM25 score) pairs."""
+        with span("retrieval.bm25"):
+            return self.bm25.top_k(tokenize(query), k)
+
+    def search_dense(
+        self,
+        query: str,
+        k: int,
+    ) -> list[tuple[int, float]]:
+        """Top-k (chunk id, cosine similarity) pairs from FAISS."""
+        with span("retrieval.embedding"):
+            embedding = self.encoder.encode(
+                [query],
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            ).astype(np.float32)
+        with span("retrieval.faiss"):
+            scores, ids = self.index.faiss_index.search(embedding, k)
+        return [
+            (int(doc_id), float(score))
+            for doc_id, score in zip(ids[0], scores[0])
+            if doc_id >= 0
+        ]
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+    ) -> list[RetrievedChunk]:
+        """Run both searches concurrently and return the top-k fused chunks."""
+        candidates = max(self.candidates, k)
+        # Copy the context so the workers' spans join the current trace
+        bm25_future = self._executor.submit(
+            contextvars.copy_context().run, self.search_bm25, query, candidates
+        )
+        dense_future = self._executor.submit(
+            contextvars.copy_context().run, self.search_dense, query, candidates
+        )
+        bm25_ids = [doc_id for doc_id, _ in bm25_future.result()]
+        dense_ids = [doc_id for doc_id, _ in dense_future.result()]
+
+        bm25_ranks = {doc_id: rank for rank, doc_id in enumerate(bm25_ids, start=1)}
+        dense_ranks = {doc_id: rank for rank, doc_id in enumerate(dense_ids, start=1)}
+        fused = reciprocal_rank_fusion(
+            [bm25_ids, dense_ids], k=self.rrf_k, weights=self.weights
+        )
+        return [
+            RetrievedChunk(
+                chunk=self.index.chunks[doc_id],
+                score=score,
+                bm25_rank=bm25_ranks.get(doc_id),
+                dense_rank=dense_ranks.get(doc_id),
+            )
+            for doc_id, score in fused[:k]
+        ]
+
+    def close(self) -> None:
+        """Shut down the search thread pool."""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,422 @@
+"""
+Persistent FAISS + BM25 index over the product pages in data/unstructured.
+
+Each ``*_product_page.txt`` is split by section: the description, every
+titled block such as ``Key Features:`` or ``Technical Specifications:``, and
+each individual customer review. Chunks are embedded in batches with
+sentence-transformers and stored with a BM25 model over the same chunks.
+
+Index files live in ``<index_root>/<corpus hash>-<build id>/``, where the
+hash covers every page's content, the embedding model, the vector index
+type (see vector_index) and the chunker version, so an unchanged corpus is
+loaded (with the FAISS index memory-mapped) instead of being re-chunked and
+re-embedded. A build is published by atomically replacing the
+``<corpus hash>.current`` pointer file, and builds superseded by a newer
+corpus are pruned, keeping the previous one for readers still using it.
+
+Run as a script to build the index ahead of time:
+
+    python -m advanced_rag.product_index
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import faiss
+import numpy as np
+from rank_bm25 import BM25Okapi
+from sentence_transformers import SentenceTransformer
+
+from advanced_rag.embedding_cache import CachedEncoder
+from advanced_rag.product_pages import PAGE_GLOB, REVIEW_RE, split_sections
+from advanced_rag.vector_index import (
+    DEFAULT_INDEX_TYPE,
+    INDEX_TYPES,
+    RerankingIndex,
+    build_vector_index,
+    built_index_type,
+    load_vector_index,
+)
+
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+PAGES_DIR = DATA_DIR / "unstructured"
+INDEX_ROOT = DATA_DIR / "index" / "product_pages"
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_BATCH_SIZE = 64
+
+# Bump when chunking changes so existing indexes are not reused
+CHUNKER_VERSION = 1
+
+FAISS_FILE = "faiss.index"
+BM25_FILE = "bm25.pkl"
+CHUNKS_FILE = "chunks.jsonl"
+EMBEDDINGS_FILE = "embeddings.npy"
+MANIFEST_FILE = "manifest.json"
+POINTER_SUFFIX = ".current"
+KEEP_INDEXES = 2
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@dataclass
+class ProductChunk:
+    """One retrievable section of a product page."""
+
+    chunk_id: int
+    product_id: str
+    product_name: str
+    section: str
+    text: str
+    source: str
+    content_hash: str
+    rating: int | None = None
+
+
+@dataclass
+class ProductIndex:
+    """A loaded product-page index."""
+
+    index_dir: Path
+    model_name: str
+    chunks: list[ProductChunk]
+    faiss_index: faiss.Index | RerankingIndex
+    bm25: BM25Okapi
+
+
+def tokenize(
+    text: str
+) -> list[str]:
+    """Lowercase word tokens used for BM25."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _hash_text(
+    text: str
+) -> str:
+    """Return the SHA-256 hex digest of ``text``."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_product_page(
+    text: str,
+    source: str,
+) -> list[ProductChunk]:
+    """Split one product page into section and per-review chunks.
+
+    Chunk text is prefixed with the product name and section title so each
+    chunk is self-describing for both BM25 and embedding search. Chunk ids
+    are assigned later, when pages are combined into a corpus.
+    """
+    header, sections = split_sections(text)
+    product_id = header.get("SKU", Path(source).name.split("_")[0])
+    product_name = header.get("Product", product_id)
+
+    chunks = []
+
+    def add(section: str, body: str, rating: int | None = None) -> None:
+        body = body.strip()
+        if not body:
+            return
+        chunk_text = f"{product_name} - {section}\n{body}"
+        chunks.append(ProductChunk(
+            chunk_id=-1,
+            product_id=product_id,
+            product_name=product_name,
+            section=section,
+            text=chunk_text,
+            source=source,
+            content_hash=_hash_text(chunk_text),
+            rating=rating,
+        ))
+
+    for title, lines in sections:
+        if title != "CUSTOMER REVIEWS":
+            add(title.title() if title.isupper() else title, "\n".join(lines))
+            continue
+
+        # One chunk per review; the average rating line is its own chunk
+        review: tuple[str, int, list[str]] | None = None
+        for line in lines:
+            stripped = line.strip()
+            match = REVIEW_RE.match(stripped)
+            is_average = stripped.startswith("Average Rating:")
+            if (match or is_average) and review is not None:
+                add(review[0], "\n".join(review[2]), review[1])
+                review = None
+
+            if match:
+                number, reviewer, _, stars = match.groups()
+                review = (
+                    f"Review {number} - {reviewer}",
+                    int(stars),
+                    [f"Rating: {stars}/5 stars"],
+                )
+            elif is_average:
+                add("Average Rating", stripped)
+            elif review is not None:
+                review[2].append(line)
+
+        if review is not None:
+            add(review[0], "\n".join(review[2]), review[1])
+
+    return chunks
+
+
+def _page_paths(
+    pages_dir: Path
+) -> list[Path]:
+    """Return every product page under ``pages_dir`` in a stable order."""
+    return sorted(pages_dir.rglob(PAGE_GLOB))
+
+
+def corpus_hash(
+    pages_dir: Path,
+    model_name: str = DEFAULT_MODEL,
+    index_type: str = DEFAULT_INDEX_TYPE,
+) -> str:
+    """Hash page contents, embedding model, index type and chunker version."""
+    digest = hashlib.sha256()
+    digest.update(f"{model_name}\0{CHUNKER_VERSION}\0{index_type}\0".encode("utf-8"))
+    for path in _page_paths(pages_dir):
+        digest.update(str(path.relative_to(pages_dir)).encode("utf-8") + b"\0")
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def chunk_corpus(
+    pages_dir: Path
+) -> list[ProductChunk]:
+    """Chunk every product page and assign sequential chunk ids."""
+    chunks = []
+    for path in _page_paths(pages_dir):
+        chunks.extend(chunk_product_page(
+            path.read_text(encoding="utf-8"),
+            str(path.relative_to(pages_dir)),
+        ))
+    for chunk_id, chunk in enumerate(chunks):
+        chunk.chunk_id = chunk_id
+    return chunks
+
+
+def build_product_index(
+    pages_dir: Path = PAGES_DIR,
+    index_root: Path = INDEX_ROOT,
+    model_name: str = DEFAULT_MODEL,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    encoder: SentenceTransformer | CachedEncoder | None = None,
+    index_type: str = DEFAULT_INDEX_TYPE,
+) -> Path:
+    """Chunk, embed and persist the corpus; return the index directory.
+
+    Files are written to a temporary directory that is renamed to a fresh
+    build directory and then published through the pointer file, so a
+    concurrent reader finds either the old or the new index, never a
+    partial or missing one. Quantized index types are re-ranked from
+    ``embeddings.npy`` on load. The manifest records the index type actually
+    built next to the requested one (see built_index_type).
+    """
+    digest = corpus_hash(pages_dir, model_name, index_type)
+    index_dir = index_root / f"{digest}-{uuid.uuid4().hex[:8]}"
+    chunks = chunk_corpus(pages_dir)
+    if not chunks:
+        raise ValueError(f"No product pages matching {PAGE_GLOB} in {pages_dir}")
+
+    # Unchanged chunks are served from the embedding cache on rebuilds
+    encoder = encoder or CachedEncoder(model_name)
+    embeddings = encoder.encode(
+        [chunk.text for chunk in chunks],
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    ).astype(np.float32)
+
+    # Inner product over normalized vectors is cosine similarity
+    faiss_index = build_vector_index(embeddings, index_type)
+    bm25 = BM25Okapi([tokenize(chunk.text) for chunk in chunks])
+
+    index_root.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=index_root, prefix=".build-"))
+    try:
+        faiss.write_index(faiss_index, str(tmp_dir / FAISS_FILE))
+        np.save(tmp_dir / EMBEDDINGS_FILE, embeddings)
+        with open(tmp_dir / BM25_FILE, "wb") as f:
+            pickle.dump(bm25, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(tmp_dir / CHUNKS_FILE, "w") as f:
+            for chunk in chunks:
+                f.write(json.dumps(asdict(chunk)) + "\n")
+        with open(tmp_dir / MANIFEST_FILE, "w") as f:
+            json.dump({
+                "model_name": model_name,
+                "index_type": built_index_type(index_type, len(embeddings)),
+                "requested_index_type": index_type,
+                "chunker_version": CHUNKER_VERSION,
+                "num_chunks": len(chunks),
+                "dimension": int(embeddings.shape[1]),
+            }, f, indent=2)
+
+        os.replace(tmp_dir, index_dir)
+    finally:
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+
+    pointer = index_root / f".{digest}{POINTER_SUFFIX}.tmp"
+    pointer.write_text(index_dir.name)
+    os.replace(pointer, index_root / f"{digest}{POINTER_SUFFIX}")
+    _prune_indexes(index_root, index_dir)
+    return index_dir
+
+
+def published_index_dir(
+    index_root: Path,
+    digest: str,
+) -> Path | None:
+    """The published build for corpus hash ``digest``, if any."""
+    try:
+        name = (index_root / f"{digest}{POINTER_SUFFIX}").read_text().strip()
+    except FileNotFoundError:
+        return None
+    index_dir = index_root / name
+    return index_dir if (index_dir / MANIFEST_FILE).exists() else None
+
+
+def _prune_indexes(
+    index_root: Path,
+    index_dir: Path,
+    keep: int = KEEP_INDEXES,
+) -> None:
+    """Drop builds of the same model and index type superseded by ``index_dir``.
+
+    The newest ``keep - 1`` other builds are left for readers still using
+    them; in-progress ``.build-*`` directories are never touched.
+    """
+    def manifest(path: Path) -> dict:
+        with open(path / MANIFEST_FILE) as f:
+            return json.load(f)
+
+    current = manifest(index_dir)
+    builds = []
+    for path in index_root.iterdir():
+        if path == index_dir or path.name.startswith(".") or not path.is_dir():
+            continue
+        try:
+            other = manifest(path)
+            mtime = (path / MANIFEST_FILE).stat().st_mtime_ns
+        except (OSError, ValueError):
+            continue
+        if (other["model_name"], other["requested_index_type"]) == (
+            current["model_name"], current["requested_index_type"]
+        ):
+            builds.append((mtime, path))
+
+    builds.sort(reverse=True)
+    for _, old in builds[keep - 1:]:
+        pointer = index_root / f"{old.name.split('-')[0]}{POINTER_SUFFIX}"
+        try:
+            if pointer.read_text().strip() == old.name:
+                pointer.unlink()
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def _read_faiss_index(
+    path: Path
+) -> faiss.Index:
+    """Read a FAISS index memory-mapped when the index type supports it."""
+    try:
+        return faiss.read_index(str(path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError:
+        return faiss.read_index(str(path))
+
+
+def load_product_index(
+    pages_dir: Path = PAGES_DIR,
+    index_root: Path = INDEX_ROOT,
+    model_name: str = DEFAULT_MODEL,
+    build_if_missing: bool = True,
+    index_type: str = DEFAULT_INDEX_TYPE,
+) -> ProductIndex:
+    """Load the index matching the current pages, building it if needed."""
+    digest = corpus_hash(pages_dir, model_name, index_type)
+    index_dir = published_index_dir(index_root, digest)
+    if index_dir is None:
+        if not build_if_missing:
+            raise FileNotFoundError(f"No product index for {digest} in {index_root}")
+        index_dir = build_product_index(
+            pages_dir, index_root, model_name, index_type=index_type
+        )
+
+    with open(index_dir / MANIFEST_FILE) as f:
+        manifest = json.load(f)
+    with open(index_dir / CHUNKS_FILE) as f:
+        chunks = [ProductChunk(**json.loads(line)) for line in f]
+    with open(index_dir / BM25_FILE, "rb") as f:
+        bm25 = pickle.load(f)
+
+    return ProductIndex(
+        index_dir=index_dir,
+        model_name=model_name,
+        chunks=chunks,
+        faiss_index=load_vector_index(
+            _read_faiss_index(index_dir / FAISS_FILE),
+            index_dir / EMBEDDINGS_FILE,
+            manifest["index_type"],
+        ),
+        bm25=bm25,
+    )
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Build the FAISS + BM25 index over product pages"
+    )
+    parser.add_argument("--pages-dir", type=Path, default=PAGES_DIR)
+    parser.add_argument("--index-root", type=Path, default=INDEX_ROOT)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=DEFAULT_INDEX_TYPE)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild even if an index for the current pages exists",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Build the product index if it is missing or stale."""
+    args = _parse_args()
+    index_dir = published_index_dir(
+        args.index_root, corpus_hash(args.pages_dir, args.model, args.index_type)
+    )
+    if index_dir is not None and not args.force:
+        print(f"Product index is up to date: {index_dir}")
+        return
+
+    index_dir = build_product_index(
+        args.pages_dir,
+        args.index_root,
+        args.model,
+        args.batch_size,
+        index_type=args.index_type,
+    )
+    with open(index_dir / MANIFEST_FILE) as f:
+        manifest = json.load(f)
+    print(f"Indexed {manifest['num_chunks']} chunks into {index_dir}")
+
+
+if __name__ == "__main__":
+    main()
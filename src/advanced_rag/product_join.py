@@ -0,0 +1,453 @@
+"""
+Product dimension table joining product pages with sales.
+
+Recommendation questions such as "Which product has the best customer
+reviews and how well is it selling?" need review data from the product
+pages and sales from ``daily_sales.csv``. The only join key is the page's
+``SKU:`` line against the ``product_id`` column, so answering them from
+the two retrieval routes leaves the join to the LLM.
+
+ProductJoinIndex precomputes the join in the sales SQLite database of
+advanced_rag.sales_sql:
+
+- ``products``: one row per product_id with name, brand, category, price,
+  the page's rating stats and total sales
+- ``product_region_sales``: units, revenue and transactions per product
+  and region
+
+Products that appear only in the sales data have NULL rating columns. The
+tables are rebuilt when the sales table has grown or been reloaded, or a
+page file changed.
+Ranking a category by rating, or by units sold in one region among the
+well-rated products, is then a single indexed query.
+
+Example::
+
+    join = ProductJoinIndex.open()
+    join.rank(by="rating", k=1)
+    join.rank(category="Sports & Outdoors", region="West", min_rating=4.0)
+    join.answer("Which product has the best customer reviews and how well is it selling?")
+
+Run as a script to build the tables or answer a question:
+
+    python -m advanced_rag.product_join "fitness product highly rated that sells well in the West"
+"""
+
+import argparse
+import hashlib
+import re
+import sqlite3
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from advanced_rag.product_pages import PAGE_GLOB, load_product_store
+from advanced_rag.sales_sql import CSV_PATH, DATA_DIR, DB_PATH, SalesDatabase, find_mentions
+from advanced_rag.tracing import span, tracer
+
+
+PAGES_DIR = DATA_DIR / "unstructured"
+DEFAULT_MIN_RATING = 4.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    brand TEXT,
+    category TEXT NOT NULL,
+    price REAL,
+    average_rating REAL,
+    review_count INTEGER,
+    units_sold INTEGER NOT NULL,
+    total_revenue REAL NOT NULL,
+    transactions INTEGER NOT NULL,
+    source TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS products_category
+    ON products (category, average_rating DESC, review_count DESC);
+CREATE INDEX IF NOT EXISTS products_rating ON products (average_rating DESC, review_count DESC);
+CREATE TABLE IF NOT EXISTS product_region_sales (
+    product_id TEXT NOT NULL,
+    region TEXT NOT NULL,
+    units_sold INTEGER NOT NULL,
+    total_revenue REAL NOT NULL,
+    transactions INTEGER NOT NULL,
+    PRIMARY KEY (product_id, region)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS product_region_sales_region
+    ON product_region_sales (region, units_sold DESC);
+"""
+
+# Ranking name -> ORDER BY clause; the sales columns come from the region
+# table when a region is given
+RANKINGS = {
+    "rating": "p.average_rating DESC, p.review_count DESC, units_sold DESC",
+    "units": "units_sold DESC, p.average_rating DESC",
+    "revenue": "total_revenue DESC, p.average_rating DESC",
+}
+
+# Words in questions that stand for a category
+CATEGORY_KEYWORDS = {
+    "Sports & Outdoors": ["fitness", "exercise", "workout", "gym", "yoga", "sport", "sports",
+                          "outdoor", "outdoors", "running", "hiking", "camping"],
+    "Home & Kitchen": ["kitchen", "cooking", "cook", "home"],
+    "Electronics": ["electronic", "electronics", "gadget", "tech", "audio"],
+    "Beauty & Personal Care": ["beauty", "skincare", "skin", "cosmetic"],
+    "Clothing": ["clothing", "clothes", "apparel", "wear"],
+    "Books": ["book", "books", "reading"],
+    "Toys & Games": ["toy", "toys", "game", "games", "kids"],
+    "Office Supplies": ["office", "desk", "stationery"],
+    "Pet Supplies": ["pet", "pets", "dog", "cat"],
+    "Food & Grocery": ["food", "grocery", "snack", "snacks", "coffee"],
+}
+
+_RATING_RE = re.compile(r"\b(reviews?|rated|ratings?|stars?)\b")
+_SALES_RE = re.compile(r"\b(sell|sells|selling|sold|sales|revenue|popular|bestsellers?)\b")
+_BEST_RATED_RE = re.compile(r"\b(best|highest|top)[- ](customer )?(reviews?|rated|ratings?)\b")
+_TOP_RE = re.compile(r"\btop\s+(\d+)\b")
+
+
+@dataclass
+class ProductSummary:
+    """A products row; the sales columns cover ``region`` when it is set."""
+
+    product_id: str
+    name: str
+    category: str
+    average_rating: float | None
+    review_count: int | None
+    units_sold: int
+    total_revenue: float
+    transactions: int
+    region: str | None = None
+    price: float | None = None
+    region_units: dict[str, int] = field(default_factory=dict)
+
+
+def _pages_fingerprint(
+    pages_dir: Path
+) -> str:
+    """Hash of the page paths, sizes and modification times under ``pages_dir``."""
+    digest = hashlib.sha1()
+    for path in sorted(pages_dir.rglob(PAGE_GLOB)):
+        stat = path.stat()
+        digest.update(
+            f"{path.relative_to(pages_dir)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8")
+        )
+    return digest.hexdigest()
+
+
+class ProductJoinIndex:
+    """Products joined with their ratings and per-region sales."""
+
+    def __init__(
+        self,
+        sales: SalesDatabase,
+        pages_dir: Path = PAGES_DIR,
+    ) -> None:
+        self.sales = sales
+        self.pages_dir = pages_dir
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(sales.db_path, check_same_thread=False)
+        self._db.execute("PRAGMA mmap_size=268435456")
+        self._db.executescript(_SCHEMA)
+
+    @classmethod
+    def open(
+        cls,
+        db_path: Path = DB_PATH,
+        csv_path: Path = CSV_PATH,
+        pages_dir: Path = PAGES_DIR,
+    ) -> "ProductJoinIndex":
+        """Open the sales database and bring both it and the join up to date."""
+        join = cls(SalesDatabase.open(db_path, csv_path), pages_dir)
+        join.refresh()
+        return join
+
+    def _meta(
+        self,
+        key: str,
+    ) -> str | None:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def refresh(self) -> bool:
+        """Rebuild the tables if sales or pages changed; return whether it did."""
+        self.sales.refresh()
+        with self._lock:
+            sales_offset = self._meta("end_offset") or "0"
+            # A rewrite of the same length reloads the sales with a new head
+            sales_head = self._meta("head_hash") or ""
+            fingerprint = _pages_fingerprint(self.pages_dir)
+            if (
+                self._meta("join_sales_offset") == sales_offset
+                and self._meta("join_sales_head") == sales_head
+                and self._meta("join_pages") == fingerprint
+            ):
+                return False
+
+            store = load_product_store(self.pages_dir)
+            with span("product_join.build"), self._db:
+                self._db.execute("DELETE FROM products")
+                self._db.execute("DELETE FROM product_region_sales")
+                self._db.execute(
+                    "INSERT INTO product_region_sales "
+                    "SELECT product_id, region, SUM(units_sold), "
+                    "ROUND(SUM(total_revenue), 2), COUNT(*) FROM sales GROUP BY product_id, region"
+                )
+                # Name and category from sales; the page's values win below
+                self._db.execute(
+                    "INSERT INTO products (product_id, name, category, units_sold, "
+                    "total_revenue, transactions) "
+                    "SELECT product_id, MAX(product_name), MAX(category), SUM(units_sold), "
+                    "ROUND(SUM(total_revenue), 2), COUNT(*) FROM sales GROUP BY product_id"
+                )
+                self._db.executemany(
+                    "INSERT INTO products (product_id, name, brand, category, price, "
+                    "average_rating, review_count, units_sold, total_revenue, transactions, "
+                    "source) VALUES (?, ?, ?, ?, ?, ?, ?, 0, 0, 0, ?) "
+                    "ON CONFLICT (product_id) DO UPDATE SET name = excluded.name, "
+                    "brand = excluded.brand, category = excluded.category, "
+                    "price = excluded.price, average_rating = excluded.average_rating, "
+                    "review_count = excluded.review_count, source = excluded.source",
+                    [
+                        (
+                            page.product_id, page.name, page.brand, page.category,
+                            page.price, page.average_rating, page.review_count, page.source,
+                        )
+                        for page in store.pages
+                        if page.product_id
+                    ],
+                )
+                # NaN ratings from pages without reviews are stored as NULL
+                self._db.execute(
+                    "UPDATE products SET average_rating = NULL "
+                    "WHERE average_rating != average_rating"
+                )
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    [
+                        ("join_sales_offset", sales_offset),
+                        ("join_sales_head", sales_head),
+                        ("join_pages", fingerprint),
+                    ],
+                )
+            self._db.execute("ANALYZE")
+            return True
+
+    def _summaries(
+        self,
+        rows: list[tuple],
+    ) -> list[ProductSummary]:
+        summaries = [ProductSummary(*row[:8], region=row[8], price=row[9]) for row in rows]
+        if summaries:
+            ids = [summary.product_id for summary in summaries]
+            by_id = {summary.product_id: summary for summary in summaries}
+            for product_id, row_region, units in self._db.execute(
+                "SELECT product_id, region, units_sold FROM product_region_sales "
+                f"WHERE product_id IN ({', '.join('?' * len(ids))}) ORDER BY units_sold DESC",
+                ids,
+            ):
+                by_id[product_id].region_units[row_region] = units
+        return summaries
+
+    def lookup(
+        self,
+        product_id: str,
+    ) -> ProductSummary | None:
+        """The joined row for ``product_id``, or None."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT product_id, name, category, average_rating, review_count, units_sold, "
+                "total_revenue, transactions, NULL, price FROM products WHERE product_id = ?",
+                (product_id,),
+            ).fetchall()
+            summaries = self._summaries(rows)
+        return summaries[0] if summaries else None
+
+    def rank(
+        self,
+        by: str = "units",
+        category: str | None = None,
+        region: str | None = None,
+        min_rating: float | None = None,
+        min_reviews: int = 0,
+        k: int = 5,
+    ) -> list[ProductSummary]:
+        """The ``k`` best products by ``by`` (a RANKINGS key).
+
+        With ``region`` the sales columns and the ``units``/``revenue``
+        rankings use that region's sales only. ``min_rating`` drops products
+        rated lower or without a rating.
+        """
+        if by not in RANKINGS:
+            raise ValueError(f"Unknown ranking {by!r}; expected one of {list(RANKINGS)}")
+        conditions, params = [], []
+        if region is not None:
+            sales_columns = (
+                "r.units_sold AS units_sold, r.total_revenue AS total_revenue, "
+                "r.transactions, r.region"
+            )
+            source = "products p JOIN product_region_sales r USING (product_id)"
+            conditions.append("r.region = ?")
+            params.append(region)
+        else:
+            sales_columns = (
+                "p.units_sold AS units_sold, p.total_revenue AS total_revenue, "
+                "p.transactions, NULL"
+            )
+            source = "products p"
+        if category is not None:
+            conditions.append("p.category = ?")
+            params.append(category)
+        if min_rating is not None:
+            conditions.append("p.average_rating >= ?")
+            params.append(min_rating)
+        if by == "rating":
+            conditions.append("p.average_rating IS NOT NULL")
+        if min_reviews:
+            conditions.append("p.review_count >= ?")
+            params.append(min_reviews)
+
+        sql = (
+            "SELECT p.product_id, p.name, p.category, p.average_rating, p.review_count, "
+            f"{sales_columns}, "
+            f"p.price FROM {source}"
+        )
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {RANKINGS[by]} LIMIT ?"
+        params.append(int(k))
+        with span("product_join.rank"), self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+            return self._summaries(rows)
+
+    def answer(
+        self,
+        question: str,
+    ) -> str:
+        """Rank products for a recommendation question and describe them."""
+        lowered = question.lower()
+        category = _question_category(question)
+        regions = find_mentions(question, self.sales.vocabulary()["region"])
+        region = regions[0] if len(regions) == 1 else None
+        rating, sales = _RATING_RE.search(lowered), _SALES_RE.search(lowered)
+        top = _TOP_RE.search(lowered)
+        k = int(top.group(1)) if top else 3
+
+        if _BEST_RATED_RE.search(lowered):
+            ranked, ranking = self.rank("rating", category, region, k=k), "rating"
+        elif rating and sales:
+            # Sells well among the well rated; fall back to plain rating
+            ranked = self.rank(
+                "units", category, region, min_rating=DEFAULT_MIN_RATING, k=k
+            ) or self.rank("rating", category, region, k=k)
+            ranking = f"units sold among products rated {DEFAULT_MIN_RATING}+"
+        elif sales:
+            ranked, ranking = self.rank("units", category, region, k=k), "units sold"
+        else:
+            ranked, ranking = self.rank("rating", category, region, k=k), "rating"
+        return describe_products(ranked, ranking, category, region)
+
+    def close(self) -> None:
+        self._db.close()
+        self.sales.close()
+
+
+def _question_category(
+    question: str
+) -> str | None:
+    """The category a question names directly or through a keyword."""
+    for category in CATEGORY_KEYWORDS:
+        if find_mentions(question, [category]):
+            return category
+    words = set(re.findall(r"[a-z]+", question.lower()))
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        if words.intersection(keywords):
+            return category
+    return None
+
+
+def is_product_question(
+    question: str
+) -> bool:
+    """Whether a question asks to rank products by reviews and sales."""
+    lowered = question.lower()
+    return bool(_RATING_RE.search(lowered) and (
+        _SALES_RE.search(lowered) or re.search(r"\b(recommend|suggest|best)\b", lowered)
+    ))
+
+
+def describe_products(
+    ranked: list[ProductSummary],
+    ranking: str,
+    category: str | None = None,
+    region: str | None = None,
+) -> str:
+    """Render ranked products as compact context text."""
+    scope = [f"category {category}"] if category else []
+    if region:
+        scope.append(f"sales in {region}")
+    header = f"Products ranked by {ranking}" + (f" ({'; '.join(scope)})" if scope else "") + ":"
+    if not ranked:
+        return header + "\n  no matching products"
+    lines = [header]
+    for number, product in enumerate(ranked, start=1):
+        rating = (
+            f"{product.average_rating:.1f}/5 ({product.review_count:,} reviews)"
+            if product.average_rating is not None else "no rating"
+        )
+        where = f" in {product.region}" if product.region else ""
+        lines.append(
+            f"  {number}. {product.name} [{product.product_id}, {product.category}]: {rating}; "
+            f"{product.units_sold:,} units, {product.total_revenue:,.2f} revenue{where}"
+        )
+        if product.region_units:
+            lines.append("     units by region: " + ", ".join(
+                f"{region} {units:,}" for region, units in product.region_units.items()
+            ))
+    return "\n".join(lines)
+
+
+def product_source(
+    join: ProductJoinIndex,
+    fallback: Callable[[str], str],
+) -> Callable[[str], str]:
+    """A ``csv`` source answering product rankings from the join.
+
+    Other questions go to ``fallback``, usually ``SalesDatabase.answer``.
+    """
+
+    def source(query: str) -> str:
+        if is_product_question(query):
+            return join.answer(query)
+        return fallback(query)
+
+    return source
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Product dimension table over pages and sales")
+    parser.add_argument("question", nargs="?", help="Recommendation question to answer")
+    parser.add_argument("--csv", type=Path, default=CSV_PATH)
+    parser.add_argument("--pages-dir", type=Path, default=PAGES_DIR)
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Build or refresh the product tables and optionally answer a question."""
+    args = _parse_args()
+    join = ProductJoinIndex(SalesDatabase(args.db, args.csv), args.pages_dir)
+    rebuilt = join.refresh()
+    print(f"{'Rebuilt' if rebuilt else 'Up to date'}: product tables in {args.db}")
+    if args.question:
+        with tracer.request("product_join", question=args.question):
+            print(join.answer(args.question))
+    join.close()
+
+
+if __name__ == "__main__":
+    main()
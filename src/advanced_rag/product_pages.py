@@ -0,0 +1,356 @@
+"""
+Structured parser and compact in-memory store for the product pages.
+
+The pages written by ``scripts/generate_data.py`` share one layout: a header
+block (``Product:``, ``Brand:``, ``Price:``, ``SKU:``, ``Category:``), a
+``PRODUCT DESCRIPTION:``, titled sections such as ``Key Features:`` and
+``Technical Specifications:``, and ``CUSTOMER REVIEWS:`` with
+``Review N - Name (Verified Purchase) - K stars`` entries followed by
+``Average Rating: x/5 (n reviews)``.
+
+parse_product_page turns one page into a ``__slots__`` record, and
+ProductStore packs many records into parallel NumPy arrays so questions
+such as "which product has the best reviews" are a vectorized sort rather
+than a regex scan of every file.
+
+Example::
+
+    store = load_product_store(Path("data/unstructured"))
+    best = store.top_rated(k=1)[0]
+    store.pages[best].name, store.average_rating[best]
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+
+PAGE_GLOB = "*_product_page.txt"
+
+SECTION_RE = re.compile(r"^([A-Z][A-Za-z0-9 &/()'-]*):\s*$")
+REVIEW_RE = re.compile(r"^Review (\d+) - (.+?) \((.+?)\) - (\d+) stars?\s*$")
+_AVERAGE_RE = re.compile(r"^Average Rating:\s*([\d.]+)/5\s*\(([\d,]+) reviews?\)")
+_PRICE_RE = re.compile(r"[\d,]+(?:\.\d+)?")
+
+# Sections parsed into dedicated fields rather than kept as free text
+DESCRIPTION_SECTION = "PRODUCT DESCRIPTION"
+REVIEWS_SECTION = "CUSTOMER REVIEWS"
+FEATURE_SECTIONS = ("Key Features", "Features")
+SPEC_SECTIONS = ("Technical Specifications",)
+
+
+def split_sections(
+    text: str
+) -> tuple[dict[str, str], list[tuple[str, list[str]]]]:
+    """Split a page into header fields and (title, lines) sections.
+
+    Banner lines of ``=`` or ``-`` are dropped. Header fields are the
+    ``Key: value`` lines before the first section title.
+    """
+    header: dict[str, str] = {}
+    sections: list[tuple[str, list[str]]] = []
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith(("====", "----")):
+            continue
+        match = SECTION_RE.match(stripped)
+        if match:
+            sections.append((match.group(1), []))
+        elif sections:
+            sections[-1][1].append(line.rstrip())
+        elif ":" in stripped:
+            key, value = stripped.split(":", 1)
+            header[key.strip()] = value.strip()
+
+    return header, sections
+
+
+class Review:
+    """One customer review."""
+
+    __slots__ = ("number", "reviewer", "verified", "rating", "text")
+
+    def __init__(
+        self,
+        number: int,
+        reviewer: str,
+        verified: bool,
+        rating: int,
+        text: str,
+    ) -> None:
+        self.number = number
+        self.reviewer = reviewer
+        self.verified = verified
+        self.rating = rating
+        self.text = text
+
+    def __repr__(self) -> str:
+        return f"Review({self.number}, {self.reviewer!r}, rating={self.rating})"
+
+
+class ProductPage:
+    """A parsed product page."""
+
+    __slots__ = (
+        "product_id",
+        "name",
+        "brand",
+        "category",
+        "price",
+        "description",
+        "features",
+        "specs",
+        "sections",
+        "reviews",
+        "average_rating",
+        "review_count",
+        "source",
+    )
+
+    def __init__(
+        self,
+        product_id: str,
+        name: str,
+        brand: str,
+        category: str,
+        price: float,
+        description: str,
+        features: tuple[str, ...],
+        specs: tuple[tuple[str, str], ...],
+        sections: dict[str, str],
+        reviews: tuple[Review, ...],
+        average_rating: float,
+        review_count: int,
+        source: str,
+    ) -> None:
+        self.product_id = product_id
+        self.name = name
+        self.brand = brand
+        self.category = category
+        self.price = price
+        self.description = description
+        self.features = features
+        self.specs = specs
+        self.sections = sections
+        self.reviews = reviews
+        self.average_rating = average_rating
+        self.review_count = review_count
+        self.source = source
+
+    def __repr__(self) -> str:
+        return f"ProductPage({self.product_id!r}, {self.name!r})"
+
+
+def _bullets(
+    lines: list[str]
+) -> list[str]:
+    """Return the text of ``- item`` bullet lines."""
+    return [
+        line.strip()[2:].strip()
+        for line in lines
+        if line.strip().startswith("- ")
+    ]
+
+
+def _parse_reviews(
+    lines: list[str]
+) -> tuple[list[Review], float, int]:
+    """Parse review entries and the average rating line of the reviews section."""
+    reviews: list[Review] = []
+    body: list[str] = []
+    average_rating, review_count = float("nan"), 0
+
+    def close() -> None:
+        if reviews and not reviews[-1].text:
+            reviews[-1].text = " ".join(part.strip() for part in body).strip()
+
+    for line in lines:
+        stripped = line.strip()
+        match = REVIEW_RE.match(stripped)
+        average = _AVERAGE_RE.match(stripped)
+        if match:
+            close()
+            number, reviewer, badge, stars = match.groups()
+            reviews.append(Review(
+                number=int(number),
+                reviewer=reviewer,
+                verified=badge == "Verified Purchase",
+                rating=int(stars),
+                text="",
+            ))
+            body = []
+        elif average:
+            close()
+            body = []
+            average_rating = float(average.group(1))
+            review_count = int(average.group(2).replace(",", ""))
+        elif stripped:
+            body.append(stripped)
+    close()
+
+    for review in reviews:
+        review.text = review.text.strip('"')
+    return reviews, average_rating, review_count
+
+
+def parse_product_page(
+    text: str,
+    source: str = "",
+) -> ProductPage:
+    """Parse one product page into a ProductPage record.
+
+    Repeated values (brands, categories, feature bullets, spec keys) are
+    interned so a large store shares a single copy of each string.
+    """
+    header, sections = split_sections(text)
+
+    description = ""
+    features: list[str] = []
+    specs: list[tuple[str, str]] = []
+    other: dict[str, str] = {}
+    reviews: list[Review] = []
+    average_rating, review_count = float("nan"), 0
+
+    for title, lines in sections:
+        if title == DESCRIPTION_SECTION:
+            description = " ".join(line.strip() for line in lines if line.strip())
+        elif title == REVIEWS_SECTION:
+            reviews, average_rating, review_count = _parse_reviews(lines)
+        elif title in FEATURE_SECTIONS:
+            features.extend(sys.intern(item) for item in _bullets(lines))
+        elif title in SPEC_SECTIONS:
+            for item in _bullets(lines):
+                key, _, value = item.partition(":")
+                specs.append((sys.intern(key.strip()), value.strip()))
+        else:
+            other[sys.intern(title)] = "\n".join(lines).strip()
+
+    price_match = _PRICE_RE.search(header.get("Price", ""))
+    product_id = header.get("SKU") or Path(source).name.split("_")[0]
+
+    return ProductPage(
+        product_id=product_id,
+        name=header.get("Product", product_id),
+        brand=sys.intern(header.get("Brand", header.get("Author", ""))),
+        category=sys.intern(header.get("Category", "")),
+        price=float(price_match.group().replace(",", "")) if price_match else float("nan"),
+        description=description,
+        features=tuple(features),
+        specs=tuple(specs),
+        sections=other,
+        reviews=tuple(reviews),
+        average_rating=average_rating,
+        review_count=review_count,
+        source=source,
+    )
+
+
+class ProductStore:
+    """Parsed product pages with per-product numbers packed into arrays.
+
+    Row ``i`` of every array describes ``pages[i]``. Individual review
+    ratings are stored flat in ``review_ratings``; the reviews of product
+    ``i`` are ``review_ratings[review_offsets[i]:review_offsets[i + 1]]``.
+    """
+
+    __slots__ = (
+        "pages",
+        "product_ids",
+        "categories",
+        "prices",
+        "average_rating",
+        "review_count",
+        "review_ratings",
+        "review_offsets",
+        "_positions",
+    )
+
+    def __init__(
+        self,
+        pages: list[ProductPage],
+    ) -> None:
+        self.pages = pages
+        self.product_ids = [page.product_id for page in pages]
+        self.categories = np.array([page.category for page in pages], dtype=object)
+        self.prices = np.array([page.price for page in pages], dtype=np.float64)
+        self.average_rating = np.array(
+            [page.average_rating for page in pages], dtype=np.float32
+        )
+        self.review_count = np.array(
+            [page.review_count for page in pages], dtype=np.int64
+        )
+        self.review_ratings = np.array(
+            [review.rating for page in pages for review in page.reviews],
+            dtype=np.int8,
+        )
+        self.review_offsets = np.concatenate(
+            [[0], np.cumsum([len(page.reviews) for page in pages])]
+        ).astype(np.int64)
+        self._positions = {pid: i for i, pid in enumerate(self.product_ids)}
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def get(
+        self,
+        product_id: str,
+    ) -> ProductPage | None:
+        """Return the page for ``product_id`` or None."""
+        position = self._positions.get(product_id)
+        return None if position is None else self.pages[position]
+
+    def position(
+        self,
+        product_id: str,
+    ) -> int:
+        """Return the row of ``product_id`` in the store arrays, or -1."""
+        return self._positions.get(product_id, -1)
+
+    def sample_rating(self) -> np.ndarray:
+        """Mean rating of the reviews shown on each page (NaN if none)."""
+        counts = np.diff(self.review_offsets)
+        sums = np.zeros(len(self.pages))
+        nonempty = counts > 0
+        if nonempty.any():
+            sums[nonempty] = np.add.reduceat(
+                self.review_ratings.astype(np.float64),
+                self.review_offsets[:-1][nonempty],
+            )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(nonempty, sums / counts, np.nan)
+
+    def top_rated(
+        self,
+        k: int = 1,
+        category: str | None = None,
+        min_reviews: int = 0,
+    ) -> list[int]:
+        """Return store rows of the ``k`` best rated products.
+
+        Products are ranked by listed average rating, then by review count,
+        optionally restricted to one category and a minimum review count.
+        """
+        keep = self.review_count >= min_reviews
+        keep &= ~np.isnan(self.average_rating)
+        if category is not None:
+            keep &= self.categories == category
+        rows = np.flatnonzero(keep)
+        order = np.lexsort((-self.review_count[rows], -self.average_rating[rows]))
+        return rows[order[:k]].tolist()
+
+
+def load_product_store(
+    pages_dir: Path
+) -> ProductStore:
+    """Parse every product page under ``pages_dir`` into a ProductStore."""
+    pages = [
+        parse_product_page(
+            path.read_text(encoding="utf-8"),
+            str(path.relative_to(pages_dir)),
+        )
+        for path in sorted(pages_dir.rglob(PAGE_GLOB))
+    ]
+    return ProductStore(pages)
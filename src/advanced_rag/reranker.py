@@ -0,0 +1,332 @@
+"""
+Local cross-encoder re-ranking of retrieved chunks.
+
+Re-ranking through the Cohere API adds a network round-trip and rate limits
+to every query. CrossEncoderReranker scores (query, chunk) pairs with a
+small sentence-transformers CrossEncoder on the CPU instead:
+
+- only the first ``candidates`` retrieved items are scored; the rest keep
+  their retrieval order after the re-ranked ones
+- scores are cached in an LRU keyed by (model, query, chunk text), so
+  repeated questions and chunks shared between queries are scored once
+- uncached pairs are deduplicated and scored longest first in batches,
+  which keeps padding inside a batch small
+- the model is loaded on first use; ``backend="onnx"`` (sentence-transformers
+  4.1 or later with onnxruntime) and ``threads`` tune CPU execution
+
+Items can be product-page hits (RetrievedChunk), CodeChunk, ContextItem or
+plain strings; anything else needs a ``text`` function.
+
+Example::
+
+    reranker = CrossEncoderReranker()
+    hits = retriever.search(question, k=30)
+    for ranked in reranker.rerank(question, hits, k=5):
+        print(ranked.score, ranked.rank, ranked.item.chunk.product_name)
+
+Run as a script to compare latency with and without re-ranking:
+
+    python -m advanced_rag.reranker --corpus product
+    python -m advanced_rag.reranker --corpus code --repo mcp-gateway-registry
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from sentence_transformers import CrossEncoder
+
+from advanced_rag.cache import LRUCache
+from advanced_rag.tracing import count, span
+
+
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+DEFAULT_CANDIDATES = 30
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_CACHE_SIZE = 50_000
+DEFAULT_MAX_LENGTH = 256
+BACKENDS = ("torch", "onnx")
+
+# Part 1 questions from the README, used for the code benchmark
+CODE_QUERIES = [
+    "What Python dependencies does this project use?",
+    "What is the main entry point file for the registry service?",
+    "How does the authentication flow work, from token validation to user authorization?",
+    "What are all the API endpoints available in the registry service and what scopes do they require?",
+    "How would you add support for a new OAuth provider (e.g., Okta) to the authentication system?",
+]
+
+
+@dataclass
+class RankedItem:
+    """A re-ranked item; ``rank`` is its 0-based retrieval position."""
+
+    item: Any
+    score: float
+    rank: int
+
+
+def item_text(
+    item: Any
+) -> str:
+    """The text to score for a retrieval result."""
+    if isinstance(item, str):
+        return item
+    if hasattr(item, "chunk"):  # RetrievedChunk
+        return item.chunk.text
+    return item.text
+
+
+class CrossEncoderReranker:
+    """Batched, cached cross-encoder scoring on the CPU."""
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_RERANK_MODEL,
+        model: CrossEncoder | None = None,
+        candidates: int = DEFAULT_CANDIDATES,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        max_length: int = DEFAULT_MAX_LENGTH,
+        backend: str = "torch",
+        threads: int | None = None,
+    ) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}")
+        self.model_name = model_name
+        self.candidates = candidates
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.backend = backend
+        self.threads = threads
+        self.cache = LRUCache(cache_size)
+        self.stats = {"cache_hits": 0, "scored": 0, "batches": 0}
+        self._model = model
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> CrossEncoder:
+        """The cross-encoder, loaded on first use."""
+        with self._lock:
+            if self._model is None:
+                if self.threads:
+                    import torch
+
+                    torch.set_num_threads(self.threads)
+                kwargs = {"max_length": self.max_length, "device": "cpu"}
+                if self.backend != "torch":
+                    kwargs["backend"] = self.backend
+                try:
+                    self._model = CrossEncoder(self.model_name, **kwargs)
+                except TypeError as exc:
+                    raise ValueError(
+                        f"backend={self.backend!r} needs sentence-transformers 4.1 or later"
+                    ) from exc
+            return self._model
+
+    def _key(
+        self,
+        query: str,
+        text: str,
+    ) -> bytes:
+        digest = hashlib.sha1(f"{self.model_name}\0{query}\0".encode("utf-8"))
+        digest.update(text.encode("utf-8"))
+        return digest.digest()
+
+    def score(
+        self,
+        query: str,
+        texts: Sequence[str],
+    ) -> np.ndarray:
+        """Relevance scores of ``texts`` for ``query``; higher is better."""
+        keys = [self._key(query, text) for text in texts]
+        scores: dict[bytes, float] = {}
+        for key in dict.fromkeys(keys):
+            cached = self.cache.get(key)
+            if cached is not None:
+                scores[key] = cached
+        self.stats["cache_hits"] += len(scores)
+
+        text_by_key = dict(zip(keys, texts))
+        missing = sorted(
+            (key for key in text_by_key if key not in scores),
+            key=lambda key: -len(text_by_key[key]),
+        )
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            with span("rerank.predict", pairs=len(batch)):
+                predicted = self.model.predict(
+                    [(query, text_by_key[key]) for key in batch],
+                    batch_size=self.batch_size,
+                    show_progress_bar=False,
+                )
+            for key, value in zip(batch, np.asarray(predicted, dtype=np.float32).ravel()):
+                scores[key] = float(value)
+                self.cache.put(key, float(value))
+            self.stats["batches"] += 1
+        self.stats["scored"] += len(missing)
+        count("chunks_scored", len(missing))
+        return np.array([scores[key] for key in keys], dtype=np.float32)
+
+    def rerank(
+        self,
+        query: str,
+        items: Sequence[Any],
+        k: int | None = None,
+        text: Callable[[Any], str] = item_text,
+    ) -> list[RankedItem]:
+        """Re-order ``items`` (in retrieval order) by cross-encoder score.
+
+        Items past the candidate cutoff follow in retrieval order with a
+        score of -inf.
+        """
+        head = list(items[:self.candidates])
+        with span("rerank", candidates=len(head)):
+            scores = self.score(query, [text(item) for item in head])
+        order = np.argsort(-scores, kind="stable")
+        ranked = [RankedItem(head[i], float(scores[i]), int(i)) for i in order]
+        ranked.extend(
+            RankedItem(item, float("-inf"), rank)
+            for rank, item in enumerate(items[self.candidates:], start=len(head))
+        )
+        return ranked[:k] if k is not None else ranked
+
+
+@dataclass
+class RerankBenchmark:
+    """Latency of retrieval alone and with re-ranking, in milliseconds."""
+
+    corpus: str
+    queries: int
+    candidates: int
+    k: int
+    retrieve_p50_ms: float
+    retrieve_p95_ms: float
+    rerank_cold_p50_ms: float
+    rerank_cold_p95_ms: float
+    rerank_warm_p50_ms: float
+    rerank_warm_p95_ms: float
+    top_k_changed: float
+
+
+def benchmark_reranker(
+    retrieve: Callable[[str, int], Sequence[Any]],
+    queries: Sequence[str],
+    reranker: CrossEncoderReranker,
+    corpus: str,
+    k: int = 5,
+) -> RerankBenchmark:
+    """Time ``retrieve`` alone, then re-ranking with a cold and a warm cache.
+
+    ``top_k_changed`` is the mean fraction of the top-k that re-ranking
+    replaced.
+    """
+    retrieve_ms, cold_ms, warm_ms, changed = [], [], [], []
+    candidate_lists = []
+    for query in queries:
+        start = time.perf_counter()
+        items = retrieve(query, reranker.candidates)
+        retrieve_ms.append((time.perf_counter() - start) * 1000)
+        candidate_lists.append(items)
+
+    for query, items in zip(queries, candidate_lists):
+        start = time.perf_counter()
+        ranked = reranker.rerank(query, items, k)
+        cold_ms.append((time.perf_counter() - start) * 1000)
+        reranked = {entry.rank for entry in ranked}
+        changed.append(len(reranked - set(range(k))) / max(min(k, len(items)), 1))
+
+    for query, items in zip(queries, candidate_lists):
+        start = time.perf_counter()
+        reranker.rerank(query, items, k)
+        warm_ms.append((time.perf_counter() - start) * 1000)
+
+    def percentile(values: list[float], q: int) -> float:
+        return round(float(np.percentile(values, q)), 3)
+
+    return RerankBenchmark(
+        corpus=corpus,
+        queries=len(queries),
+        candidates=reranker.candidates,
+        k=k,
+        retrieve_p50_ms=percentile(retrieve_ms, 50),
+        retrieve_p95_ms=percentile(retrieve_ms, 95),
+        rerank_cold_p50_ms=percentile(cold_ms, 50),
+        rerank_cold_p95_ms=percentile(cold_ms, 95),
+        rerank_warm_p50_ms=percentile(warm_ms, 50),
+        rerank_warm_p95_ms=percentile(warm_ms, 95),
+        top_k_changed=round(float(np.mean(changed)), 4),
+    )
+
+
+def _corpus_retriever(
+    args: argparse.Namespace
+) -> tuple[Callable[[str, int], Sequence[Any]], list[str]]:
+    """A retrieve(query, n) function and benchmark queries for the corpus."""
+    if args.corpus == "product":
+        from advanced_rag.hybrid_retriever import HybridRetriever
+        from advanced_rag.product_index import load_product_index
+        from advanced_rag.router import SALES_ROUTE_EXEMPLARS
+
+        retriever = HybridRetriever(load_product_index())
+        queries = SALES_ROUTE_EXEMPLARS["text"] + SALES_ROUTE_EXEMPLARS["both"]
+        return retriever.search, queries
+
+    from advanced_rag.code_chunker import chunk_repository
+    from advanced_rag.embedding_cache import CachedEncoder
+    from advanced_rag.product_index import DEFAULT_MODEL
+
+    if args.repo is None:
+        raise SystemExit("--repo is required for --corpus code")
+    chunks = chunk_repository(args.repo)
+    encoder = CachedEncoder(DEFAULT_MODEL)
+    embeddings = encoder.encode([chunk.text for chunk in chunks], normalize_embeddings=True)
+
+    def retrieve(query: str, n: int) -> list:
+        scores = embeddings @ encoder.encode(query, normalize_embeddings=True)
+        return [chunks[i] for i in np.argsort(-scores)[:n]]
+
+    return retrieve, list(CODE_QUERIES)
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Cross-encoder re-ranking latency report")
+    parser.add_argument("--corpus", choices=["product", "code"], default="product")
+    parser.add_argument("--repo", type=Path, default=None, help="Repository for --corpus code")
+    parser.add_argument("--model", default=DEFAULT_RERANK_MODEL)
+    parser.add_argument("--candidates", type=int, default=DEFAULT_CANDIDATES)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--backend", choices=BACKENDS, default="torch")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--output", type=Path, default=None, help="Write the result as JSON")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Print retrieval latency with and without re-ranking."""
+    args = _parse_args()
+    retrieve, queries = _corpus_retriever(args)
+    reranker = CrossEncoderReranker(
+        args.model, candidates=args.candidates, backend=args.backend, threads=args.threads
+    )
+    # Load the model outside the timed runs
+    reranker.score("warm up", ["warm up"])
+    reranker.cache.clear()
+    result = benchmark_reranker(retrieve, queries, reranker, args.corpus, args.k)
+    for name, value in asdict(result).items():
+        print(f"{name:<20}{value}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(asdict(result), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
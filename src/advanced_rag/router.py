@@ -0,0 +1,220 @@
+"""
+Query router with a local embedding fast path and an LLM fallback.
+
+Queries are first classified by cosine similarity against labeled exemplar
+queries. Only when the best route is not clearly ahead of the runner-up
+(or not similar enough to any exemplar) is the LLM asked via ``litellm``.
+Decisions are cached in an LRU keyed by normalized query text, so repeated
+questions skip both steps. When the LLM call fails the embedding guess is
+returned but not cached, and the failure is counted as
+``llm_route_failures``.
+
+The default exemplars cover the Part 2 routes:
+
+- ``csv``: analytical / numerical questions answered from daily_sales.csv
+- ``text``: product details and reviews from the product pages
+- ``both``: questions that need both sources
+
+Example::
+
+    router = QueryRouter()
+    router.route("Which region had the highest sales volume?").route  # "csv"
+"""
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+
+import litellm
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from advanced_rag.cache import LRUCache, normalize_query
+from advanced_rag.embedding_cache import CachedEncoder
+from advanced_rag.product_index import DEFAULT_MODEL
+from advanced_rag.tracing import count, span
+
+
+DEFAULT_LLM_MODEL = "groq/llama-3.1-8b-instant"
+DEFAULT_CACHE_SIZE = 4096
+
+# Accept the embedding route when the best exemplar is at least this
+# similar and beats the best exemplar of any other route by the margin
+DEFAULT_MIN_SIMILARITY = 0.45
+DEFAULT_MIN_MARGIN = 0.05
+
+SALES_ROUTE_EXEMPLARS = {
+    "csv": [
+        "What was the total revenue for Electronics in December 2024?",
+        "Which region had the highest sales volume?",
+        "How many units were sold in the West region last month?",
+        "What is the average unit price for Clothing?",
+        "Which category generated the most revenue?",
+        "Show total sales by region for November",
+        "What were the top 5 products by units sold?",
+        "How did revenue change between October and December?",
+        "Which day had the highest total revenue?",
+    ],
+    "text": [
+        "What are the key features of the Wireless Bluetooth Headphones?",
+        "What do customers say about the Air Fryer's ease of cleaning?",
+        "What are the technical specifications of the office chair?",
+        "Is the yoga mat non-slip according to reviews?",
+        "What ingredients are in the Vitamin C Serum?",
+        "Do reviewers complain about the battery life?",
+        "What is included with the building blocks set?",
+        "How do customers describe the taste of the coffee beans?",
+    ],
+    "both": [
+        "Which product has the best customer reviews and how well is it selling?",
+        "I want a product for fitness that is highly rated and sells well in the West region",
+        "Are the best reviewed products also the best sellers?",
+        "Recommend a highly rated kitchen product with strong sales",
+        "How do sales of the headphones compare with what reviewers say?",
+        "Which top-selling product has the most complaints in reviews?",
+    ],
+}
+
+ROUTE_DESCRIPTIONS = {
+    "csv": "analytical or numerical question about sales (revenue, units, regions, dates)",
+    "text": "question about product details, features, specifications or customer reviews",
+    "both": "question that needs both sales figures and product details or reviews",
+}
+
+@dataclass
+class RouteDecision:
+    """The route chosen for a query and how it was chosen."""
+
+    route: str
+    confidence: float
+    method: str
+    scores: dict[str, float] = field(default_factory=dict)
+
+
+class QueryRouter:
+    """Route queries by exemplar similarity, falling back to an LLM."""
+
+    def __init__(
+        self,
+        exemplars: Mapping[str, Sequence[str]] = SALES_ROUTE_EXEMPLARS,
+        descriptions: Mapping[str, str] = ROUTE_DESCRIPTIONS,
+        encoder: SentenceTransformer | CachedEncoder | None = None,
+        llm_model: str | None = DEFAULT_LLM_MODEL,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+        min_margin: float = DEFAULT_MIN_MARGIN,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        self.routes = list(exemplars)
+        self.descriptions = dict(descriptions)
+        self.encoder = encoder or CachedEncoder(DEFAULT_MODEL)
+        self.llm_model = llm_model
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.cache = LRUCache(cache_size)
+
+        texts = [text for route in self.routes for text in exemplars[route]]
+        self._labels = np.array([
+            position
+            for position, route in enumerate(self.routes)
+            for _ in exemplars[route]
+        ])
+        self._exemplars = self._embed(texts)
+
+    def _embed(
+        self,
+        texts: list[str],
+    ) -> np.ndarray:
+        """Normalized embeddings for ``texts``."""
+        return self.encoder.encode(
+            texts,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        ).astype(np.float32)
+
+    def classify_local(
+        self,
+        query: str,
+    ) -> RouteDecision:
+        """Classify by the best exemplar similarity of each route."""
+        similarities = self._exemplars @ self._embed([query])[0]
+        best = np.full(len(self.routes), -1.0, dtype=np.float32)
+        np.maximum.at(best, self._labels, similarities)
+
+        order = np.argsort(-best)
+        top = float(best[order[0]])
+        margin = top - float(best[order[1]]) if len(order) > 1 else top
+        return RouteDecision(
+            route=self.routes[order[0]],
+            confidence=margin,
+            method="embedding",
+            scores={route: float(score) for route, score in zip(self.routes, best)},
+        )
+
+    def _is_confident(
+        self,
+        decision: RouteDecision,
+    ) -> bool:
+        return (
+            decision.scores[decision.route] >= self.min_similarity
+            and decision.confidence >= self.min_margin
+        )
+
+    def classify_llm(
+        self,
+        query: str,
+    ) -> str | None:
+        """Ask the LLM for a route; return None if it fails or is unclear."""
+        options = "\n".join(
+            f"- {route}: {self.descriptions.get(route, route)}"
+            for route in self.routes
+        )
+        prompt = (
+            "Classify the question into exactly one route.\n"
+            f"Routes:\n{options}\n\n"
+            f"Question: {query}\n"
+            "Answer with the route name only."
+        )
+        try:
+            response = litellm.completion(
+                model=self.llm_model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0,
+                max_tokens=5,
+            )
+        except Exception:
+            count("llm_route_failures")
+            return None
+
+        answer = normalize_query(response.choices[0].message.content or "")
+        return next((route for route in self.routes if route in answer.split()), None)
+
+    def route(
+        self,
+        query: str,
+    ) -> RouteDecision:
+        """Return the route for ``query``, using the cache when possible."""
+        with span("routing"):
+            key = normalize_query(query)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+            decision = self.classify_local(query)
+            final = self._is_confident(decision) or not self.llm_model
+            if not final:
+                with span("routing.llm"):
+                    llm_route = self.classify_llm(query)
+                if llm_route is not None:
+                    decision = RouteDecision(
+                        route=llm_route,
+                        confidence=decision.confidence,
+                        method="llm",
+                        scores=decision.scores,
+                    )
+                    final = True
+
+            # A guess left over from a failed LLM call is not cached, so the
+            # next request retries the LLM
+            if final:
+                self.cache.put(key, decision)
+            return decision
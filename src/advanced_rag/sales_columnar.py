@@ -0,0 +1,324 @@
+"""
+Columnar binary storage for the daily sales data.
+
+A columnar store is a directory holding one memory-mappable ``.npy`` file
+per column plus a ``manifest.json`` describing dtypes, row count and the
+string dictionaries used to encode ``product_id``, ``category`` and
+``region``. Dates are stored as integer days since 1970-01-01 and rows keep
+the date order of the source CSV, so a date range maps to a contiguous
+slice.
+
+Example - total Electronics revenue in December 2024::
+
+    sales = load_sales_columns(Path("data/structured/daily_sales_columnar"))
+    rows = sales.row_range(date(2024, 12, 1), date(2024, 12, 31))
+    mask = sales.columns["category"][rows] == sales.code("category", "Electronics")
+    total = sales.columns["total_revenue"][rows][mask].sum()
+
+Run as a script to convert an existing CSV:
+
+    python -m advanced_rag.sales_columnar data/structured/daily_sales.csv
+"""
+
+import argparse
+import csv
+import json
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+EPOCH = date(1970, 1, 1)
+
+# Column name -> on-disk dtype
+COLUMN_DTYPES = {
+    "day": np.int32,
+    "product": np.int16,
+    "category": np.int8,
+    "region": np.int8,
+    "units_sold": np.int32,
+    "unit_price": np.float64,
+    "total_revenue": np.float64,
+}
+
+# Dictionary-encoded columns and the dictionary each one indexes
+DICTIONARY_COLUMNS = {
+    "product": "product_id",
+    "category": "category",
+    "region": "region",
+}
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+def day_number(
+    value: date
+) -> int:
+    """Return the number of days between EPOCH and ``value``."""
+    return (value - EPOCH).days
+
+
+def day_to_date(
+    day: int
+) -> date:
+    """Inverse of day_number."""
+    return EPOCH + timedelta(days=int(day))
+
+
+class SalesColumnarWriter:
+    """Write a columnar sales store chunk by chunk with bounded memory.
+
+    The total row count must be known up front so every column can be
+    allocated as a fixed-size ``.npy`` memmap and filled in place.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        num_rows: int,
+    ) -> None:
+        self.output_dir = output_dir
+        self.num_rows = num_rows
+        self._offset = 0
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self._columns = {
+            name: np.lib.format.open_memmap(
+                output_dir / f"{name}.npy",
+                mode="w+",
+                dtype=dtype,
+                shape=(num_rows,),
+            )
+            for name, dtype in COLUMN_DTYPES.items()
+        }
+
+    def write(
+        self,
+        chunk: dict[str, np.ndarray],
+    ) -> None:
+        """Append a chunk holding one equally sized array per column."""
+        size = len(chunk["day"])
+        end = self._offset + size
+        if end > self.num_rows:
+            raise ValueError(
+                f"Chunk overflows store: {end} rows > {self.num_rows} allocated"
+            )
+        for name, column in self._columns.items():
+            column[self._offset:end] = chunk[name]
+        self._offset = end
+
+    def close(
+        self,
+        dictionaries: dict[str, list[str]],
+        product_names: list[str],
+    ) -> Path:
+        """Flush all columns and write the manifest; return the store path."""
+        if self._offset != self.num_rows:
+            raise ValueError(
+                f"Store incomplete: wrote {self._offset} of {self.num_rows} rows"
+            )
+        for column in self._columns.values():
+            column.flush()
+        self._columns = {}
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "num_rows": self.num_rows,
+            "sorted_by": "day",
+            "day_epoch": EPOCH.isoformat(),
+            "columns": {
+                name: np.dtype(dtype).str for name, dtype in COLUMN_DTYPES.items()
+            },
+            "dictionaries": dictionaries,
+            "product_names": product_names,
+        }
+        with open(self.output_dir / MANIFEST_NAME, "w") as f:
+            json.dump(manifest, f, indent=2)
+        return self.output_dir
+
+
+@dataclass
+class SalesColumns:
+    """A memory-mapped columnar sales store."""
+
+    num_rows: int
+    columns: dict[str, np.ndarray]
+    dictionaries: dict[str, list[str]]
+    product_names: list[str]
+
+    def code(
+        self,
+        dictionary: str,
+        value: str,
+    ) -> int:
+        """Return the integer code of ``value`` in a dictionary, or -1."""
+        try:
+            return self.dictionaries[dictionary].index(value)
+        except ValueError:
+            return -1
+
+    def decode(
+        self,
+        column: str,
+        codes: np.ndarray,
+    ) -> list[str]:
+        """Map the codes of a dictionary-encoded column back to strings."""
+        labels = self.dictionaries[DICTIONARY_COLUMNS[column]]
+        return [labels[code] for code in codes.tolist()]
+
+    def row_range(
+        self,
+        start: date,
+        end: date,
+    ) -> slice:
+        """Return the slice of rows dated within [start, end] (inclusive).
+
+        Rows are sorted by day, so this is two binary searches over the
+        memory-mapped ``day`` column and never reads the whole file.
+        """
+        days = self.columns["day"]
+        lo = int(np.searchsorted(days, day_number(start), side="left"))
+        hi = int(np.searchsorted(days, day_number(end), side="right"))
+        return slice(lo, hi)
+
+
+def load_sales_columns(
+    store_dir: Path
+) -> SalesColumns:
+    """Open a columnar sales store with every column memory-mapped read-only."""
+    with open(store_dir / MANIFEST_NAME) as f:
+        manifest = json.load(f)
+
+    if manifest["format_version"] != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported columnar format version {manifest['format_version']}"
+        )
+
+    columns = {
+        name: np.load(store_dir / f"{name}.npy", mmap_mode="r")
+        for name in manifest["columns"]
+    }
+    return SalesColumns(
+        num_rows=manifest["num_rows"],
+        columns=columns,
+        dictionaries=manifest["dictionaries"],
+        product_names=manifest["product_names"],
+    )
+
+
+def _count_rows(
+    csv_path: Path
+) -> int:
+    """Count data rows in a CSV by counting newlines in binary blocks."""
+    newlines = 0
+    last = b"\n"
+    with open(csv_path, "rb") as f:
+        while block := f.read(1 << 20):
+            newlines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        newlines += 1
+    # Exclude the header line
+    return max(newlines - 1, 0)
+
+
+def _encode(
+    codes: dict[str, int],
+    value: str,
+) -> int:
+    """Return the dictionary code for ``value``, assigning a new one if needed."""
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(codes)
+    return code
+
+
+def convert_csv(
+    csv_path: Path,
+    output_dir: Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Path:
+    """Convert a daily sales CSV into a columnar store; return the store path."""
+    num_rows = _count_rows(csv_path)
+    writer = SalesColumnarWriter(output_dir, num_rows)
+
+    product_codes: dict[str, int] = {}
+    product_names: dict[str, str] = {}
+    category_codes: dict[str, int] = {}
+    region_codes: dict[str, int] = {}
+    day_cache: dict[str, int] = {}
+
+    with open(csv_path, newline="") as f:
+        reader = csv.DictReader(f)
+        buffer: dict[str, list] = {name: [] for name in COLUMN_DTYPES}
+
+        for row in reader:
+            day = day_cache.get(row["date"])
+            if day is None:
+                day = day_cache[row["date"]] = day_number(
+                    date.fromisoformat(row["date"])
+                )
+            buffer["day"].append(day)
+            buffer["product"].append(_encode(product_codes, row["product_id"]))
+            buffer["category"].append(_encode(category_codes, row["category"]))
+            buffer["region"].append(_encode(region_codes, row["region"]))
+            buffer["units_sold"].append(int(row["units_sold"]))
+            buffer["unit_price"].append(float(row["unit_price"]))
+            buffer["total_revenue"].append(float(row["total_revenue"]))
+            product_names.setdefault(row["product_id"], row["product_name"])
+
+            if len(buffer["day"]) >= chunk_size:
+                writer.write(buffer)
+                buffer = {name: [] for name in COLUMN_DTYPES}
+
+        if buffer["day"]:
+            writer.write(buffer)
+
+    return writer.close(
+        dictionaries={
+            "product_id": list(product_codes),
+            "category": list(category_codes),
+            "region": list(region_codes),
+        },
+        product_names=[product_names[pid] for pid in product_codes],
+    )
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Convert a daily sales CSV into a columnar .npy store"
+    )
+    parser.add_argument("csv_path", type=Path, help="Path to daily_sales.csv")
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=None,
+        help="Store directory (default: <csv stem>_columnar next to the CSV)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Rows parsed per chunk; bounds memory use",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Convert a CSV given on the command line."""
+    args = _parse_args()
+    output_dir = args.output_dir or (
+        args.csv_path.parent / f"{args.csv_path.stem}_columnar"
+    )
+    store_dir = convert_csv(args.csv_path, output_dir, args.chunk_size)
+    print(f"Wrote columnar store to {store_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Precomputed rollup cube for the daily sales data.
+
+The cube holds dense ``day x product x region`` arrays of summed
+``units_sold``, ``total_revenue`` and row counts. Category is a function of
+product, so category filters and groupings are answered by folding the
+product axis. Every query touches only cube cells, never raw rows, so its
+cost is independent of the size of the sales file.
+
+Example - total Electronics revenue in December 2024::
+
+    cube = load_cube(Path("data/structured/daily_sales_cube.npz"))
+    cube.query(
+        "total_revenue",
+        start=date(2024, 12, 1),
+        end=date(2024, 12, 31),
+        categories=["Electronics"],
+    )
+
+Example - units sold per region::
+
+    cube.query("units_sold", group_by=["region"])
+
+Run as a script to build a cube from a columnar store:
+
+    python -m advanced_rag.sales_cube data/structured/daily_sales_columnar
+"""
+
+import argparse
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from advanced_rag.sales_columnar import (
+    SalesColumns,
+    day_number,
+    day_to_date,
+    load_sales_columns,
+)
+from advanced_rag.tracing import count
+
+
+MEASURES = ["units_sold", "total_revenue", "rows"]
+# Group key -> cube axis it folds (day, product, region)
+GROUP_AXES = {"day": 0, "month": 0, "product_id": 1, "category": 1, "region": 2}
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+@dataclass
+class SalesCube:
+    """Dense day x product x region aggregates of the sales data."""
+
+    first_day: int
+    product_ids: list[str]
+    product_categories: list[str]
+    regions: list[str]
+    measures: dict[str, np.ndarray]
+
+    @property
+    def num_days(self) -> int:
+        return self.measures["rows"].shape[0]
+
+    def _day_labels(
+        self,
+        key: str,
+        days: slice,
+    ) -> list[str]:
+        """Label each day in ``days`` by ISO date or by YYYY-MM month."""
+        labels = []
+        for offset in range(days.start, days.stop):
+            iso = day_to_date(self.first_day + offset).isoformat()
+            labels.append(iso if key == "day" else iso[:7])
+        return labels
+
+    def _fold(
+        self,
+        values: np.ndarray,
+        axis: int,
+        labels: list[str],
+    ) -> tuple[np.ndarray, list[str]]:
+        """Sum entries of ``axis`` that share a label, keeping label order."""
+        unique = list(dict.fromkeys(labels))
+        if not unique:
+            return values, unique
+        index = np.array([unique.index(label) for label in labels])
+        order = np.argsort(index, kind="stable")
+        starts = np.flatnonzero(np.diff(index[order], prepend=-1))
+        folded = np.add.reduceat(np.take(values, order, axis=axis), starts, axis=axis)
+        return folded, unique
+
+    def query(
+        self,
+        measure: str = "total_revenue",
+        start: date | None = None,
+        end: date | None = None,
+        categories: Sequence[str] | None = None,
+        product_ids: Sequence[str] | None = None,
+        regions: Sequence[str] | None = None,
+        group_by: Sequence[str] = (),
+    ) -> float | dict:
+        """Sum ``measure`` over the filtered cells.
+
+        Filters are inclusive date bounds and allow-lists of categories,
+        product ids and regions. Without ``group_by`` a single number is
+        returned; otherwise a dict keyed by the group label (or a tuple of
+        labels, in ``group_by`` order, when grouping by more than one key).
+        """
+        if measure not in MEASURES:
+            raise ValueError(f"Unknown measure {measure!r}; expected one of {MEASURES}")
+        for key in group_by:
+            if key not in GROUP_AXES:
+                raise ValueError(
+                    f"Unknown group key {key!r}; expected one of {list(GROUP_AXES)}"
+                )
+        axes = [GROUP_AXES[key] for key in group_by]
+        if len(set(axes)) != len(axes):
+            raise ValueError(f"Group keys {list(group_by)} share a cube dimension")
+
+        # Day axis: clamp the requested range to the cube
+        lo = 0 if start is None else day_number(start) - self.first_day
+        hi = self.num_days if end is None else day_number(end) - self.first_day + 1
+        lo = min(max(lo, 0), self.num_days)
+        days = slice(lo, min(max(hi, lo), self.num_days))
+
+        product_mask = np.ones(len(self.product_ids), dtype=bool)
+        if categories is not None:
+            product_mask &= np.isin(self.product_categories, list(categories))
+        if product_ids is not None:
+            product_mask &= np.isin(self.product_ids, list(product_ids))
+        region_mask = np.ones(len(self.regions), dtype=bool)
+        if regions is not None:
+            region_mask &= np.isin(self.regions, list(regions))
+
+        values = self.measures[measure][days][:, product_mask][:, :, region_mask]
+        count("cells_scanned", values.size)
+
+        if not group_by:
+            return float(values.sum())
+
+        # Fold each grouped axis down to one entry per label
+        axis_labels: list[list[str]] = [[], [], []]
+        for key, axis in zip(group_by, axes):
+            if axis == 0:
+                labels = self._day_labels(key, days)
+            else:
+                source = {
+                    "product_id": self.product_ids,
+                    "category": self.product_categories,
+                    "region": self.regions,
+                }[key]
+                mask = region_mask if axis == 2 else product_mask
+                labels = [label for label, keep in zip(source, mask) if keep]
+            values, axis_labels[axis] = self._fold(values, axis, labels)
+
+        # Sum away the remaining axes and order the rest as in group_by
+        values = values.sum(axis=tuple(a for a in range(3) if a not in axes))
+        values = np.transpose(values, [sorted(axes).index(a) for a in axes])
+
+        result = {}
+        for index in np.ndindex(*values.shape):
+            labels = tuple(axis_labels[a][i] for a, i in zip(axes, index))
+            result[labels[0] if len(labels) == 1 else labels] = float(values[index])
+        return result
+
+    def save(
+        self,
+        output_path: Path,
+    ) -> Path:
+        """Write the cube to a single .npz file."""
+        metadata = {
+            "first_day": self.first_day,
+            "product_ids": self.product_ids,
+            "product_categories": self.product_categories,
+            "regions": self.regions,
+        }
+        np.savez(
+            output_path,
+            metadata=np.array(json.dumps(metadata)),
+            **self.measures,
+        )
+        return output_path
+
+
+class SalesCubeBuilder:
+    """Accumulate sales rows chunk by chunk into a SalesCube."""
+
+    def __init__(
+        self,
+        first_day: int,
+        num_days: int,
+        product_ids: list[str],
+        product_categories: list[str],
+        regions: list[str],
+    ) -> None:
+        self.first_day = first_day
+        self.product_ids = product_ids
+        self.product_categories = product_categories
+        self.regions = regions
+        self._shape = (num_days, len(product_ids), len(regions))
+        self._num_cells = int(np.prod(self._shape))
+        self._measures = {
+            measure: np.zeros(self._num_cells) for measure in MEASURES
+        }
+
+    def add(
+        self,
+        day: np.ndarray,
+        product: np.ndarray,
+        region: np.ndarray,
+        units_sold: np.ndarray,
+        total_revenue: np.ndarray,
+    ) -> None:
+        """Add a chunk of rows given as parallel arrays of codes and values."""
+        cells = np.ravel_multi_index(
+            (
+                np.asarray(day, dtype=np.int64) - self.first_day,
+                np.asarray(product, dtype=np.int64),
+                np.asarray(region, dtype=np.int64),
+            ),
+            self._shape,
+        )
+        for measure, weights in (
+            ("units_sold", units_sold),
+            ("total_revenue", total_revenue),
+            ("rows", None),
+        ):
+            self._measures[measure] += np.bincount(
+                cells, weights=weights, minlength=self._num_cells
+            )
+
+    def build(self) -> SalesCube:
+        """Return the accumulated cube."""
+        return SalesCube(
+            first_day=self.first_day,
+            product_ids=self.product_ids,
+            product_categories=self.product_categories,
+            regions=self.regions,
+            measures={
+                measure: values.reshape(self._shape)
+                for measure, values in self._measures.items()
+            },
+        )
+
+
+def build_cube_from_columns(
+    sales: SalesColumns,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> SalesCube:
+    """Build a cube by scanning a columnar store once in fixed-size chunks."""
+    columns = sales.columns
+    product_ids = sales.dictionaries["product_id"]
+    categories = sales.dictionaries["category"]
+
+    if sales.num_rows == 0:
+        first_day, num_days = 0, 0
+    else:
+        first_day = int(columns["day"][0])
+        num_days = int(columns["day"][-1]) - first_day + 1
+
+    # Category is a function of product; recover the mapping from the rows
+    product_category = np.full(len(product_ids), -1, dtype=np.int64)
+    for lo in range(0, sales.num_rows, chunk_size):
+        rows = slice(lo, lo + chunk_size)
+        product_category[columns["product"][rows]] = columns["category"][rows]
+
+    builder = SalesCubeBuilder(
+        first_day=first_day,
+        num_days=num_days,
+        product_ids=product_ids,
+        product_categories=[
+            categories[code] if code >= 0 else "" for code in product_category
+        ],
+        regions=sales.dictionaries["region"],
+    )
+    for lo in range(0, sales.num_rows, chunk_size):
+        rows = slice(lo, lo + chunk_size)
+        builder.add(
+            columns["day"][rows],
+            columns["product"][rows],
+            columns["region"][rows],
+            columns["units_sold"][rows],
+            columns["total_revenue"][rows],
+        )
+    return builder.build()
+
+
+def load_cube(
+    cube_path: Path
+) -> SalesCube:
+    """Load a cube written by SalesCube.save."""
+    with np.load(cube_path, allow_pickle=False) as data:
+        metadata = json.loads(str(data["metadata"]))
+        measures = {measure: data[measure] for measure in MEASURES}
+    return SalesCube(
+        first_day=metadata["first_day"],
+        product_ids=metadata["product_ids"],
+        product_categories=metadata["product_categories"],
+        regions=metadata["regions"],
+        measures=measures,
+    )
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Build a sales rollup cube from a columnar store"
+    )
+    parser.add_argument(
+        "store_dir",
+        type=Path,
+        help="Columnar store directory (see advanced_rag.sales_columnar)",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Cube file (default: daily_sales_cube.npz next to the store)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Build a cube from the store given on the command line."""
+    args = _parse_args()
+    output = args.output or args.store_dir.parent / "daily_sales_cube.npz"
+    cube = build_cube_from_columns(load_sales_columns(args.store_dir))
+    cube.save(output)
+    print(f"Wrote sales cube {cube.measures['rows'].shape} to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Sidecar index for an append-only, date-sorted daily sales CSV.
+
+For every distinct date in the CSV the index records the byte offset of its
+first row, plus prefix sums of revenue, units and row counts per category
+and per region. A date range then maps to one contiguous byte range of the
+file, and a range total is the difference of two prefix-sum rows.
+
+The index remembers how many bytes of the CSV it covers, so after rows are
+appended only the new tail of the file is scanned (see update_sales_index).
+
+Example - Electronics revenue in December 2024 without reading the CSV::
+
+    index = update_sales_index(Path("data/structured/daily_sales.csv"))
+    index.range_sum(
+        "total_revenue",
+        date(2024, 12, 1),
+        date(2024, 12, 31),
+        category="Electronics",
+    )
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from advanced_rag.sales_columnar import day_number
+
+
+INDEX_SUFFIX = ".index.npz"
+
+# Bytes at the start of the CSV hashed to detect a rewritten file
+HEAD_BYTES = 1 << 16
+
+MEASURES = ["total_revenue", "units_sold", "rows"]
+
+
+@dataclass
+class SalesIndex:
+    """Per-date byte offsets and prefix sums for a sales CSV.
+
+    ``offsets[i]`` is the byte offset of the first row dated ``days[i]`` and
+    ``offsets[-1]`` is the end of the indexed data. Prefix-sum arrays have
+    one more row than ``days``: row ``i`` holds totals over ``days[:i]``.
+    """
+
+    days: np.ndarray
+    offsets: np.ndarray
+    head_hash: str
+    categories: list[str]
+    regions: list[str]
+    # Measure -> (len(days) + 1, len(labels)) prefix sums
+    by_category: dict[str, np.ndarray]
+    by_region: dict[str, np.ndarray]
+
+    @property
+    def end_offset(self) -> int:
+        return int(self.offsets[-1])
+
+    def _positions(
+        self,
+        start: date,
+        end: date,
+    ) -> tuple[int, int]:
+        """Return the index positions bounding dates within [start, end]."""
+        lo = int(np.searchsorted(self.days, day_number(start), side="left"))
+        hi = int(np.searchsorted(self.days, day_number(end), side="right"))
+        return lo, max(lo, hi)
+
+    def byte_range(
+        self,
+        start: date,
+        end: date,
+    ) -> tuple[int, int]:
+        """Return the [begin, end) byte range of rows dated within [start, end]."""
+        lo, hi = self._positions(start, end)
+        return int(self.offsets[lo]), int(self.offsets[hi])
+
+    def range_sum(
+        self,
+        measure: str,
+        start: date,
+        end: date,
+        category: str | None = None,
+        region: str | None = None,
+    ) -> float:
+        """Sum ``measure`` over [start, end] with two prefix-sum lookups.
+
+        At most one of ``category`` and ``region`` may be given; joint
+        filters need per-cell totals (see advanced_rag.sales_cube).
+        """
+        if measure not in MEASURES:
+            raise ValueError(f"Unknown measure {measure!r}; expected one of {MEASURES}")
+        if category is not None and region is not None:
+            raise ValueError("Filter by category or by region, not both")
+
+        lo, hi = self._positions(start, end)
+        if region is not None:
+            labels, sums = self.regions, self.by_region[measure]
+            selected = region
+        else:
+            labels, sums = self.categories, self.by_category[measure]
+            selected = category
+
+        totals = sums[hi] - sums[lo]
+        if selected is None:
+            return float(totals.sum())
+        if selected not in labels:
+            return 0.0
+        return float(totals[labels.index(selected)])
+
+    def save(
+        self,
+        index_path: Path,
+    ) -> Path:
+        """Atomically write the index next to its CSV."""
+        metadata = {
+            "head_hash": self.head_hash,
+            "categories": self.categories,
+            "regions": self.regions,
+        }
+        arrays = {"days": self.days, "offsets": self.offsets}
+        for measure in MEASURES:
+            arrays[f"category_{measure}"] = self.by_category[measure]
+            arrays[f"region_{measure}"] = self.by_region[measure]
+
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, metadata=np.array(json.dumps(metadata)), **arrays)
+        os.replace(tmp_path, index_path)
+        return index_path
+
+
+def index_path_for(
+    csv_path: Path
+) -> Path:
+    """Return the sidecar index path for a CSV."""
+    return csv_path.with_name(csv_path.stem + INDEX_SUFFIX)
+
+
+def _head_hash(
+    csv_path: Path,
+    end_offset: int,
+) -> str:
+    """Hash the indexed head of a file: its first min(HEAD_BYTES, end_offset) bytes."""
+    with open(csv_path, "rb") as f:
+        return hashlib.sha1(f.read(min(HEAD_BYTES, end_offset))).hexdigest()
+
+
+def load_sales_index(
+    index_path: Path
+) -> SalesIndex:
+    """Load an index written by SalesIndex.save."""
+    with np.load(index_path, allow_pickle=False) as data:
+        metadata = json.loads(str(data["metadata"]))
+        return SalesIndex(
+            days=data["days"],
+            offsets=data["offsets"],
+            head_hash=metadata["head_hash"],
+            categories=metadata["categories"],
+            regions=metadata["regions"],
+            by_category={m: data[f"category_{m}"] for m in MEASURES},
+            by_region={m: data[f"region_{m}"] for m in MEASURES},
+        )
+
+
+def _empty_index(
+    header_end: int,
+    head_hash: str,
+) -> SalesIndex:
+    """Return an index covering only the CSV header."""
+    return SalesIndex(
+        days=np.zeros(0, dtype=np.int32),
+        offsets=np.array([header_end], dtype=np.int64),
+        head_hash=head_hash,
+        categories=[],
+        regions=[],
+        by_category={m: np.zeros((1, 0)) for m in MEASURES},
+        by_region={m: np.zeros((1, 0)) for m in MEASURES},
+    )
+
+
+def _extend_prefix_sums(
+    sums: np.ndarray,
+    labels: list[str],
+    day_totals: list[dict[str, float]],
+    continues_last_day: bool,
+) -> np.ndarray:
+    """Extend prefix sums with per-day totals keyed by label.
+
+    ``labels`` may have grown since ``sums`` was built; new columns start at
+    zero. When ``continues_last_day`` is set, the first entry of
+    ``day_totals`` adds to the last existing day instead of starting a new
+    one, which only moves the final prefix row.
+    """
+    sums = np.pad(sums, ((0, 0), (0, len(labels) - sums.shape[1])))
+    increments = np.zeros((len(day_totals), len(labels)))
+    for row, totals in enumerate(day_totals):
+        for label, value in totals.items():
+            increments[row, labels.index(label)] = value
+
+    if continues_last_day:
+        sums[-1] += increments[0]
+        increments = increments[1:]
+    return np.vstack([sums, sums[-1] + np.cumsum(increments, axis=0)])
+
+
+def _scan_tail(
+    csv_path: Path,
+    index: SalesIndex,
+    fieldnames: list[str],
+) -> SalesIndex:
+    """Extend ``index`` with the rows appended after ``index.end_offset``."""
+    position = {name: fieldnames.index(name) for name in (
+        "date", "category", "region", "units_sold", "total_revenue"
+    )}
+    current_day = int(index.days[-1]) if len(index.days) else None
+
+    new_days: list[int] = []
+    new_offsets: list[int] = []
+    # One {measure: {label: total}} dict per scanned day, per dimension
+    category_totals: list[dict[str, dict[str, float]]] = []
+    region_totals: list[dict[str, dict[str, float]]] = []
+    categories = list(index.categories)
+    regions = list(index.regions)
+    day_cache: dict[str, int] = {}
+    continues_last_day = False
+
+    with open(csv_path, "rb") as f:
+        f.seek(index.end_offset)
+        offset = index.end_offset
+        for raw in f:
+            line_offset = offset
+            offset += len(raw)
+            if not raw.strip():
+                continue
+            row = next(csv.reader([raw.decode("utf-8")]))
+
+            day = day_cache.get(row[position["date"]])
+            if day is None:
+                day = day_cache[row[position["date"]]] = day_number(
+                    date.fromisoformat(row[position["date"]])
+                )
+            if current_day is not None and day < current_day:
+                raise ValueError(
+                    f"{csv_path} is not date-sorted at byte {line_offset}: "
+                    f"{row[position['date']]} follows a later date"
+                )
+            if not category_totals:
+                # The first appended rows may continue the last indexed day
+                continues_last_day = day == current_day
+            if day != current_day or not category_totals:
+                if day != current_day:
+                    new_days.append(day)
+                    new_offsets.append(line_offset)
+                category_totals.append({m: {} for m in MEASURES})
+                region_totals.append({m: {} for m in MEASURES})
+                current_day = day
+
+            values = {
+                "total_revenue": float(row[position["total_revenue"]]),
+                "units_sold": float(row[position["units_sold"]]),
+                "rows": 1.0,
+            }
+            for label, labels, totals in (
+                (row[position["category"]], categories, category_totals),
+                (row[position["region"]], regions, region_totals),
+            ):
+                if label not in labels:
+                    labels.append(label)
+                for measure, value in values.items():
+                    day_totals = totals[-1][measure]
+                    day_totals[label] = day_totals.get(label, 0.0) + value
+
+    if not category_totals:
+        return index
+
+    return SalesIndex(
+        days=np.concatenate([index.days, np.array(new_days, dtype=np.int32)]),
+        offsets=np.concatenate([
+            index.offsets[:-1],
+            np.array(new_offsets + [offset], dtype=np.int64),
+        ]),
+        head_hash=index.head_hash,
+        categories=categories,
+        regions=regions,
+        by_category={
+            m: _extend_prefix_sums(
+                index.by_category[m],
+                categories,
+                [totals[m] for totals in category_totals],
+                continues_last_day,
+            )
+            for m in MEASURES
+        },
+        by_region={
+            m: _extend_prefix_sums(
+                index.by_region[m],
+                regions,
+                [totals[m] for totals in region_totals],
+                continues_last_day,
+            )
+            for m in MEASURES
+        },
+    )
+
+
+def update_sales_index(
+    csv_path: Path
+) -> SalesIndex:
+    """Bring the sidecar index of ``csv_path`` up to date and return it.
+
+    Only bytes appended since the index was last saved are scanned. The
+    index is rebuilt from scratch when it is missing or when the CSV was
+    rewritten (its head no longer matches, or it shrank).
+    """
+    index_path = index_path_for(csv_path)
+    size = csv_path.stat().st_size
+
+    with open(csv_path, "rb") as f:
+        header = f.readline()
+    fieldnames = next(csv.reader([header.decode("utf-8")]))
+
+    index = None
+    if index_path.exists():
+        index = load_sales_index(index_path)
+        if (
+            index.end_offset > size
+            or index.head_hash != _head_hash(csv_path, index.end_offset)
+        ):
+            index = None
+    if index is None:
+        index = _empty_index(len(header), "")
+    elif index.end_offset == size:
+        return index
+
+    index = _scan_tail(csv_path, index, fieldnames)
+    index.head_hash = _head_hash(csv_path, index.end_offset)
+    index.save(index_path)
+    return index
+
+
+def iter_rows(
+    csv_path: Path,
+    index: SalesIndex,
+    start: date,
+    end: date,
+) -> Iterator[dict[str, str]]:
+    """Yield rows dated within [start, end], reading only their byte range."""
+    begin, stop = index.byte_range(start, end)
+    with open(csv_path, "rb") as f:
+        fieldnames = next(csv.reader([f.readline().decode("utf-8")]))
+        f.seek(begin)
+        text = f.read(stop - begin).decode("utf-8")
+    yield from csv.DictReader(io.StringIO(text), fieldnames=fieldnames)
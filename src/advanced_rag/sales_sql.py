@@ -0,0 +1,501 @@
+"""
+Embedded SQL engine over the daily sales data.
+
+Answering a CSV question with ``grep``/``awk`` or pandas spawns a process
+or reads the whole file every time. SalesDatabase loads ``daily_sales.csv``
+once into SQLite with indexes on date, category, region and product_id,
+and keeps the connection open. Repeated queries then reuse warm pages,
+cached prepared statements and a result cache. Like the sidecar index in
+advanced_rag.sales_index, the database remembers how many bytes of the
+CSV it has loaded. Appended rows are loaded incrementally; a rewritten
+CSV is reloaded from scratch.
+
+Queries are never built from free text. A SalesQuery plan names a measure,
+an aggregate, filters, group keys, an order and a limit. Every identifier
+is checked against a whitelist and every value is bound as a parameter.
+plan_question turns common sales questions into a plan, which is what the
+router's ``csv`` route targets.
+
+Example - total Electronics revenue in December 2024::
+
+    db = SalesDatabase.open()
+    db.execute(SalesQuery(
+        measure="total_revenue",
+        start=date(2024, 12, 1),
+        end=date(2024, 12, 31),
+        categories=["Electronics"],
+    ))
+
+Example - from a question::
+
+    db.answer("Which region had the highest sales volume?")
+
+Run as a script to build the database or answer a question:
+
+    python -m advanced_rag.sales_sql "Top 5 products by revenue in November"
+"""
+
+import argparse
+import calendar
+import csv
+import hashlib
+import io
+import re
+import sqlite3
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+
+from advanced_rag.cache import LRUCache
+from advanced_rag.sales_index import HEAD_BYTES
+from advanced_rag.tracing import count, span, tracer
+
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+CSV_PATH = DATA_DIR / "structured" / "daily_sales.csv"
+DB_PATH = DATA_DIR / "index" / "sales" / "daily_sales.sqlite"
+SCHEMA_VERSION = 1
+DEFAULT_RESULT_CACHE = 1024
+LOAD_BATCH_ROWS = 50_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sales (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    product_name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    units_sold INTEGER NOT NULL,
+    unit_price REAL NOT NULL,
+    total_revenue REAL NOT NULL,
+    region TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sales_date ON sales (date);
+CREATE INDEX IF NOT EXISTS sales_category ON sales (category, date);
+CREATE INDEX IF NOT EXISTS sales_region ON sales (region, date);
+CREATE INDEX IF NOT EXISTS sales_product ON sales (product_id, date);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+COLUMNS = [
+    "date", "product_id", "product_name", "category",
+    "units_sold", "unit_price", "total_revenue", "region",
+]
+
+# Whitelisted plan vocabulary -> SQL
+MEASURES = {
+    "total_revenue": "total_revenue",
+    "units_sold": "units_sold",
+    "unit_price": "unit_price",
+    "rows": "1",
+}
+AGGREGATES = {"sum": "SUM", "avg": "AVG", "min": "MIN", "max": "MAX", "count": "COUNT"}
+GROUP_KEYS = {
+    "date": "date",
+    "month": "substr(date, 1, 7)",
+    "category": "category",
+    "region": "region",
+    "product_id": "product_id",
+    "product_name": "product_name",
+}
+
+
+@dataclass
+class SalesQuery:
+    """A validated aggregate query over the sales table.
+
+    Without ``group_by`` the result is a single value; otherwise one row per
+    group, ordered by the value (``order``) and cut to ``limit`` rows.
+    """
+
+    measure: str = "total_revenue"
+    aggregate: str = "sum"
+    start: date | None = None
+    end: date | None = None
+    categories: list[str] | None = None
+    regions: list[str] | None = None
+    product_ids: list[str] | None = None
+    group_by: list[str] = field(default_factory=list)
+    order: str = "desc"
+    limit: int | None = None
+
+    def compile(self) -> tuple[str, tuple]:
+        """SQL text and bound parameters; raises ValueError on unknown names."""
+        if self.measure not in MEASURES:
+            raise ValueError(f"Unknown measure {self.measure!r}; expected one of {list(MEASURES)}")
+        if self.aggregate not in AGGREGATES:
+            raise ValueError(
+                f"Unknown aggregate {self.aggregate!r}; expected one of {list(AGGREGATES)}"
+            )
+        for key in self.group_by:
+            if key not in GROUP_KEYS:
+                raise ValueError(f"Unknown group key {key!r}; expected one of {list(GROUP_KEYS)}")
+        if self.order not in ("asc", "desc"):
+            raise ValueError(f"Unknown order {self.order!r}; expected 'asc' or 'desc'")
+
+        value = f"{AGGREGATES[self.aggregate]}({MEASURES[self.measure]})"
+        conditions, params = [], []
+        if self.start is not None:
+            conditions.append("date >= ?")
+            params.append(self.start.isoformat())
+        if self.end is not None:
+            conditions.append("date <= ?")
+            params.append(self.end.isoformat())
+        for column, values in (
+            ("category", self.categories),
+            ("region", self.regions),
+            ("product_id", self.product_ids),
+        ):
+            if values is not None:
+                conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+
+        keys = [GROUP_KEYS[key] for key in self.group_by]
+        sql = f"SELECT {', '.join(keys + [value])} FROM sales"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if keys:
+            sql += f" GROUP BY {', '.join(keys)} ORDER BY {value} {self.order.upper()}"
+        if self.limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(self.limit))
+        return sql, tuple(params)
+
+
+def _head_hash(
+    csv_path: Path,
+    end_offset: int,
+) -> str:
+    with open(csv_path, "rb") as f:
+        return hashlib.sha1(f.read(min(HEAD_BYTES, end_offset))).hexdigest()
+
+
+class SalesDatabase:
+    """SQLite copy of the sales CSV answering SalesQuery plans."""
+
+    def __init__(
+        self,
+        db_path: Path = DB_PATH,
+        csv_path: Path = CSV_PATH,
+        result_cache: int = DEFAULT_RESULT_CACHE,
+    ) -> None:
+        self.db_path = db_path
+        self.csv_path = csv_path
+        self.results = LRUCache(result_cache)
+        self._lock = threading.Lock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA mmap_size=268435456")
+        self._db.execute("PRAGMA cache_size=-65536")
+        self._db.executescript(_SCHEMA)
+        self._vocabulary: dict[str, list[str]] | None = None
+
+    @classmethod
+    def open(
+        cls,
+        db_path: Path = DB_PATH,
+        csv_path: Path = CSV_PATH,
+    ) -> "SalesDatabase":
+        """Open the database and bring it up to date with the CSV."""
+        database = cls(db_path, csv_path)
+        database.refresh()
+        return database
+
+    def _meta(
+        self,
+        key: str,
+    ) -> str | None:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def refresh(self) -> int:
+        """Load rows appended to the CSV since the last refresh; return how many.
+
+        The table is reloaded from scratch when the CSV was rewritten (its
+        head changed or it shrank) or the schema version changed.
+        """
+        size = self.csv_path.stat().st_size
+        with self._lock:
+            offset = int(self._meta("end_offset") or 0)
+            if (
+                self._meta("schema_version") != str(SCHEMA_VERSION)
+                or offset > size
+                or (offset and self._meta("head_hash") != _head_hash(self.csv_path, offset))
+            ):
+                with self._db:
+                    self._db.execute("DELETE FROM sales")
+                offset = 0
+            if offset == size:
+                return 0
+
+            with open(self.csv_path, "rb") as f:
+                if offset == 0:
+                    header = f.readline()
+                    if next(csv.reader([header.decode("utf-8")])) != COLUMNS:
+                        raise ValueError(f"{self.csv_path} does not have columns {COLUMNS}")
+                    offset = len(header)
+                f.seek(offset)
+                tail = f.read(size - offset)
+            # Only load complete lines; a partial last line waits for the next refresh
+            tail = tail[:tail.rfind(b"\n") + 1]
+
+            loaded = 0
+            with span("sales_sql.load"), self._db:
+                reader = csv.reader(io.StringIO(tail.decode("utf-8")))
+                while True:
+                    batch = [row for _, row in zip(range(LOAD_BATCH_ROWS), reader) if row]
+                    if not batch:
+                        break
+                    self._db.executemany(
+                        f"INSERT INTO sales ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        batch,
+                    )
+                    loaded += len(batch)
+                end_offset = offset + len(tail)
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    [
+                        ("schema_version", str(SCHEMA_VERSION)),
+                        ("end_offset", str(end_offset)),
+                        ("head_hash", _head_hash(self.csv_path, end_offset)),
+                    ],
+                )
+            self._db.execute("ANALYZE")
+            self.results = LRUCache(self.results.max_size)
+            self._vocabulary = None
+            count("rows_loaded", loaded)
+            return loaded
+
+    def execute(
+        self,
+        plan: SalesQuery,
+    ) -> float | list[tuple]:
+        """Run a plan: a single value, or (group labels..., value) rows."""
+        sql, params = plan.compile()
+        key = (sql, params)
+        cached = self.results.get(key)
+        if cached is not None:
+            return cached
+        with span("sales_sql.query"), self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        result = (rows[0][0] or 0.0) if not plan.group_by else [tuple(row) for row in rows]
+        self.results.put(key, result)
+        return result
+
+    def explain(
+        self,
+        plan: SalesQuery,
+    ) -> list[str]:
+        """SQLite's query plan for ``plan``, to check which index is used."""
+        sql, params = plan.compile()
+        with self._lock:
+            return [row[-1] for row in self._db.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+    def vocabulary(self) -> dict[str, list[str]]:
+        """Distinct categories and regions, for question parsing.
+
+        ``product_name`` and ``product_id`` are parallel lists of the
+        distinct (name, id) pairs, so a name sold under two ids appears twice.
+        """
+        if self._vocabulary is None:
+            with self._lock:
+                self._vocabulary = {
+                    column: [row[0] for row in self._db.execute(
+                        f"SELECT DISTINCT {column} FROM sales ORDER BY {column}"
+                    )]
+                    for column in ("category", "region")
+                }
+                pairs = self._db.execute(
+                    "SELECT DISTINCT product_name, product_id FROM sales "
+                    "ORDER BY product_name, product_id"
+                ).fetchall()
+                self._vocabulary["product_name"] = [name for name, _ in pairs]
+                self._vocabulary["product_id"] = [product_id for _, product_id in pairs]
+                row = self._db.execute("SELECT MIN(date), MAX(date) FROM sales").fetchone()
+                self._vocabulary["dates"] = list(row)
+        return self._vocabulary
+
+    def answer(
+        self,
+        question: str,
+    ) -> str:
+        """Plan, run and describe a sales question as context text."""
+        plan = plan_question(question, self.vocabulary())
+        return describe_result(plan, self.execute(plan))
+
+    def close(self) -> None:
+        self._db.close()
+
+
+_MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+_TOP_RE = re.compile(r"\b(?:top|best|bottom|worst)\s+(\d+)\b", re.IGNORECASE)
+_YEAR_RE = re.compile(r"\b(20\d\d)\b")
+# A month name counts only in a date context ("in May", "December 2024"),
+# so the verb in "which product may sell best" is not a filter
+_MONTH_NAMES = "|".join(_MONTHS)
+_MONTH_CONTEXT_RE = re.compile(
+    rf"\b(?:in|during|for|of|since|from|between|through|until)\s+(?:the\s+month\s+of\s+)?"
+    rf"({_MONTH_NAMES})\b|\b({_MONTH_NAMES})\s+(?:of\s+)?20\d\d\b"
+)
+_MONTH_RANGE_RE = re.compile(
+    rf"\b({_MONTH_NAMES})\s*(?:-|to|through|and|until)\s*({_MONTH_NAMES})\b"
+)
+
+
+def find_mentions(
+    question: str,
+    names: Sequence[str],
+) -> list[str]:
+    """Names from ``names`` that occur in ``question`` (case-insensitive)."""
+    lowered = question.lower()
+    found = []
+    for name in names:
+        # "Home & Kitchen" also matches "home and kitchen"
+        variants = {name.lower(), name.lower().replace("&", "and")}
+        if any(re.search(rf"\b{re.escape(variant)}\b", lowered) for variant in variants):
+            found.append(name)
+    return found
+
+
+def plan_question(
+    question: str,
+    vocabulary: dict[str, list[str]],
+) -> SalesQuery:
+    """Map a sales question onto a SalesQuery with simple keyword rules.
+
+    Recognized: the measure (revenue/sales, units/volume, price, number of
+    transactions), category, region and product names, a month or month
+    range in a date context ("in May", "from March to May", "December
+    2024") with an optional year, "by X"/"which X"/"per X" grouping, and superlatives or
+    "top N" for ordering and limits.
+    """
+    lowered = question.lower()
+    plan = SalesQuery()
+
+    if re.search(r"\b(units?|volume|quantity|how many)\b", lowered):
+        plan.measure = "units_sold"
+    if re.search(r"\b(price|priced|cost)\b", lowered):
+        plan.measure, plan.aggregate = "unit_price", "avg"
+    elif re.search(r"\b(average|mean)\b", lowered):
+        plan.aggregate = "avg"
+    if re.search(r"\b(transactions|orders|records|rows)\b", lowered):
+        plan.measure, plan.aggregate = "rows", "count"
+
+    plan.categories = find_mentions(question, vocabulary["category"]) or None
+    plan.regions = find_mentions(question, vocabulary["region"]) or None
+    names = set(find_mentions(question, vocabulary["product_name"]))
+    if names:
+        plan.product_ids = [
+            product_id
+            for name, product_id in zip(vocabulary["product_name"], vocabulary["product_id"])
+            if name in names
+        ]
+
+    months = {
+        _MONTHS[match.group(1) or match.group(2)] for match in _MONTH_CONTEXT_RE.finditer(lowered)
+    }
+    for match in _MONTH_RANGE_RE.finditer(lowered):
+        if _MONTHS[match.group(1)] in months:
+            months.add(_MONTHS[match.group(2)])
+    if months:
+        last_date = vocabulary["dates"][1]
+        years = [int(year) for year in _YEAR_RE.findall(question)]
+        year = years[0] if years else int(last_date[:4]) if last_date else date.today().year
+        first, last = min(months), max(months)
+        plan.start = date(year, first, 1)
+        plan.end = date(year, last, calendar.monthrange(year, last)[1])
+
+    for key, pattern in (
+        ("region", r"\bregions?\b"),
+        ("category", r"\bcategor(?:y|ies)\b"),
+        ("product_name", r"\bproducts?\b"),
+        ("month", r"\b(month|monthly)\b"),
+        ("date", r"\b(day|daily|date)\b"),
+    ):
+        if re.search(rf"\b(which|what|by|per|each|top|best|worst|every)\b[^?.]*{pattern}", lowered):
+            # "for the Electronics category" filters rather than groups
+            filtered = {
+                "region": plan.regions,
+                "category": plan.categories,
+                "product_name": plan.product_ids,
+            }.get(key)
+            if filtered is not None and len(filtered) == 1:
+                continue
+            plan.group_by = [key]
+            break
+
+    top = _TOP_RE.search(question)
+    superlative = re.search(r"\b(highest|most|best|top|largest|biggest)\b", lowered)
+    lowest = re.search(r"\b(lowest|least|worst|fewest|smallest|bottom)\b", lowered)
+    if plan.group_by:
+        if lowest:
+            plan.order = "asc"
+        if top:
+            plan.limit = int(top.group(1))
+        elif superlative or lowest:
+            plan.limit = 1 if re.search(r"\bwhich\b", lowered) else 5
+    return plan
+
+
+def describe_result(
+    plan: SalesQuery,
+    result: float | list[tuple],
+) -> str:
+    """Render a plan and its result as compact context text."""
+    filters = []
+    if plan.start or plan.end:
+        filters.append(f"{plan.start or '...'} to {plan.end or '...'}")
+    for label, values in (
+        ("category", plan.categories), ("region", plan.regions), ("product", plan.product_ids)
+    ):
+        if values:
+            filters.append(f"{label} in {', '.join(values)}")
+    measure = f"{plan.aggregate} of {plan.measure}"
+    scope = f" ({'; '.join(filters)})" if filters else ""
+
+    def number(value: float) -> str:
+        if plan.measure == "units_sold" and plan.aggregate == "sum" or plan.aggregate == "count":
+            return f"{value:,.0f}"
+        return f"{value:,.2f}"
+
+    if not plan.group_by:
+        return f"{measure}{scope}: {number(result)}"
+    lines = [f"{measure} by {', '.join(plan.group_by)}{scope}:"]
+    if not result:
+        return lines[0] + " no rows"
+    lines += [f"  {' / '.join(map(str, row[:-1]))}: {number(row[-1] or 0)}" for row in result]
+    return "\n".join(lines)
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="SQLite query engine over the sales CSV")
+    parser.add_argument("question", nargs="?", help="Sales question to answer")
+    parser.add_argument("--csv", type=Path, default=CSV_PATH)
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--explain", action="store_true", help="Print the plan and SQL")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Build or refresh the database and optionally answer a question."""
+    args = _parse_args()
+    database = SalesDatabase(args.db, args.csv)
+    loaded = database.refresh()
+    print(f"Loaded {loaded} new rows into {args.db}")
+    if args.question:
+        with tracer.request("sales_sql", question=args.question):
+            plan = plan_question(args.question, database.vocabulary())
+            if args.explain:
+                print(plan)
+                print(plan.compile())
+                print("\n".join(database.explain(plan)))
+            print(describe_result(plan, database.execute(plan)))
+    database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""
+Per-stage tracing and profiling for the retrieval pipeline.
+
+When an answer is slow, spans show where the time went (routing, CSV
+aggregation, embedding, FAISS, re-ranking, the LLM call) and counters show
+how much work each request did (bytes read, rows scanned, chunks scored,
+tokens sent).
+
+- ``span(name)`` is a context manager timing a stage with the monotonic
+  ``perf_counter`` clock; ``record`` adds a duration measured elsewhere
+- ``count(name, value)`` adds to a counter
+- ``tracer.request(name)`` groups spans and counters of one request; with
+  ``profile`` set the request also runs under cProfile
+- finished requests are appended as one JSON line each to ``path``;
+  ``tracer.stats()`` (or ``serve_stats``) gives in-process aggregates
+
+Tracing is off by default, and then ``span`` returns a shared no-op context
+manager and ``count`` returns at once. Set ``ADVANCED_RAG_TRACE`` to a
+JSONL path (or ``1`` for in-process stats only) to enable it at import, and
+``ADVANCED_RAG_PROFILE=1`` to profile every request.
+
+Spans and counters attach to the current request through a context
+variable, so they follow asyncio tasks; MultiSourceExecutor copies the
+context into its worker threads.
+
+Example::
+
+    configure(enabled=True, path=Path("traces.jsonl"))
+    with tracer.request("part2", question=question):
+        with span("routing"):
+            decision = router.route(question)
+        count("tokens_sent", 1200)
+    print(tracer.stats()["spans"]["routing"])
+"""
+
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+
+
+DEFAULT_HISTORY = 4096
+PROFILE_TOP = 25
+
+
+class _Trace:
+    """Spans and counters of one request."""
+
+    __slots__ = ("request_id", "name", "attrs", "timestamp", "start", "spans", "counters", "lock")
+
+    def __init__(
+        self,
+        request_id: str,
+        name: str,
+        attrs: dict,
+    ) -> None:
+        self.request_id = request_id
+        self.name = name
+        self.attrs = attrs
+        self.timestamp = time.time()
+        self.start = time.perf_counter()
+        self.spans: list[dict] = []
+        self.counters: dict[str, float] = {}
+        self.lock = threading.Lock()
+
+
+_current_trace: contextvars.ContextVar[_Trace | None] = contextvars.ContextVar(
+    "advanced_rag_trace", default=None
+)
+
+
+class _NoopSpan:
+    """Returned by ``span`` while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "attrs", "start")
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        attrs: dict,
+    ) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer._finish(self.name, self.start, end - self.start, self.attrs)
+
+
+class Tracer:
+    """Collects spans and counters; exports per-request JSONL and aggregates."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        path: Path | None = None,
+        profile: bool = False,
+        profile_dir: Path | None = None,
+        history: int = DEFAULT_HISTORY,
+    ) -> None:
+        self.enabled = enabled
+        self.path = path
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self.history = history
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop aggregated statistics."""
+        with self._lock:
+            self._durations: dict[str, deque] = {}
+            self._span_totals: dict[str, list[float]] = {}
+            self._counters: dict[str, float] = {}
+            self._requests = 0
+
+    def span(
+        self,
+        name: str,
+        **attrs,
+    ) -> _Span | _NoopSpan:
+        """Context manager timing the stage ``name``."""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name, attrs)
+
+    def record(
+        self,
+        name: str,
+        seconds: float,
+        **attrs,
+    ) -> None:
+        """Add a span whose duration was measured by the caller."""
+        if self.enabled:
+            self._finish(name, time.perf_counter() - seconds, seconds, attrs)
+
+    def count(
+        self,
+        name: str,
+        value: float = 1,
+    ) -> None:
+        """Add ``value`` to counter ``name``."""
+        if not self.enabled:
+            return
+        trace = _current_trace.get()
+        if trace is not None:
+            with trace.lock:
+                trace.counters[name] = trace.counters.get(name, 0) + value
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def _finish(
+        self,
+        name: str,
+        start: float,
+        duration: float,
+        attrs: dict,
+    ) -> None:
+        trace = _current_trace.get()
+        if trace is not None:
+            entry = {
+                "name": name,
+                "start_ms": round((start - trace.start) * 1000, 3),
+                "ms": round(duration * 1000, 3),
+            }
+            if attrs:
+                entry["attrs"] = attrs
+            with trace.lock:
+                trace.spans.append(entry)
+        with self._lock:
+            durations = self._durations.get(name)
+            if durations is None:
+                durations = self._durations[name] = deque(maxlen=self.history)
+                self._span_totals[name] = [0, 0.0]
+            durations.append(duration)
+            totals = self._span_totals[name]
+            totals[0] += 1
+            totals[1] += duration
+
+    @contextmanager
+    def request(
+        self,
+        name: str = "request",
+        request_id: str | None = None,
+        **attrs,
+    ) -> Iterator[_Trace | None]:
+        """Trace one request; yields None while tracing is disabled."""
+        if not self.enabled:
+            yield None
+            return
+        trace = _Trace(request_id or uuid.uuid4().hex[:16], name, attrs)
+        token = _current_trace.set(trace)
+        profiler = cProfile.Profile() if self.profile else None
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield trace
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            _current_trace.reset(token)
+            duration = time.perf_counter() - trace.start
+            self._finish(name, trace.start, duration, {})
+            with self._lock:
+                self._requests += 1
+            self._export(trace, duration, profiler)
+
+    def _export(
+        self,
+        trace: _Trace,
+        duration: float,
+        profiler: cProfile.Profile | None,
+    ) -> None:
+        """Append the request as one JSON line and save its profile."""
+        record = {
+            "request_id": trace.request_id,
+            "name": trace.name,
+            "timestamp": trace.timestamp,
+            "ms": round(duration * 1000, 3),
+            "attrs": trace.attrs,
+            "spans": trace.spans,
+            "counters": trace.counters,
+        }
+        if profiler is not None:
+            stream = io.StringIO()
+            stats = pstats.Stats(profiler, stream=stream)
+            stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+            record["profile"] = stream.getvalue()
+            if self.profile_dir is not None:
+                self.profile_dir.mkdir(parents=True, exist_ok=True)
+                stats.dump_stats(self.profile_dir / f"{trace.request_id}.prof")
+        if self.path is None:
+            return
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line)
+
+    def stats(self) -> dict:
+        """Span latency percentiles (recent history) and counter totals."""
+        with self._lock:
+            spans = {}
+            for name, durations in self._durations.items():
+                count, total = self._span_totals[name]
+                ms = np.asarray(durations) * 1000
+                spans[name] = {
+                    "count": count,
+                    "total_ms": round(total * 1000, 3),
+                    "mean_ms": round(total * 1000 / count, 3),
+                    "p50_ms": round(float(np.percentile(ms, 50)), 3),
+                    "p95_ms": round(float(np.percentile(ms, 95)), 3),
+                    "p99_ms": round(float(np.percentile(ms, 99)), 3),
+                }
+            return {
+                "requests": self._requests,
+                "spans": spans,
+                "counters": dict(self._counters),
+            }
+
+
+def _from_environment() -> Tracer:
+    setting = os.environ.get("ADVANCED_RAG_TRACE", "")
+    enabled = setting not in ("", "0")
+    return Tracer(
+        enabled=enabled,
+        path=Path(setting) if enabled and setting != "1" else None,
+        profile=os.environ.get("ADVANCED_RAG_PROFILE", "") not in ("", "0"),
+    )
+
+
+tracer = _from_environment()
+
+
+def configure(
+    enabled: bool = True,
+    path: Path | None = None,
+    profile: bool = False,
+    profile_dir: Path | None = None,
+) -> Tracer:
+    """Reconfigure the shared tracer in place and return it."""
+    tracer.enabled = enabled
+    tracer.path = path
+    tracer.profile = profile
+    tracer.profile_dir = profile_dir
+    return tracer
+
+
+def span(
+    name: str,
+    **attrs,
+) -> _Span | _NoopSpan:
+    """Time the stage ``name`` on the shared tracer."""
+    if not tracer.enabled:
+        return _NOOP_SPAN
+    return _Span(tracer, name, attrs)
+
+
+def count(
+    name: str,
+    value: float = 1,
+) -> None:
+    """Add to counter ``name`` on the shared tracer."""
+    if tracer.enabled:
+        tracer.count(name, value)
+
+
+def serve_stats(
+    port: int = 8765,
+    host: str = "127.0.0.1",
+) -> ThreadingHTTPServer:
+    """Serve ``tracer.stats()`` as JSON over HTTP from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            body = json.dumps(tracer.stats(), indent=2).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            return
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="trace-stats", daemon=True).start()
+    return server
@@ -0,0 +1,346 @@
+"""
+Configurable FAISS index types with exact re-ranking, and a recall-vs-latency
+report to choose between them.
+
+Index types over normalized embeddings (inner product = cosine):
+
+- ``flat``: exact float32 IndexFlatIP, 4 bytes per dimension
+- ``flat16``: float16 scalar quantizer, 2 bytes per dimension
+- ``sq8``: int8 scalar quantizer, 1 byte per dimension
+- ``ivfpq``: inverted lists with product quantization, ``m`` bytes per
+  vector; only ``nprobe`` lists are scanned per query. Corpora too small
+  to train the PQ codebooks get an ``sq8`` index instead
+
+For every type but ``flat``, RerankingIndex over-fetches
+``rerank_factor * k`` candidates and re-scores them exactly against the
+float32 embeddings memory-mapped from ``embeddings.npy``, so only the
+candidate rows are read from disk.
+
+Example::
+
+    index = RerankingIndex(
+        build_vector_index(embeddings, "ivfpq"),
+        np.load(index_dir / "embeddings.npy", mmap_mode="r"),
+    )
+    scores, ids = index.search(query_vectors, 10)
+
+Run as a script for a recall-vs-latency report over the product pages or a
+code repository:
+
+    python -m advanced_rag.vector_index --corpus product
+    python -m advanced_rag.vector_index --corpus code --repo mcp-gateway-registry
+"""
+
+import argparse
+import json
+import math
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+
+INDEX_TYPES = ("flat", "flat16", "sq8", "ivfpq")
+DEFAULT_INDEX_TYPE = "flat"
+DEFAULT_RERANK_FACTOR = 4
+DEFAULT_NPROBE = 8
+# FAISS warns below ~39 training points per centroid
+MIN_POINTS_PER_LIST = 39
+# Training points per centroid actually used; more adds time, not recall
+TRAIN_POINTS_PER_CENTROID = 64
+# Used for ivfpq requests on corpora too small to train it
+IVFPQ_FALLBACK_TYPE = "sq8"
+
+
+def _pq_subquantizers(
+    dimension: int
+) -> int:
+    """Largest divisor of ``dimension`` giving sub-vectors of at least 8 dims."""
+    for m in range(max(dimension // 8, 1), 0, -1):
+        if dimension % m == 0:
+            return m
+    return 1
+
+
+def built_index_type(
+    index_type: str,
+    count: int,
+    nbits: int = 8,
+) -> str:
+    """The index type build_vector_index builds for ``count`` vectors.
+
+    ``ivfpq`` needs ``MIN_POINTS_PER_LIST`` training points per PQ centroid;
+    smaller corpora get ``IVFPQ_FALLBACK_TYPE``.
+    """
+    if index_type == "ivfpq" and count < MIN_POINTS_PER_LIST * 2 ** nbits:
+        return IVFPQ_FALLBACK_TYPE
+    return index_type
+
+
+def build_vector_index(
+    embeddings: np.ndarray,
+    index_type: str = DEFAULT_INDEX_TYPE,
+    nlist: int | None = None,
+    m: int | None = None,
+    nbits: int = 8,
+    nprobe: int = DEFAULT_NPROBE,
+) -> faiss.Index:
+    """Build and fill an inner-product index of ``index_type``.
+
+    ``nlist`` defaults to about 4 * sqrt(n), limited so every list gets
+    enough training points. Training uses a random sample of the
+    embeddings. IVF-PQ only pays off on large corpora; see
+    built_index_type for the type used when the corpus is too small.
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    count, dimension = embeddings.shape
+    metric = faiss.METRIC_INNER_PRODUCT
+    index_type = built_index_type(index_type, count, nbits)
+
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dimension)
+    elif index_type == "flat16":
+        index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, metric)
+    elif index_type == "sq8":
+        index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit, metric)
+    elif index_type == "ivfpq":
+        nlist = nlist or int(4 * math.sqrt(count))
+        nlist = max(1, min(nlist, count // MIN_POINTS_PER_LIST))
+        quantizer = faiss.IndexFlatIP(dimension)
+        index = faiss.IndexIVFPQ(
+            quantizer, dimension, nlist, m or _pq_subquantizers(dimension), nbits, metric
+        )
+        index.nprobe = min(nprobe, nlist)
+    else:
+        raise ValueError(f"Unknown index type {index_type!r}; expected one of {INDEX_TYPES}")
+
+    if not index.is_trained:
+        centroids = max(getattr(index, "nlist", 1), 2 ** nbits)
+        sample_size = min(count, centroids * TRAIN_POINTS_PER_CENTROID)
+        sample = np.random.default_rng(0).choice(count, sample_size, replace=False)
+        index.train(embeddings[np.sort(sample)])
+    index.add(embeddings)
+    return index
+
+
+class RerankingIndex:
+    """A FAISS index whose candidates are re-scored at full precision.
+
+    Exposes ``search(queries, k) -> (scores, ids)`` like a FAISS index, so
+    it can stand in for ``ProductIndex.faiss_index``.
+    """
+
+    def __init__(
+        self,
+        index: faiss.Index,
+        embeddings: np.ndarray,
+        rerank_factor: int = DEFAULT_RERANK_FACTOR,
+    ) -> None:
+        self.index = index
+        self.embeddings = embeddings
+        self.rerank_factor = rerank_factor
+
+    @property
+    def ntotal(self) -> int:
+        return self.index.ntotal
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Top-k (scores, ids) per query; missing results have id -1."""
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        fetch = min(max(k * self.rerank_factor, k), self.index.ntotal)
+        _, candidates = self.index.search(queries, fetch)
+
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        for row, (query, found) in enumerate(zip(queries, candidates)):
+            found = found[found >= 0]
+            if not len(found):
+                continue
+            # Sorted row ids keep memory-mapped reads sequential
+            found = np.sort(found)
+            exact = np.asarray(self.embeddings[found], dtype=np.float32) @ query
+            top = np.argsort(-exact, kind="stable")[:k]
+            scores[row, :len(top)] = exact[top]
+            ids[row, :len(top)] = found[top]
+        return scores, ids
+
+
+def load_vector_index(
+    index: faiss.Index,
+    embeddings_path: Path,
+    index_type: str,
+    rerank_factor: int = DEFAULT_RERANK_FACTOR,
+) -> faiss.Index | RerankingIndex:
+    """Wrap a loaded index for re-ranking unless it is already exact."""
+    if index_type == "flat":
+        return index
+    return RerankingIndex(index, np.load(embeddings_path, mmap_mode="r"), rerank_factor)
+
+
+@dataclass
+class BenchmarkRow:
+    """Recall and latency of one index configuration."""
+
+    index_type: str
+    nprobe: int | None
+    rerank_factor: int | None
+    build_seconds: float
+    index_bytes: int
+    recall_at_k: float
+    p50_ms: float
+    p95_ms: float
+
+
+def _synthetic_queries(
+    embeddings: np.ndarray,
+    count: int,
+    seed: int,
+) -> np.ndarray:
+    """Normalized midpoints of random chunk pairs, so queries are not corpus rows."""
+    rng = np.random.default_rng(seed)
+    pairs = rng.integers(0, len(embeddings), size=(count, 2))
+    queries = embeddings[pairs[:, 0]] + embeddings[pairs[:, 1]]
+    norms = np.linalg.norm(queries, axis=1, keepdims=True)
+    return (queries / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def _time_queries(
+    index,
+    queries: np.ndarray,
+    k: int,
+) -> tuple[np.ndarray, list[float]]:
+    """Run queries one at a time; return ids and per-query milliseconds."""
+    ids, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        _, found = index.search(query[None, :], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ids.append(found[0])
+    return np.array(ids), latencies
+
+
+def benchmark_index_types(
+    embeddings: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    nprobes: tuple[int, ...] = (1, 4, 16, 64),
+    rerank_factors: tuple[int, ...] = (1, 4, 16),
+) -> list[BenchmarkRow]:
+    """Recall@k against exact search and single-query latency per configuration.
+
+    ``embeddings`` may be a memory map; it is used as the re-rank store.
+    Rows are labelled with the index type actually built, so ``ivfpq`` is
+    missing from the report when the corpus is too small to train it.
+    """
+    exact = build_vector_index(embeddings, "flat")
+    truth, _ = _time_queries(exact, queries, k)
+
+    rows = []
+    for index_type in dict.fromkeys(
+        built_index_type(index_type, len(embeddings)) for index_type in INDEX_TYPES
+    ):
+        start = time.perf_counter()
+        index = build_vector_index(embeddings, index_type)
+        build_seconds = time.perf_counter() - start
+        index_bytes = len(faiss.serialize_index(index))
+
+        nprobe_options = (
+            [n for n in nprobes if n <= index.nlist] or [index.nlist]
+            if index_type == "ivfpq" else [None]
+        )
+        factor_options = rerank_factors if index_type != "flat" else (None,)
+        for nprobe in nprobe_options:
+            if nprobe is not None:
+                index.nprobe = nprobe
+            for factor in factor_options:
+                searcher = index if factor is None else RerankingIndex(index, embeddings, factor)
+                found, latencies = _time_queries(searcher, queries, k)
+                recall = np.mean([
+                    len(set(f[f >= 0]) & set(t)) / k for f, t in zip(found, truth)
+                ])
+                rows.append(BenchmarkRow(
+                    index_type=index_type,
+                    nprobe=nprobe,
+                    rerank_factor=factor,
+                    build_seconds=round(build_seconds, 3),
+                    index_bytes=index_bytes,
+                    recall_at_k=round(float(recall), 4),
+                    p50_ms=round(float(np.percentile(latencies, 50)), 3),
+                    p95_ms=round(float(np.percentile(latencies, 95)), 3),
+                ))
+    return rows
+
+
+def format_report(
+    rows: list[BenchmarkRow],
+    k: int,
+) -> str:
+    """Render benchmark rows as a fixed-width table."""
+    lines = [
+        f"{'type':<8}{'nprobe':>8}{'rerank':>8}{'MiB':>9}{'build s':>9}"
+        f"{f'recall@{k}':>11}{'p50 ms':>9}{'p95 ms':>9}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row.index_type:<8}{row.nprobe or '-':>8}{row.rerank_factor or '-':>8}"
+            f"{row.index_bytes / 2**20:>9.2f}{row.build_seconds:>9.3f}"
+            f"{row.recall_at_k:>11.4f}{row.p50_ms:>9.3f}{row.p95_ms:>9.3f}"
+        )
+    return "\n".join(lines)
+
+
+def _corpus_embeddings(
+    args: argparse.Namespace
+) -> np.ndarray:
+    """Embeddings of the chosen corpus, memory-mapped where already stored."""
+    if args.corpus == "product":
+        from advanced_rag.product_index import EMBEDDINGS_FILE, load_product_index
+
+        index = load_product_index()
+        return np.load(index.index_dir / EMBEDDINGS_FILE, mmap_mode="r")
+
+    from advanced_rag.code_chunker import chunk_repository
+    from advanced_rag.embedding_cache import CachedEncoder
+    from advanced_rag.product_index import DEFAULT_MODEL
+
+    if args.repo is None:
+        raise SystemExit("--repo is required for --corpus code")
+    chunks = chunk_repository(args.repo)
+    return CachedEncoder(DEFAULT_MODEL).encode(
+        [chunk.text for chunk in chunks], normalize_embeddings=True
+    )
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Vector index recall-vs-latency report")
+    parser.add_argument("--corpus", choices=["product", "code"], default="product")
+    parser.add_argument("--repo", type=Path, default=None, help="Repository for --corpus code")
+    parser.add_argument("--queries", type=int, default=200, help="Number of synthetic queries")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="Write rows as JSON")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Print the recall-vs-latency table for one corpus."""
+    args = _parse_args()
+    embeddings = _corpus_embeddings(args)
+    queries = _synthetic_queries(np.asarray(embeddings), args.queries, args.seed)
+    rows = benchmark_index_types(embeddings, queries, args.k)
+    print(f"{args.corpus}: {len(embeddings)} vectors x {embeddings.shape[1]} dims")
+    print(format_report(rows, args.k))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump([asdict(row) for row in rows], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from advanced_rag.answer_cache import AnswerCache  # noqa: E402
+
+
+class KeywordEncoder:
+    """Embeds a question by which of a few keywords it mentions."""
+
+    KEYWORDS = ("region", "product", "month", "sales")
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.release.set()
+        self.entered = threading.Event()
+
+    def encode(self, texts, **kwargs) -> np.ndarray:
+        self.entered.set()
+        self.release.wait(5)
+        vectors = np.array([
+            [float(keyword in text.lower()) for keyword in self.KEYWORDS] + [0.1]
+            for text in texts
+        ])
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_similar_question_hits_only_with_same_context(tmp_path):
+    cache = AnswerCache(tmp_path / "answers.sqlite", KeywordEncoder())
+    cache.put("Which region has the most sales?", "ctx", "North")
+
+    hit = cache.get("which REGION sells the most sales", "ctx")
+    assert hit is not None and hit.answer == "North"
+    assert cache.get("which region sells the most sales", "other") is None
+
+
+def test_lookup_does_not_hold_lock_while_embedding(tmp_path):
+    encoder = KeywordEncoder()
+    cache = AnswerCache(tmp_path / "answers.sqlite", encoder)
+    cache.put("Top product by sales?", "ctx", "Earbuds")
+
+    encoder.release.clear()
+    encoder.entered.clear()
+    slow = threading.Thread(target=cache.get, args=("best month for sales", "ctx"))
+    slow.start()
+    try:
+        assert encoder.entered.wait(5)
+        # An exact lookup completes while the other get is still embedding
+        finished = threading.Event()
+        threading.Thread(
+            target=lambda: (cache.get("top product by sales?", "ctx"), finished.set()),
+            daemon=True,
+        ).start()
+        assert finished.wait(2)
+    finally:
+        encoder.release.set()
+        slow.join()
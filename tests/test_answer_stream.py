@@ -0,0 +1,144 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+litellm = pytest.importorskip("litellm")
+pytest.importorskip("sentence_transformers")
+
+from advanced_rag.answer_cache import CachedAnswer  # noqa: E402
+from advanced_rag.answer_stream import (  # noqa: E402
+    EVENT_CONTEXT,
+    EVENT_DONE,
+    EVENT_ERROR,
+    EVENT_SOURCE,
+    EVENT_TOKEN,
+    AnswerStreamer,
+)
+from advanced_rag.executor import STATUS_OK, SourceResult  # noqa: E402
+
+
+SLOW_DELAY = 0.4
+
+
+class FakeExecutor:
+    """A fast source and a slow one, streamed in completion order."""
+
+    sources = {"fast": None, "slow": None}
+
+    def __init__(self) -> None:
+        self.slow_finished: float | None = None
+
+    async def stream(self, query, sources):
+        start = time.perf_counter()
+        yield SourceResult("fast", STATUS_OK, "North 1,200 units", 0.0)
+        await asyncio.sleep(SLOW_DELAY)
+        self.slow_finished = time.perf_counter()
+        yield SourceResult("slow", STATUS_OK, "Air fryer reviews", time.perf_counter() - start)
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def fake_completion(pieces, fail_after=None):
+    calls = []
+
+    async def acompletion(**kwargs):
+        calls.append(kwargs)
+
+        async def generate():
+            for number, piece in enumerate(pieces):
+                if number == fail_after:
+                    raise RuntimeError("connection reset")
+                await asyncio.sleep(0.01)
+                yield chunk(piece)
+
+        return generate()
+
+    return acompletion, calls
+
+
+class FakeCache:
+    def __init__(self, answer=None) -> None:
+        self.answer = answer
+        self.stored = []
+
+    def get(self, query, digest, model):
+        return self.answer and CachedAnswer(self.answer, query, 1.0, 0.0)
+
+    def put(self, query, digest, answer, model):
+        self.stored.append(answer)
+
+
+def run(streamer, query="Which region sells the most?"):
+    start = time.perf_counter()
+    events = list(streamer.stream(query, route="both"))
+    return start, events
+
+
+def test_generation_starts_after_grace_and_reports_late_source(monkeypatch):
+    acompletion, calls = fake_completion(["North ", "sells ", "most."])
+    monkeypatch.setattr(litellm, "acompletion", acompletion)
+    executor = FakeExecutor()
+    cache = FakeCache()
+    streamer = AnswerStreamer(executor, grace=0.05, cache=cache)
+
+    start, events = run(streamer)
+    kinds = [event.kind for event in events]
+    assert kinds == [
+        EVENT_SOURCE, EVENT_CONTEXT, EVENT_TOKEN, EVENT_TOKEN, EVENT_TOKEN,
+        EVENT_SOURCE, EVENT_DONE,
+    ]
+    fast, slow = events[0], events[5]
+    assert (fast.data.source, fast.late) == ("fast", False)
+    assert (slow.data.source, slow.late) == ("slow", True)
+    assert "Air fryer" not in events[1].data.text
+
+    summary = events[-1].data
+    assert summary.answer == "North sells most."
+    assert summary.sources == ["fast"]
+    assert summary.late_sources == ["slow"]
+    assert summary.time_to_first_token < executor.slow_finished - start
+    assert len(calls) == 1 and calls[0]["stream"] is True
+    assert cache.stored == ["North sells most."]
+
+
+def test_cache_hit_skips_the_llm(monkeypatch):
+    acompletion, calls = fake_completion(["unused"])
+    monkeypatch.setattr(litellm, "acompletion", acompletion)
+    streamer = AnswerStreamer(FakeExecutor(), grace=0.05, cache=FakeCache("North."))
+
+    _, events = run(streamer)
+    tokens = [event.data for event in events if event.kind == EVENT_TOKEN]
+    summary = events[-1].data
+    assert tokens == ["North."]
+    assert summary.cached and summary.answer == "North."
+    assert summary.time_to_first_token is not None
+    assert calls == []
+
+
+def test_generation_error_keeps_partial_answer(monkeypatch):
+    acompletion, _ = fake_completion(["North ", "sells ", "most."], fail_after=2)
+    monkeypatch.setattr(litellm, "acompletion", acompletion)
+    cache = FakeCache()
+    streamer = AnswerStreamer(FakeExecutor(), grace=0.05, cache=cache)
+
+    _, events = run(streamer)
+    errors = [event for event in events if event.kind == EVENT_ERROR]
+    summary = events[-1].data
+    assert events[-1].kind == EVENT_DONE
+    assert len(errors) == 1 and "connection reset" in errors[0].data
+    assert summary.answer == "North sells "
+    assert cache.stored == []
+
+
+def test_closing_the_stream_early_stops_cleanly(monkeypatch):
+    acompletion, _ = fake_completion(["North ", "sells ", "most."])
+    monkeypatch.setattr(litellm, "acompletion", acompletion)
+    streamer = AnswerStreamer(FakeExecutor(), grace=0.05)
+
+    events = streamer.stream("Which region sells the most?", route="both")
+    assert next(events).kind == EVENT_SOURCE
+    events.close()
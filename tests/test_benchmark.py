@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip("litellm")
+pytest.importorskip("sentence_transformers")
+
+from advanced_rag.benchmark import (  # noqa: E402
+    PART2_QUESTIONS,
+    PREFIXES,
+    QueryTiming,
+    compare_results,
+    question_variants,
+    stage_report,
+)
+
+
+def test_question_variants_are_deterministic_per_seed():
+    first = question_variants(PART2_QUESTIONS, 24, seed=3)
+    assert first == question_variants(PART2_QUESTIONS, 24, seed=3)
+    assert first != question_variants(PART2_QUESTIONS, 24, seed=4)
+    assert len(first) == 24
+
+
+def test_question_variants_reword_questions_in_turn():
+    variants = question_variants(PART2_QUESTIONS, 2 * len(PART2_QUESTIONS), seed=1)
+    for i, variant in enumerate(variants):
+        base = PART2_QUESTIONS[i % len(PART2_QUESTIONS)].lower()
+        stripped = variant.lower()
+        for prefix in PREFIXES:
+            if prefix and stripped.startswith(prefix.lower()):
+                stripped = stripped[len(prefix):]
+        # Substitutions only swap entities, never the opening words
+        assert stripped.split()[:2] == base.split()[:2]
+
+
+def test_stage_report_skips_stages_a_query_did_not_run():
+    timings = [
+        QueryTiming("a", {"routing": 0.001, "generation": 0.010}),
+        QueryTiming("b", {"routing": 0.003, "retrieval": 0.002, "generation": 0.030}),
+    ]
+    report = stage_report(timings)
+
+    assert report["routing"]["count"] == 2
+    assert report["routing"]["mean_ms"] == 2.0
+    assert report["retrieval"]["count"] == 1
+    assert report["rerank"] == {"count": 0}
+    assert report["total"]["p50_ms"] == 23.0
+
+
+def test_compare_results_reports_change_per_stage():
+    previous = {
+        "parts": {
+            "part1": {"stages": {"routing": {"p50_ms": 2.0, "p95_ms": 4.0}}},
+        }
+    }
+    current = {
+        "parts": {
+            "part1": {
+                "stages": {
+                    "routing": {"p50_ms": 1.0, "p95_ms": 5.0},
+                    "rerank": {"p50_ms": 3.0, "p95_ms": 3.0},
+                }
+            },
+            "part2": {"stages": {"routing": {"p50_ms": 1.0}}},
+        }
+    }
+    lines = compare_results(previous, current)
+
+    assert [line.split() for line in lines] == [
+        ["part1", "routing", "p50_ms", "2.000", "1.000", "-50.0%"],
+        ["part1", "routing", "p95_ms", "4.000", "5.000", "+25.0%"],
+    ]
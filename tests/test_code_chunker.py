@@ -0,0 +1,146 @@
+import pytest
+
+import advanced_rag.code_chunker as code_chunker
+from advanced_rag.code_chunker import chunk_files, chunk_repository, chunk_source
+
+
+PYTHON_SOURCE = '''"""Auth service."""
+import os
+from fastapi import (
+    APIRouter,
+)
+
+router = APIRouter()
+TIMEOUT = int(os.environ.get("TIMEOUT", "5"))
+
+
+# Validate a bearer token
+@router.get("/token")
+def validate_token(token):
+    return token == "ok"
+
+
+class Server:
+    name = "auth"
+
+    def start(self):
+        return True
+
+    # Stop accepting requests
+    def stop(self):
+        return False
+'''
+
+MARKDOWN_SOURCE = """Intro line
+
+# Setup
+Install it.
+```
+# not a heading
+```
+## Usage
+Run it.
+"""
+
+DOCKERFILE_SOURCE = """ARG PYTHON=3.11
+FROM python:${PYTHON} AS build
+RUN pip install .
+FROM nginx
+COPY --from=build /app /app
+"""
+
+
+def boundaries(chunks):
+    return [(c["symbol"], c["kind"], c["start_line"], c["end_line"]) for c in chunks]
+
+
+def test_python_chunks_follow_symbols():
+    header, chunks = chunk_source(PYTHON_SOURCE, "python")
+
+    assert header == "import os\nfrom fastapi import (\n    APIRouter,\n)"
+    assert boundaries(chunks) == [
+        ("<module>", "module", 1, 1),
+        ("<module>", "module", 7, 8),
+        ("validate_token", "function", 11, 14),
+        ("Server", "class", 17, 25),
+    ]
+    assert chunks[2]["body"].startswith("# Validate a bearer token\n@router.get")
+
+
+def test_long_class_is_split_per_method(monkeypatch):
+    monkeypatch.setattr(code_chunker, "MAX_SYMBOL_LINES", 5)
+    _, chunks = chunk_source(PYTHON_SOURCE, "python")
+
+    assert boundaries(chunks)[3:] == [
+        ("Server", "class", 17, 18),
+        ("Server.start", "method", 20, 21),
+        ("Server.stop", "method", 23, 25),
+    ]
+    assert chunks[-1]["body"].startswith("class Server:\n    ...\n    # Stop accepting")
+
+
+def test_python_syntax_error_falls_back_to_windows(monkeypatch):
+    monkeypatch.setattr(code_chunker, "WINDOW_LINES", 10)
+    source = "def broken(:\n" + "x = 1\n" * 24
+    header, chunks = chunk_source(source, "python")
+
+    assert header == ""
+    assert boundaries(chunks) == [
+        ("<window>", "window", 1, 10),
+        ("<window>", "window", 11, 20),
+        ("<window>", "window", 21, 25),
+    ]
+
+
+def test_markdown_splits_at_headings_outside_fences():
+    _, chunks = chunk_source(MARKDOWN_SOURCE, "markdown")
+    assert boundaries(chunks) == [
+        ("<preamble>", "section", 1, 1),
+        ("Setup", "section", 3, 7),
+        ("Usage", "section", 8, 9),
+    ]
+
+
+def test_dockerfile_splits_at_stages():
+    header, chunks = chunk_source(DOCKERFILE_SOURCE, "dockerfile")
+    assert header == "ARG PYTHON=3.11"
+    assert boundaries(chunks) == [("build", "stage", 2, 3), ("nginx", "stage", 4, 5)]
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    (root / "app").mkdir(parents=True)
+    (root / "app" / "auth.py").write_text(PYTHON_SOURCE)
+    (root / "README.md").write_text(MARKDOWN_SOURCE)
+    (root / "Dockerfile").write_text(DOCKERFILE_SOURCE)
+    return root
+
+
+def test_rerun_reads_chunks_from_cache(repo, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    first = chunk_repository(repo, cache_dir, workers=1)
+    assert [c.path for c in first] == ["Dockerfile"] * 2 + ["README.md"] * 3 + ["app/auth.py"] * 4
+    assert first[-1].header.startswith("import os")
+
+    def fail(source, language):
+        raise AssertionError("chunked an unchanged file")
+
+    monkeypatch.setattr(code_chunker, "chunk_source", fail)
+    assert chunk_repository(repo, cache_dir, workers=1) == first
+
+
+def test_changed_file_is_rechunked(repo, tmp_path):
+    cache_dir = tmp_path / "cache"
+    chunk_repository(repo, cache_dir, workers=1)
+    (repo / "app" / "auth.py").write_text(PYTHON_SOURCE + "\n\ndef health():\n    return 1\n")
+
+    chunks = chunk_repository(repo, cache_dir, workers=1)
+    assert [c.symbol for c in chunks if c.path == "app/auth.py"][-1] == "health"
+    assert len(list(cache_dir.glob("*/*.json"))) == 4
+
+
+def test_file_removed_after_listing_is_skipped(repo, tmp_path):
+    chunks = chunk_files(repo, ["README.md", "app/gone.py"], tmp_path / "cache", workers=1)
+    assert [c.symbol for c in chunks["README.md"]] == ["<preamble>", "Setup", "Usage"]
+    assert chunks["app/gone.py"] == []
@@ -0,0 +1,98 @@
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from advanced_rag import code_indexer
+from advanced_rag.code_indexer import IncrementalCodeIndexer
+from advanced_rag.code_search import build_postings, build_trigram_index, file_trigrams
+
+
+def write(repo: Path, files: dict[str, str]) -> None:
+    for name, text in files.items():
+        path = repo / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+def assert_matches_full_build(indexer: IncrementalCodeIndexer) -> None:
+    index = indexer.index()
+    expected = build_postings(
+        [file_trigrams((indexer.repo_dir / path).read_bytes()) for path in index.files]
+    )
+    for actual, wanted in zip((index.trigrams, index.offsets, index.postings), expected):
+        np.testing.assert_array_equal(actual, wanted)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    write(repo, {
+        "app.py": "def validate_token(token):\n    return token\n",
+        "auth/login.py": "from app import validate_token\n",
+        "auth.txt": "notes about auth\n",
+        "README.md": "# Registry\n",
+    })
+    return repo
+
+
+def test_updates_match_a_full_build(tmp_path, repo):
+    indexer = IncrementalCodeIndexer(repo, tmp_path / "index")
+    indexer.update()
+    assert_matches_full_build(indexer)
+
+    write(repo, {"auth/login.py": "def login(user):\n    return check_scope(user)\n"})
+    write(repo, {"auth/scopes.py": "def check_scope(user):\n    return True\n"})
+    (repo / "README.md").unlink()
+    changes = indexer.update()
+
+    assert changes.added == ["auth/scopes.py"]
+    assert changes.modified == ["auth/login.py"]
+    assert changes.removed == ["README.md"]
+    assert_matches_full_build(indexer)
+
+    write(repo, {"zz.py": "validate_token('x')\n", "app.py": "pass\n"})
+    indexer.update()
+    assert_matches_full_build(indexer)
+    assert sorted(match.path for match in indexer.index().search("validate_token")) == [
+        "zz.py"
+    ]
+
+
+def test_file_vanishing_mid_scan_is_skipped(tmp_path, repo, monkeypatch):
+    indexer = IncrementalCodeIndexer(repo, tmp_path / "index")
+    indexer.update()
+    write(repo, {"app.py": "changed\n"})
+
+    read_bytes = Path.read_bytes
+
+    def vanishing(path: Path) -> bytes:
+        if path.name == "app.py":
+            raise FileNotFoundError(path)
+        return read_bytes(path)
+
+    monkeypatch.setattr(Path, "read_bytes", vanishing)
+    changes = indexer.update()
+
+    assert changes.removed == ["app.py"]
+    assert "app.py" not in indexer.index().files
+
+
+def test_watch_survives_a_failed_update(tmp_path, repo, monkeypatch):
+    indexer = IncrementalCodeIndexer(repo, tmp_path / "index")
+    monkeypatch.setattr(code_indexer, "watchfiles", None)
+    monkeypatch.setattr(indexer, "update", lambda: 1 / 0)
+    stop = threading.Event()
+    stop.set()
+
+    indexer.watch(stop)
+
+
+def test_update_after_a_full_build(tmp_path, repo):
+    build_trigram_index(repo, tmp_path / "index")
+    indexer = IncrementalCodeIndexer(repo, tmp_path / "index")
+    write(repo, {"auth.txt": "rewritten notes\n"})
+    indexer.update()
+
+    assert_matches_full_build(indexer)
@@ -0,0 +1,106 @@
+import fnmatch
+import os
+import random
+import re
+
+import pytest
+
+from advanced_rag.code_search import (
+    SKIP_DIRS,
+    build_trigram_index,
+    load_trigram_index,
+)
+
+
+WORDS = [
+    "def", "validate_token", "router", "get", "post", "Server", "import",
+    "token", "return", "async", "self", "config", "yield", "@router.get(",
+    "scope", "HEALTH", "health_check", "(", ")", ":", "=",
+]
+
+PATTERNS = [
+    ("validate_token", False),
+    ("@router.get(", False),
+    ("health", False),
+    ("ab", False),
+    (r"@router\.(get|post)\(", True),
+    (r"^def \w+", True),
+    (r"token\s*=\s*\w+", True),
+    (r"(Server|scope).*return", True),
+    (r"x?y?", True),
+    (r"\d{3}", True),
+]
+
+
+@pytest.fixture(scope="module")
+def repo(tmp_path_factory):
+    root = tmp_path_factory.mktemp("repo")
+    rng = random.Random(7)
+    for number in range(40):
+        directory = root / rng.choice(["app", "app/auth", "web", "node_modules/pkg"])
+        directory.mkdir(parents=True, exist_ok=True)
+        lines = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 8)))
+            for _ in range(rng.randint(0, 30))
+        ]
+        suffix = rng.choice([".py", ".js", ".md"])
+        (directory / f"file_{number}{suffix}").write_text("\n".join(lines))
+    (root / "app" / "logo.png").write_bytes(b"\x89PNG\0validate_token")
+    return root
+
+
+@pytest.fixture(scope="module")
+def index(repo, tmp_path_factory):
+    return load_trigram_index(build_trigram_index(repo, tmp_path_factory.mktemp("index")))
+
+
+def brute_force(repo, pattern, regex=False, ignore_case=False, path_glob=None):
+    compiled = re.compile(
+        pattern if regex else re.escape(pattern), re.IGNORECASE if ignore_case else 0
+    )
+    matches = []
+    for dirpath, dirnames, filenames in os.walk(repo):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            relative = os.path.relpath(path, repo)
+            if filename.endswith(".png"):
+                continue
+            if path_glob and not fnmatch.fnmatch(relative, path_glob):
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line_number, line in enumerate(f.read().splitlines(), start=1):
+                    if compiled.search(line):
+                        matches.append((relative, line_number, line))
+    return sorted(matches)
+
+
+def found(index, pattern, **kwargs):
+    return sorted(
+        (match.path, match.line_number, match.line)
+        for match in index.search(pattern, max_results=10_000, **kwargs)
+    )
+
+
+@pytest.mark.parametrize("pattern, regex", PATTERNS)
+def test_search_matches_brute_force_scan(repo, index, pattern, regex):
+    assert found(index, pattern, regex=regex) == brute_force(repo, pattern, regex)
+
+
+@pytest.mark.parametrize("pattern, regex", PATTERNS)
+def test_ignore_case_matches_brute_force_scan(repo, index, pattern, regex):
+    expected = brute_force(repo, pattern, regex, ignore_case=True)
+    assert found(index, pattern, regex=regex, ignore_case=True) == expected
+
+
+def test_path_glob_limits_files(repo, index):
+    expected = brute_force(repo, "token", path_glob="app/*.py")
+    assert expected
+    assert found(index, "token", path_glob="app/*.py") == expected
+
+
+def test_candidates_skip_files_without_the_literal(index):
+    candidates = index.candidates("validate_token")
+    assert 0 < len(candidates) < len(index.files)
+    assert not any(path.startswith("node_modules") for path in index.files)
+    assert not any(path.endswith(".png") for path in index.files)
@@ -0,0 +1,51 @@
+import pytest
+
+from advanced_rag.code_indexer import ChangeSet
+from advanced_rag.code_symbols import QUESTION_PATTERNS, build_symbol_index
+
+
+def prepared_key(question: str) -> str | None:
+    return next((key for key, pattern in QUESTION_PATTERNS if pattern.search(question)), None)
+
+
+@pytest.mark.parametrize(
+    "question, key",
+    [
+        (
+            "What are all the API endpoints available in the registry service "
+            "and what scopes do they require?",
+            "routes",
+        ),
+        ("Which endpoints require the admin scope?", "routes"),
+        ("How are scopes mapped to groups in the auth server config?", None),
+        ("Where is the health check route tested?", None),
+        ("What Python dependencies does this project use?", "python_dependencies"),
+        ("What is the main entry point file for the registry service?", "entry_points"),
+        ("How do I run the registry service locally?", "entry_points"),
+        ("What starts the background health check task?", None),
+        ("What packages does the frontend depend on? List the node dependencies.",
+         "node_dependencies"),
+        ("What third-party dependencies are in requirements.txt?", "dependencies"),
+        (
+            "How does the registry use FastAPI dependency injection for authentication?",
+            None,
+        ),
+        ("Which dependencies are injected into the admin routes?", "routes"),
+        ("What languages is this repository written in?", "file_types"),
+        ("Which file extensions does the nginx config allow?", None),
+        ("What language does the auth server return errors in?", None),
+    ],
+)
+def test_question_patterns(question, key):
+    assert prepared_key(question) == key
+
+
+def test_file_removed_after_listing_is_skipped(tmp_path):
+    (tmp_path / "requirements.txt").write_text("fastapi\n")
+    (tmp_path / "main.py").write_text("import fastapi\n")
+    index = build_symbol_index(tmp_path)
+    assert set(index.files) == {"main.py", "requirements.txt"}
+
+    (tmp_path / "main.py").unlink()
+    index.refresh(ChangeSet(modified=["main.py"]))
+    assert set(index.files) == {"requirements.txt"}
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from advanced_rag.context_packer import (
+    ContextItem,
+    ContextPacker,
+    count_tokens,
+    merge_line_ranges,
+)
+
+
+WORDS = "region revenue review battery kitchen cable yoga price shipping color".split()
+
+
+def alternating_item() -> ContextItem:
+    lines = []
+    for i in range(40):
+        if i % 2:
+            lines.append(f"line {i} unrelated filler about shipping and colors")
+        else:
+            lines.append(f"line {i} the battery life review is strong")
+    return ContextItem(text="\n".join(lines), score=1.0, source="reviews")
+
+
+def random_items(rng: random.Random, count: int) -> list[ContextItem]:
+    items = []
+    for i in range(count):
+        lines = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12))) + "."
+            for _ in range(rng.randint(1, 30))
+        ]
+        items.append(ContextItem("\n".join(lines), rng.random(), f"source-{i}"))
+    return items
+
+
+@pytest.mark.parametrize("budget", [30, 60, 100])
+def test_compressed_pack_stays_within_budget(budget):
+    packed = ContextPacker(budget=budget).pack([alternating_item()], "battery review")
+
+    assert packed.compressed
+    assert packed.tokens == count_tokens(packed.text)
+    assert packed.tokens <= budget
+
+
+def test_pluggable_counter_is_used_for_item_bodies():
+    item = ContextItem("x" * 204, score=1.0, source="s")
+    packed = ContextPacker(budget=50, token_counter=len).pack([item])
+
+    assert packed.included == []
+    assert packed.tokens == len(packed.text) <= 50
+
+
+@pytest.mark.parametrize("counter", [count_tokens, len], ids=["regex", "chars"])
+@pytest.mark.parametrize("budget", [40, 150, 400, 2000])
+def test_tokens_match_counter_and_budget(counter, budget):
+    rng = random.Random(budget)
+    items = random_items(rng, 12)
+    packed = ContextPacker(budget=budget, token_counter=counter).pack(items, "battery price")
+
+    assert packed.tokens == counter(packed.text)
+    assert packed.tokens <= budget
+    assert len(packed.included) + len(packed.compressed) + len(packed.dropped) <= len(items)
+
+
+def test_merge_line_ranges_keeps_unmerged_sources():
+    lone = ContextItem("a\nb", 1.0, "app.py:1-2 (main)", "app.py", 1, 2)
+    first = ContextItem("c\nd", 0.5, "auth.py:10-11 (login)", "auth.py", 10, 11)
+    second = ContextItem("d\ne", 0.9, "auth.py:11-12 (check)", "auth.py", 11, 12)
+    far = ContextItem("z", 0.2, "auth.py:40-40 (logout)", "auth.py", 40, 40)
+    plain = ContextItem("notes", 0.1, "README")
+
+    items, merged_away = merge_line_ranges([lone, first, second, far, plain])
+    by_source = {item.source: item for item in items}
+
+    assert merged_away == 1
+    assert set(by_source) == {
+        "app.py:1-2 (main)", "auth.py:10-12", "auth.py:40-40 (logout)", "README"
+    }
+    merged = by_source["auth.py:10-12"]
+    assert merged.text == "c\nd\ne"
+    assert merged.score == 0.9
@@ -0,0 +1,76 @@
+import hashlib
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from advanced_rag.embedding_cache import (  # noqa: E402
+    CachedEncoder,
+    EmbeddingStore,
+    embedding_key,
+)
+
+
+DIMENSION = 8
+
+
+class HashEncoder:
+    """Deterministic stand-in for a SentenceTransformer."""
+
+    def __init__(self) -> None:
+        self.encoded: list[str] = []
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return DIMENSION
+
+    def encode(self, texts, **kwargs) -> np.ndarray:
+        self.encoded.extend(texts)
+        return np.stack([vector(text) for text in texts])
+
+
+def vector(text: str) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:4], "little")
+    values = np.random.default_rng(seed).standard_normal(DIMENSION)
+    return values.astype(np.float16).astype(np.float32)
+
+
+def test_two_encoders_on_one_directory_keep_rows_apart(tmp_path):
+    model = HashEncoder()
+    first = CachedEncoder("model", encoder=model, cache_dir=tmp_path)
+    first.encode(["alpha", "beta"])
+    second = CachedEncoder("model", encoder=HashEncoder(), cache_dir=tmp_path)
+    second.encode(["gamma", "delta"])
+    first.encode(["epsilon"])
+
+    # Served from disk: every text was stored by one of the two encoders
+    texts = ["alpha", "beta", "gamma", "delta", "epsilon"]
+    first.memory.clear()
+    model.encoded.clear()
+    result = first.encode(texts)
+
+    assert model.encoded == []
+    np.testing.assert_array_equal(result, np.stack([vector(text) for text in texts]))
+
+
+def test_reopened_store_maps_keys_to_their_rows(tmp_path):
+    texts = ["one", "two", "three"]
+    CachedEncoder("model", encoder=HashEncoder(), cache_dir=tmp_path).encode(texts[:2])
+    CachedEncoder("model", encoder=HashEncoder(), cache_dir=tmp_path).encode(texts)
+
+    store = EmbeddingStore(tmp_path / "model", DIMENSION)
+    keys = [embedding_key(text, "model", False) for text in texts]
+    found = store.lookup(keys)
+
+    assert len(store) == 3
+    for key, text in zip(keys, texts):
+        np.testing.assert_array_equal(found[key], vector(text))
+
+
+def test_repeated_texts_are_encoded_once(tmp_path):
+    model = HashEncoder()
+    encoder = CachedEncoder("model", encoder=model, cache_dir=tmp_path)
+    result = encoder.encode(["same", "other", "same"])
+
+    assert sorted(model.encoded) == ["other", "same"]
+    np.testing.assert_array_equal(result[0], result[2])
@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from advanced_rag.executor import (
+    STATUS_ERROR,
+    STATUS_OK,
+    STATUS_TIMEOUT,
+    ContextCombiner,
+    MultiSourceExecutor,
+)
+
+
+@pytest.fixture
+def release():
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+@pytest.fixture
+def executor(release):
+    def broken(query):
+        raise KeyError("product_id")
+
+    executor = MultiSourceExecutor(
+        {
+            "csv": lambda query: f"totals for {query}",
+            "text": lambda query: release.wait(5) and "reviews",
+            "code": broken,
+        },
+        deadlines={"text": 0.1},
+    )
+    yield executor
+    executor.close()
+
+
+def test_deadline_and_exception_degrade_their_source_only(executor):
+    results = {result.source: result for result in executor.run("sales")}
+
+    assert results["csv"].status == STATUS_OK
+    assert results["csv"].content == "totals for sales"
+    assert results["text"].status == STATUS_TIMEOUT
+    assert results["text"].content is None
+    assert results["text"].elapsed >= 0.1
+    assert results["code"].status == STATUS_ERROR
+    assert results["code"].error == "KeyError: 'product_id'"
+
+
+def test_results_arrive_in_completion_order(executor):
+    combiner = ContextCombiner()
+    results = executor.run("sales", ["text", "csv"], combiner)
+
+    assert [result.source for result in results] == ["csv", "text"]
+    assert combiner.results == results
+    assert combiner.render().splitlines() == [
+        "[csv]",
+        "totals for sales",
+        "",
+        "[text] unavailable: no result within " + f"{results[1].elapsed:.2f}s",
+    ]
+
+
+def test_error_is_rendered_as_unavailable(executor):
+    combiner = ContextCombiner()
+    executor.run("sales", ["code"], combiner)
+    assert combiner.render() == "[code] unavailable: KeyError: 'product_id'"
+
+
+def test_unknown_source_is_rejected(executor):
+    with pytest.raises(ValueError, match="Unknown sources"):
+        executor.run("sales", ["csv", "bash"])
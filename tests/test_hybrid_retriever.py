@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from rank_bm25 import BM25Okapi  # noqa: E402
+
+from advanced_rag.hybrid_retriever import BM25MaxScoreIndex  # noqa: E402
+
+
+VOCABULARY = [f"w{i}" for i in range(60)]
+
+
+def corpus(seed: int, documents: int = 300) -> list[list[str]]:
+    rng = np.random.default_rng(seed)
+    # Zipf-like term frequencies, so some terms are common and most are rare
+    weights = 1 / np.arange(1, len(VOCABULARY) + 1)
+    weights /= weights.sum()
+    return [
+        list(rng.choice(VOCABULARY, size=int(rng.integers(3, 40)), p=weights))
+        for _ in range(documents)
+    ]
+
+
+def brute_force(bm25: BM25Okapi, docs: list[list[str]], query: list[str], k: int):
+    scores = bm25.get_scores(query)
+    matching = [i for i, doc in enumerate(docs) if set(query) & set(doc)]
+    return sorted(scores[matching], reverse=True)[:k], scores
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("k", [1, 5, 20])
+def test_maxscore_matches_brute_force_bm25(seed, k):
+    docs = corpus(seed)
+    bm25 = BM25Okapi(docs)
+    index = BM25MaxScoreIndex(bm25)
+    rng = np.random.default_rng(seed + 100)
+
+    for _ in range(20):
+        query = list(rng.choice(VOCABULARY, size=int(rng.integers(1, 6))))
+        expected, scores = brute_force(bm25, docs, query, k)
+        found = index.top_k(query, k)
+
+        assert np.allclose([score for _, score in found], expected)
+        assert np.allclose([scores[doc_id] for doc_id, _ in found], expected)
+
+
+def test_repeated_and_unknown_query_terms():
+    docs = corpus(0)
+    bm25 = BM25Okapi(docs)
+    index = BM25MaxScoreIndex(bm25)
+    query = ["w1", "w1", "w30", "missing"]
+
+    expected, _ = brute_force(bm25, docs, query, 10)
+    assert np.allclose([score for _, score in index.top_k(query, 10)], expected)
+    assert index.top_k(["missing"], 10) == []
+    assert index.top_k(query, 0) == []
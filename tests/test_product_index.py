@@ -0,0 +1,98 @@
+import hashlib
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from advanced_rag.product_index import (  # noqa: E402
+    DATA_DIR,
+    MANIFEST_FILE,
+    build_product_index,
+    corpus_hash,
+    load_product_index,
+    published_index_dir,
+)
+from advanced_rag.vector_index import RerankingIndex  # noqa: E402
+
+
+DIMENSION = 8
+
+
+class HashEncoder:
+    """Deterministic stand-in for a SentenceTransformer."""
+
+    def encode(self, texts, **kwargs) -> np.ndarray:
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:4], "little")
+            vector = np.random.default_rng(seed).standard_normal(DIMENSION)
+            vectors.append(vector / np.linalg.norm(vector))
+        return np.stack(vectors).astype(np.float32)
+
+
+@pytest.fixture
+def pages_dir(tmp_path):
+    pages = tmp_path / "pages"
+    pages.mkdir()
+    for path in sorted((DATA_DIR / "unstructured").glob("*_product_page.txt"))[:3]:
+        shutil.copy(path, pages / path.name)
+    return pages
+
+
+def build(pages_dir: Path, index_root: Path) -> Path:
+    return build_product_index(pages_dir, index_root, "model", encoder=HashEncoder())
+
+
+def test_rebuild_publishes_new_directory_without_removing_the_old(pages_dir, tmp_path):
+    index_root = tmp_path / "index"
+    digest = corpus_hash(pages_dir, "model")
+    first = build(pages_dir, index_root)
+    second = build(pages_dir, index_root)
+
+    assert first != second
+    assert (first / MANIFEST_FILE).exists()
+    assert published_index_dir(index_root, digest) == second
+
+
+def test_superseded_corpora_are_pruned(pages_dir, tmp_path):
+    index_root = tmp_path / "index"
+    builds = []
+    for edit in range(3):
+        page = next(pages_dir.iterdir())
+        page.write_text(page.read_text() + f"\nEdit {edit}\n")
+        builds.append((corpus_hash(pages_dir, "model"), build(pages_dir, index_root)))
+
+    (old_digest, old_dir), (_, previous), (digest, current) = builds
+    assert not old_dir.exists()
+    assert published_index_dir(index_root, old_digest) is None
+    assert previous.exists()
+    assert published_index_dir(index_root, digest) == current
+    assert not list(index_root.glob(".build-*"))
+
+
+def test_load_uses_published_directory(pages_dir, tmp_path):
+    index_root = tmp_path / "index"
+    index_dir = build(pages_dir, index_root)
+
+    index = load_product_index(pages_dir, index_root, "model", build_if_missing=False)
+    assert index.index_dir == index_dir
+    assert len(index.chunks) == index.faiss_index.ntotal
+
+
+def test_manifest_records_index_type_actually_built(pages_dir, tmp_path):
+    index_root = tmp_path / "index"
+    index_dir = build_product_index(
+        pages_dir, index_root, "model", encoder=HashEncoder(), index_type="ivfpq"
+    )
+    manifest = json.loads((index_dir / MANIFEST_FILE).read_text())
+    assert manifest["index_type"] == "sq8"
+    assert manifest["requested_index_type"] == "ivfpq"
+
+    index = load_product_index(
+        pages_dir, index_root, "model", build_if_missing=False, index_type="ivfpq"
+    )
+    assert isinstance(index.faiss_index, RerankingIndex)
@@ -0,0 +1,135 @@
+import csv
+import math
+import shutil
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+
+from advanced_rag.product_join import ProductJoinIndex, is_product_question
+from advanced_rag.product_pages import load_product_store
+
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+CSV_PATH = DATA_DIR / "structured" / "daily_sales.csv"
+PAGES_DIR = DATA_DIR / "unstructured"
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "daily_sales.csv"
+    shutil.copy(CSV_PATH, path)
+    return path
+
+
+@pytest.fixture
+def join(tmp_path, csv_path):
+    join = ProductJoinIndex.open(tmp_path / "sales.sqlite", csv_path, PAGES_DIR)
+    yield join
+    join.close()
+
+
+def brute_force_join(csv_path: Path, region: str | None = None) -> dict[str, dict]:
+    """Pages joined with units sold per product, optionally in one region."""
+    units = defaultdict(int)
+    with open(csv_path, newline="") as f:
+        for row in csv.DictReader(f):
+            if region is None or row["region"] == region:
+                units[row["product_id"]] += int(row["units_sold"])
+    return {
+        page.product_id: {
+            "category": page.category,
+            "rating": None if math.isnan(page.average_rating) else page.average_rating,
+            "reviews": page.review_count,
+            "units": units[page.product_id],
+        }
+        for page in load_product_store(PAGES_DIR).pages
+        if page.product_id in units
+    }
+
+
+def test_rank_by_rating_matches_brute_force(join, csv_path):
+    rows = brute_force_join(csv_path)
+    expected = sorted(
+        (pid for pid, row in rows.items() if row["rating"] is not None),
+        key=lambda pid: (-rows[pid]["rating"], -rows[pid]["reviews"], -rows[pid]["units"]),
+    )[:5]
+
+    ranked = join.rank("rating", k=5)
+    assert [product.product_id for product in ranked] == expected
+    assert [product.units_sold for product in ranked] == [rows[pid]["units"] for pid in expected]
+
+
+def test_rank_units_in_region_among_well_rated(join, csv_path):
+    rows = brute_force_join(csv_path, region="West")
+    eligible = [
+        pid for pid, row in rows.items()
+        if row["category"] == "Sports & Outdoors" and (row["rating"] or 0) >= 4.0
+    ]
+    expected = max(eligible, key=lambda pid: rows[pid]["units"])
+
+    ranked = join.rank("units", "Sports & Outdoors", "West", min_rating=4.0, k=1)
+    assert ranked[0].product_id == expected
+    assert ranked[0].units_sold == rows[expected]["units"]
+
+
+def test_q5_and_q6_pick_expected_products(join, csv_path):
+    rows = brute_force_join(csv_path)
+    best_rated = max(
+        (pid for pid, row in rows.items() if row["rating"] is not None),
+        key=lambda pid: (rows[pid]["rating"], rows[pid]["reviews"]),
+    )
+    answer = join.answer("Which product has the best customer reviews and how well is it selling?")
+    assert answer.splitlines()[1].split("[")[1].startswith(best_rated)
+
+    west = brute_force_join(csv_path, region="West")
+    fitness = max(
+        (
+            pid for pid, row in west.items()
+            if row["category"] == "Sports & Outdoors" and (row["rating"] or 0) >= 4.0
+        ),
+        key=lambda pid: west[pid]["units"],
+    )
+    answer = join.answer(
+        "I want a product for fitness that is highly rated and sells well in the West "
+        "region. What do you recommend?"
+    )
+    assert "sales in West" in answer.splitlines()[0]
+    assert answer.splitlines()[1].split("[")[1].startswith(fitness)
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("Which product has the best customer reviews and how well is it selling?", True),
+    ("I want a product for fitness that is highly rated and sells well in the West "
+     "region. What do you recommend?", True),
+    ("Which highly rated product would you recommend?", True),
+    ("What was the total revenue for Electronics in December 2024?", False),
+    ("What do customers say about the yoga mat?", False),
+    ("Which region sells the most?", False),
+])
+def test_is_product_question(question, expected):
+    assert is_product_question(question) is expected
+
+
+def test_same_length_rewrite_rebuilds_join(join, csv_path):
+    content = csv_path.read_bytes()
+    header_end = content.index(b"\n") + 1
+    row_end = content.index(b"\n", header_end)
+    header = next(csv.reader([content[:header_end].decode()]))
+    row = next(csv.reader([content[header_end:row_end].decode()]))
+    column = header.index("units_sold")
+    product_id = row[header.index("product_id")]
+    before = join.lookup(product_id).units_sold
+
+    # Same number of digits, so the file keeps its length
+    old = row[column]
+    new = str(int(old) - 1) if old[-1] != "0" else str(int(old) + 1)
+    row[column] = new
+    line = ",".join(row).encode()
+    assert len(line) == len(content[header_end:row_end].rstrip(b"\r"))
+    rewritten = content[:header_end] + line + content[header_end + len(line):]
+    assert len(rewritten) == len(content)
+    csv_path.write_bytes(rewritten)
+
+    assert join.refresh()
+    assert join.lookup(product_id).units_sold == before - int(old) + int(new)
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from advanced_rag.reranker import CrossEncoderReranker  # noqa: E402
+
+
+class FakeCrossEncoder:
+    """Scores a pair by how many query words the text contains."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[tuple[str, str]]] = []
+
+    def predict(self, pairs, batch_size, show_progress_bar):
+        self.batches.append(list(pairs))
+        return np.array(
+            [len(set(query.split()) & set(text.split())) for query, text in pairs],
+            dtype=np.float32,
+        )
+
+
+QUERY = "air fryer basket reviews"
+ITEMS = [
+    "yoga mat",
+    "air fryer",
+    "air fryer basket reviews",
+    "usb cable",
+    "fryer basket",
+    "air fryer basket reviews",
+]
+
+
+def make_reranker(**kwargs) -> tuple[CrossEncoderReranker, FakeCrossEncoder]:
+    model = FakeCrossEncoder()
+    return CrossEncoderReranker(model=model, **kwargs), model
+
+
+def test_rerank_orders_by_score_and_keeps_ties_in_retrieval_order():
+    reranker, _ = make_reranker()
+    ranked = reranker.rerank(QUERY, ITEMS)
+
+    assert [entry.rank for entry in ranked] == [2, 5, 1, 4, 0, 3]
+    assert [entry.score for entry in ranked] == [4.0, 4.0, 2.0, 2.0, 0.0, 0.0]
+    assert [entry.item for entry in reranker.rerank(QUERY, ITEMS, k=2)] == [ITEMS[2]] * 2
+
+
+def test_items_past_candidate_cutoff_follow_unscored():
+    reranker, model = make_reranker(candidates=3)
+    ranked = reranker.rerank(QUERY, ITEMS)
+
+    assert [entry.rank for entry in ranked] == [2, 1, 0, 3, 4, 5]
+    assert all(entry.score == float("-inf") for entry in ranked[3:])
+    scored = {text for batch in model.batches for _, text in batch}
+    assert scored == set(ITEMS[:3])
+
+
+def test_duplicates_are_scored_once_longest_first_in_batches():
+    reranker, model = make_reranker(batch_size=2)
+    reranker.rerank(QUERY, ITEMS)
+
+    texts = [text for batch in model.batches for _, text in batch]
+    assert len(texts) == len(set(ITEMS)) == 5
+    assert [len(text) for text in texts] == sorted(map(len, texts), reverse=True)
+    assert [len(batch) for batch in model.batches] == [2, 2, 1]
+    assert reranker.stats == {"cache_hits": 0, "scored": 5, "batches": 3}
+
+
+def test_repeated_query_is_served_from_cache():
+    reranker, model = make_reranker()
+    first = reranker.rerank(QUERY, ITEMS)
+    second = reranker.rerank(QUERY, ITEMS)
+
+    assert second == first
+    assert len(model.batches) == 1
+    assert reranker.stats["cache_hits"] == 5
+
+    reranker.rerank("usb cable", ITEMS[:2])
+    assert len(model.batches) == 2
+
+
+def test_least_recently_used_scores_are_evicted():
+    reranker, model = make_reranker(cache_size=3)
+    # Scored longest first, so the oldest entry is ITEMS[2] until it is read again
+    reranker.rerank(QUERY, ITEMS[:3])
+    reranker.rerank(QUERY, ITEMS[2:3])
+    reranker.rerank(QUERY, ITEMS[3:4])
+
+    model.batches.clear()
+    reranker.rerank(QUERY, ITEMS[:3])
+    assert [text for batch in model.batches for _, text in batch] == [ITEMS[1]]
@@ -0,0 +1,73 @@
+import csv
+import shutil
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from advanced_rag.sales_columnar import convert_csv, day_to_date, load_sales_columns
+
+
+CSV_PATH = Path(__file__).resolve().parents[1] / "data" / "structured" / "daily_sales.csv"
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "daily_sales.csv"
+    shutil.copy(CSV_PATH, path)
+    return path
+
+
+def read_rows(path: Path) -> list[dict]:
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.mark.parametrize("chunk_size", [1_000_000, 97])
+def test_columns_round_trip_the_csv(csv_path, tmp_path, chunk_size):
+    rows = read_rows(csv_path)
+    sales = load_sales_columns(convert_csv(csv_path, tmp_path / "columnar", chunk_size))
+    columns = sales.columns
+
+    assert sales.num_rows == len(rows)
+    assert [day_to_date(int(day)).isoformat() for day in columns["day"]] == [
+        row["date"] for row in rows
+    ]
+    assert sales.decode("product", columns["product"]) == [row["product_id"] for row in rows]
+    assert sales.decode("region", columns["region"]) == [row["region"] for row in rows]
+    assert columns["units_sold"].tolist() == [int(row["units_sold"]) for row in rows]
+    assert sales.product_names[sales.code("product_id", rows[0]["product_id"])] == (
+        rows[0]["product_name"]
+    )
+
+
+def test_column_sums_match_csv(csv_path, tmp_path):
+    rows = read_rows(csv_path)
+    sales = load_sales_columns(convert_csv(csv_path, tmp_path / "columnar"))
+    columns = sales.columns
+
+    expected = defaultdict(float)
+    for row in rows:
+        expected[row["category"]] += float(row["total_revenue"])
+    for category, total in expected.items():
+        mask = columns["category"] == sales.code("category", category)
+        assert columns["total_revenue"][mask].sum() == pytest.approx(total)
+
+    assert columns["units_sold"].sum() == sum(int(row["units_sold"]) for row in rows)
+    assert sales.code("category", "Groceries") == -1
+
+
+def test_row_range_selects_december(csv_path, tmp_path):
+    rows = read_rows(csv_path)
+    sales = load_sales_columns(convert_csv(csv_path, tmp_path / "columnar"))
+
+    rows_range = sales.row_range(date(2024, 12, 1), date(2024, 12, 31))
+    december = [row for row in rows if row["date"].startswith("2024-12")]
+    assert rows_range.stop - rows_range.start == len(december)
+    assert np.sum(sales.columns["total_revenue"][rows_range]) == pytest.approx(
+        sum(float(row["total_revenue"]) for row in december)
+    )
+    empty = sales.row_range(date(2025, 1, 1), date(2025, 1, 31))
+    assert empty.start == empty.stop == sales.num_rows
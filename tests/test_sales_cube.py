@@ -0,0 +1,96 @@
+import csv
+import shutil
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from advanced_rag.sales_columnar import convert_csv, load_sales_columns
+from advanced_rag.sales_cube import build_cube_from_columns, load_cube
+
+
+CSV_PATH = Path(__file__).resolve().parents[1] / "data" / "structured" / "daily_sales.csv"
+
+
+@pytest.fixture(scope="module")
+def rows():
+    with open(CSV_PATH, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture(scope="module")
+def cube(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("cube")
+    csv_path = tmp_path / "daily_sales.csv"
+    shutil.copy(CSV_PATH, csv_path)
+    sales = load_sales_columns(convert_csv(csv_path, tmp_path / "columnar"))
+    # A small chunk size exercises accumulation across chunks
+    built = build_cube_from_columns(sales, chunk_size=128)
+    return load_cube(built.save(tmp_path / "daily_sales_cube.npz"))
+
+
+def value(row, measure):
+    return 1.0 if measure == "rows" else float(row[measure])
+
+
+def oracle(rows, measure, start=None, end=None, group_by=(), **filters):
+    """Sum ``measure`` over matching rows, grouped like SalesCube.query."""
+    result = defaultdict(float)
+    for row in rows:
+        day = date.fromisoformat(row["date"])
+        if start and day < start or end and day > end:
+            continue
+        if any(row[key] not in allowed for key, allowed in filters.items()):
+            continue
+        fields = {**row, "day": row["date"], "month": row["date"][:7]}
+        labels = tuple(fields[key] for key in group_by)
+        result[labels[0] if len(labels) == 1 else labels] += value(row, measure)
+    return result
+
+
+@pytest.mark.parametrize("measure", ["units_sold", "total_revenue", "rows"])
+def test_total_matches_csv(cube, rows, measure):
+    assert cube.query(measure) == pytest.approx(oracle(rows, measure)[()])
+
+
+def test_filters_match_csv(cube, rows):
+    start, end = date(2024, 12, 1), date(2024, 12, 31)
+    expected = oracle(rows, "total_revenue", start, end, category={"Electronics"})
+    assert cube.query(
+        "total_revenue", start=start, end=end, categories=["Electronics"]
+    ) == pytest.approx(expected[()])
+
+    expected = oracle(rows, "units_sold", region={"West", "North"}, product_id={"ELEC002"})
+    assert cube.query(
+        "units_sold", regions=["West", "North"], product_ids=["ELEC002"]
+    ) == pytest.approx(expected[()])
+
+
+@pytest.mark.parametrize(
+    "group_by",
+    [["region"], ["category"], ["month"], ["day"], ["category", "region"], ["region", "month"]],
+)
+def test_group_by_matches_csv(cube, rows, group_by):
+    start = date(2024, 11, 15)
+    result = cube.query("total_revenue", start=start, group_by=group_by)
+    expected = oracle(rows, "total_revenue", start, group_by=group_by)
+
+    # The cube also reports groups that had no sales in the range
+    assert {key: total for key, total in result.items() if total} == pytest.approx(
+        dict(expected)
+    )
+
+
+def test_range_outside_the_cube_is_empty(cube):
+    assert cube.query("rows", start=date(2025, 1, 1)) == 0.0
+    assert cube.query("rows", end=date(2024, 1, 1), group_by=["month"]) == {}
+
+
+def test_invalid_queries_are_rejected(cube):
+    with pytest.raises(ValueError, match="Unknown measure"):
+        cube.query("profit")
+    with pytest.raises(ValueError, match="Unknown group key"):
+        cube.query(group_by=["store"])
+    with pytest.raises(ValueError, match="share a cube dimension"):
+        cube.query(group_by=["product_id", "category"])
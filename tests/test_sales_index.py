@@ -0,0 +1,127 @@
+import csv
+import shutil
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+import advanced_rag.sales_index as sales_index
+from advanced_rag.sales_index import index_path_for, iter_rows, update_sales_index
+
+
+CSV_PATH = Path(__file__).resolve().parents[1] / "data" / "structured" / "daily_sales.csv"
+
+APPENDED = [
+    "2025-01-01,ELEC002,USB-C Fast Charger,Electronics,10,24.99,249.90,West",
+    "2025-01-01,BOOK003,Mystery Novel Collection,Books,4,24.99,99.96,Central",
+    "2025-01-02,ELEC002,USB-C Fast Charger,Electronics,3,24.99,74.97,Galaxy",
+]
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "daily_sales.csv"
+    shutil.copy(CSV_PATH, path)
+    return path
+
+
+def read_rows(path: Path) -> list[dict]:
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def oracle(rows, measure, start, end, key=None, label=None):
+    total = 0.0
+    for row in rows:
+        if start.isoformat() <= row["date"] <= end.isoformat():
+            if key is None or row[key] == label:
+                total += 1.0 if measure == "rows" else float(row[measure])
+    return total
+
+
+def assert_matches_csv(index, csv_path):
+    rows = read_rows(csv_path)
+    ranges = [
+        (date(2024, 10, 1), date(2025, 1, 31)),
+        (date(2024, 12, 1), date(2024, 12, 31)),
+        (date(2024, 11, 5), date(2024, 11, 5)),
+        (date(2025, 1, 2), date(2025, 3, 1)),
+    ]
+    for start, end in ranges:
+        for measure in ("total_revenue", "units_sold", "rows"):
+            assert index.range_sum(measure, start, end) == pytest.approx(
+                oracle(rows, measure, start, end)
+            )
+            for category in ("Electronics", "Books"):
+                assert index.range_sum(measure, start, end, category=category) == (
+                    pytest.approx(oracle(rows, measure, start, end, "category", category))
+                )
+            for region in ("West", "Galaxy"):
+                assert index.range_sum(measure, start, end, region=region) == (
+                    pytest.approx(oracle(rows, measure, start, end, "region", region))
+                )
+
+
+def append(csv_path, lines):
+    with open(csv_path, "ab") as f:
+        f.write("".join(line + "\r\n" for line in lines).encode("utf-8"))
+
+
+def test_prefix_sums_match_csv(csv_path):
+    index = update_sales_index(csv_path)
+    assert index_path_for(csv_path).exists()
+    assert index.end_offset == csv_path.stat().st_size
+    assert_matches_csv(index, csv_path)
+
+
+def test_append_scans_only_the_tail(csv_path, monkeypatch):
+    before = update_sales_index(csv_path)
+    append(csv_path, APPENDED)
+
+    scanned = []
+    scan_tail = sales_index._scan_tail
+
+    def recording_scan_tail(path, index, fieldnames):
+        scanned.append(index.end_offset)
+        return scan_tail(path, index, fieldnames)
+
+    monkeypatch.setattr(sales_index, "_scan_tail", recording_scan_tail)
+    index = update_sales_index(csv_path)
+
+    assert scanned == [before.end_offset]
+    assert index.end_offset == csv_path.stat().st_size
+    assert "Galaxy" in index.regions
+    assert_matches_csv(index, csv_path)
+    assert update_sales_index(csv_path).end_offset == index.end_offset
+    assert scanned == [before.end_offset]
+
+
+def test_appends_on_the_last_indexed_date_extend_it(csv_path):
+    update_sales_index(csv_path)
+    append(csv_path, ["2024-12-31,BOOK003,Mystery Novel Collection,Books,5,24.99,124.95,West"])
+    append(csv_path, APPENDED[:1])
+    index = update_sales_index(csv_path)
+
+    assert_matches_csv(index, csv_path)
+
+
+def test_rewritten_file_is_reindexed(csv_path):
+    update_sales_index(csv_path)
+    rows = csv_path.read_bytes().split(b"\r\n")
+    # Same length, different head: the index must not trust its offsets
+    rows[1] = rows[1].replace(b",Central", b",Westish")
+    csv_path.write_bytes(b"\r\n".join(rows))
+
+    index = update_sales_index(csv_path)
+    assert "Westish" in index.regions
+    assert_matches_csv(index, csv_path)
+
+
+def test_iter_rows_reads_only_the_range(csv_path):
+    index = update_sales_index(csv_path)
+    start, end = date(2024, 12, 24), date(2024, 12, 26)
+    expected = [
+        row for row in read_rows(csv_path)
+        if start.isoformat() <= row["date"] <= end.isoformat()
+    ]
+    assert list(iter_rows(csv_path, index, start, end)) == expected
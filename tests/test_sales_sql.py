@@ -0,0 +1,145 @@
+import csv
+import shutil
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from advanced_rag.sales_sql import (
+    SalesDatabase,
+    SalesQuery,
+    describe_result,
+    plan_question,
+)
+
+
+CSV_PATH = Path(__file__).resolve().parents[1] / "data" / "structured" / "daily_sales.csv"
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "daily_sales.csv"
+    shutil.copy(CSV_PATH, path)
+    return path
+
+
+@pytest.fixture
+def database(tmp_path, csv_path):
+    database = SalesDatabase.open(tmp_path / "sales.sqlite", csv_path)
+    yield database
+    database.close()
+
+
+def read_rows(path: Path) -> list[dict]:
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def totals(rows, key, measure):
+    result = defaultdict(float)
+    for row in rows:
+        result[row[key]] += float(row[measure])
+    return result
+
+
+def test_category_month_revenue_matches_csv(database, csv_path):
+    expected = sum(
+        float(row["total_revenue"])
+        for row in read_rows(csv_path)
+        if row["category"] == "Electronics" and row["date"].startswith("2024-12")
+    )
+    plan = plan_question(
+        "What was the total revenue for Electronics category in December 2024?",
+        database.vocabulary(),
+    )
+
+    assert plan.group_by == []
+    assert database.execute(plan) == pytest.approx(expected)
+
+
+def test_region_grouping_matches_csv(database, csv_path):
+    expected = totals(read_rows(csv_path), "region", "units_sold")
+    rows = database.execute(SalesQuery(measure="units_sold", group_by=["region"]))
+
+    assert dict(rows) == pytest.approx(dict(expected))
+    assert [value for _, value in rows] == sorted(expected.values(), reverse=True)
+
+    plan = plan_question("Which region had the highest sales volume?", database.vocabulary())
+    assert database.execute(plan) == [max(expected.items(), key=lambda item: item[1])]
+
+
+def test_top_products_match_csv(database, csv_path):
+    expected = totals(read_rows(csv_path), "product_name", "units_sold")
+    plan = plan_question("What were the top 5 products by units sold?", database.vocabulary())
+
+    assert plan.limit == 5
+    assert [name for name, _ in database.execute(plan)] == sorted(
+        expected, key=expected.get, reverse=True
+    )[:5]
+
+
+def test_modal_may_is_not_a_month(database):
+    plan = plan_question("Which product may sell best in the West?", database.vocabulary())
+
+    assert plan.start is None and plan.end is None
+    assert plan.regions == ["West"]
+    assert database.execute(plan)
+
+
+def test_month_range(database):
+    plan = plan_question("Total revenue from March to May 2024", database.vocabulary())
+
+    assert (plan.start, plan.end) == (date(2024, 3, 1), date(2024, 5, 31))
+
+
+def test_appended_rows_are_loaded_incrementally(database, csv_path):
+    before = database.execute(SalesQuery(categories=["Books"]))
+    with open(csv_path, "a") as f:
+        f.write("2024-12-31,BOOK001,Python Programming Guide,Books,2,40.0,80.0,North\n")
+
+    assert database.refresh() == 1
+    assert database.refresh() == 0
+    assert database.execute(SalesQuery(categories=["Books"])) == pytest.approx(before + 80.0)
+
+
+def test_rewritten_csv_is_reloaded(database, csv_path):
+    rows = read_rows(csv_path)
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows[1:11])
+
+    assert database.refresh() == 10
+    assert database.execute(SalesQuery(measure="rows", aggregate="count")) == 10
+
+
+def test_values_are_bound_not_interpolated(database):
+    plan = SalesQuery(categories=["Books' OR '1'='1"])
+
+    assert database.execute(plan) == 0.0
+    with pytest.raises(ValueError):
+        SalesQuery(group_by=["region; DROP TABLE sales"]).compile()
+
+
+def test_empty_grouped_result_says_no_rows(database):
+    plan = SalesQuery(group_by=["region"], categories=["No Such Category"])
+
+    assert describe_result(plan, database.execute(plan)).endswith("no rows")
+
+
+def test_product_names_map_to_every_id_they_are_sold_under(database, csv_path):
+    with open(csv_path, "a") as f:
+        f.write("2024-12-31,BOOK101,Python Programming Guide,Books,2,40.0,80.0,North\n")
+    database.refresh()
+
+    rows = read_rows(csv_path)
+    vocabulary = database.vocabulary()
+    pairs = list(zip(vocabulary["product_name"], vocabulary["product_id"]))
+    assert pairs == sorted({(row["product_name"], row["product_id"]) for row in rows})
+
+    plan = plan_question("How many Python Programming Guide units were sold?", vocabulary)
+    assert plan.product_ids == ["BOOK001", "BOOK101"]
+    assert database.execute(plan) == sum(
+        int(row["units_sold"]) for row in rows if row["product_name"] == "Python Programming Guide"
+    )
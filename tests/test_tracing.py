@@ -0,0 +1,114 @@
+import json
+import threading
+
+import pytest
+
+from advanced_rag import tracing
+from advanced_rag.executor import MultiSourceExecutor
+from advanced_rag.tracing import configure, count, span, tracer
+
+
+@pytest.fixture
+def traced(tmp_path):
+    saved = (tracer.enabled, tracer.path, tracer.profile, tracer.profile_dir)
+    path = tmp_path / "traces.jsonl"
+    configure(enabled=True, path=path)
+    tracer.reset()
+    yield path
+    configure(*saved)
+    tracer.reset()
+
+
+def read_traces(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_request_is_exported_as_one_json_line(traced):
+    with tracer.request("part2", question="Which region sells the most?"):
+        with span("routing", route="csv"):
+            count("rows_scanned", 10)
+        count("rows_scanned", 5)
+    with tracer.request("part2", request_id="second"):
+        pass
+
+    first, second = read_traces(traced)
+    assert first["name"] == "part2"
+    assert first["attrs"] == {"question": "Which region sells the most?"}
+    assert [entry["name"] for entry in first["spans"]] == ["routing"]
+    assert first["spans"][0]["attrs"] == {"route": "csv"}
+    assert first["counters"] == {"rows_scanned": 15}
+    assert second["request_id"] == "second"
+    assert second["spans"] == []
+
+    stats = tracer.stats()
+    assert stats["requests"] == 2
+    assert stats["spans"]["routing"]["count"] == 1
+    assert stats["counters"]["rows_scanned"] == 15
+
+
+def test_failed_span_records_error(traced):
+    with pytest.raises(KeyError):
+        with tracer.request("part1"):
+            with span("retrieval"):
+                raise KeyError("missing")
+
+    (record,) = read_traces(traced)
+    assert record["spans"][0]["attrs"] == {"error": "KeyError"}
+
+
+def test_spans_from_executor_threads_join_the_request(traced):
+    threads = set()
+
+    def source(query):
+        threads.add(threading.current_thread().name)
+        with span("work"):
+            count("bytes_read", len(query))
+        return query
+
+    executor = MultiSourceExecutor({"csv": source, "text": source})
+    try:
+        with tracer.request("part2"):
+            results = executor.run("query")
+    finally:
+        executor.close()
+
+    assert all(result.ok for result in results)
+    assert threading.current_thread().name not in threads
+    (record,) = read_traces(traced)
+    names = sorted(entry["name"] for entry in record["spans"])
+    assert names == ["source.csv", "source.text", "work", "work"]
+    assert record["counters"] == {"bytes_read": 10}
+
+
+def test_spans_outside_a_request_only_aggregate(traced):
+    with span("loose"):
+        count("rows_loaded", 3)
+
+    assert not traced.exists()
+    assert tracer.stats()["spans"]["loose"]["count"] == 1
+
+
+def test_profile_is_attached_to_the_record(traced):
+    configure(enabled=True, path=traced, profile=True)
+    with tracer.request("part1"):
+        sum(range(1000))
+
+    (record,) = read_traces(traced)
+    assert "function calls" in record["profile"]
+
+
+def test_disabled_tracing_is_a_no_op(tmp_path):
+    saved = (tracer.enabled, tracer.path, tracer.profile, tracer.profile_dir)
+    path = tmp_path / "traces.jsonl"
+    configure(enabled=False, path=path)
+    tracer.reset()
+    try:
+        with tracer.request("part2") as trace:
+            assert trace is None
+            assert span("routing") is tracing._NOOP_SPAN
+            with span("routing"):
+                count("rows_scanned", 10)
+        assert not path.exists()
+        assert tracer.stats()["counters"] == {}
+    finally:
+        configure(*saved)
@@ -0,0 +1,62 @@
+import faiss
+import numpy as np
+import pytest
+
+from advanced_rag.vector_index import (
+    IVFPQ_FALLBACK_TYPE,
+    MIN_POINTS_PER_LIST,
+    RerankingIndex,
+    benchmark_index_types,
+    build_vector_index,
+    built_index_type,
+)
+
+
+DIMENSION = 16
+
+
+def normalized(count: int, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((count, DIMENSION))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+@pytest.mark.parametrize("count", [5, 100, MIN_POINTS_PER_LIST * 256 - 1])
+def test_small_corpus_falls_back_from_ivfpq_quietly(count, capfd):
+    embeddings = normalized(count)
+    index = build_vector_index(embeddings, "ivfpq")
+
+    assert not isinstance(index, faiss.IndexIVF)
+    assert index.ntotal == count
+    assert "WARNING" not in capfd.readouterr().err
+
+
+def test_ivfpq_trains_without_warnings_once_large_enough(capfd):
+    embeddings = normalized(MIN_POINTS_PER_LIST * 256)
+    index = build_vector_index(embeddings, "ivfpq")
+
+    assert isinstance(index, faiss.IndexIVFPQ)
+    assert "WARNING" not in capfd.readouterr().err
+
+
+@pytest.mark.parametrize("index_type", ["flat16", "sq8", "ivfpq"])
+def test_reranked_search_matches_exact_top_hit(index_type):
+    embeddings = normalized(200)
+    index = RerankingIndex(build_vector_index(embeddings, index_type), embeddings)
+
+    scores, ids = index.search(embeddings[:10], 3)
+    assert list(ids[:, 0]) == list(range(10))
+    assert np.allclose(scores[:, 0], 1.0, atol=1e-5)
+
+
+def test_built_index_type_reports_fallback():
+    assert built_index_type("ivfpq", 100) == IVFPQ_FALLBACK_TYPE
+    assert built_index_type("ivfpq", MIN_POINTS_PER_LIST * 256) == "ivfpq"
+    assert built_index_type("flat16", 5) == "flat16"
+
+
+def test_benchmark_rows_are_labelled_with_built_type():
+    embeddings = normalized(300)
+    rows = benchmark_index_types(embeddings, embeddings[:5], k=3, rerank_factors=(2,))
+
+    assert [row.index_type for row in rows] == ["flat", "flat16", "sq8"]
+    assert all(row.nprobe is None for row in rows)